@@ -14,8 +14,9 @@ Usage:
 """
 
 import os
+import json
 import asyncio
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from dotenv import load_dotenv
 from datetime import datetime
 
@@ -23,13 +24,16 @@ from datetime import datetime
 load_dotenv()
 
 # Stock picker imports
-from models.request import StockPickRequest
-from models.response import StockPickResponse
+from models.request import StockPickRequest, BacktestRequest, GoalSimulationRequest, RiskProfile, VALID_SECTORS
+from models.response import StockPickResponse, BacktestResponse
 from graph.stock_picker_graph import StockPickerGraph
 
 # Portfolio imports
-from models.portfolio import AutoPortfolioRequest, ChatRequest, ChatResponse, Portfolio
+from models.portfolio import AutoPortfolioRequest, ChatRequest, ChatResponse, GoalSimulation, Portfolio
 from services.portfolio_service import PortfolioService
+from services.finnhub_client import FinnhubClient
+from services.backtest import Backtester
+from services.universe import get_universe
 
 # =============================================================================
 # 🏷️ NEWS CATEGORIZER
@@ -272,7 +276,8 @@ class FinancialNewsAssistant:
 
 def create_fastapi_app():
     """Create FastAPI app for server mode."""
-    from fastapi import FastAPI, HTTPException
+    from fastapi import FastAPI, HTTPException, Query
+    from fastapi.responses import StreamingResponse
     from fastapi.middleware.cors import CORSMiddleware
     from pydantic import BaseModel
     
@@ -293,9 +298,37 @@ def create_fastapi_app():
         allow_headers=["*"],
     )
     
+    # Load the stock universe before any service uses it, so a bad UNIVERSE_FILE fails here
+    universe = get_universe()
+    print(f"✅ Loaded stock universe {universe.version} ({len(universe)} symbols)")
+    
     news_assistant = FinancialNewsAssistant()
     stock_picker_graph = StockPickerGraph()
     portfolio_service = PortfolioService()
+    backtester = Backtester(portfolio_service.finnhub)
+    
+    @app.on_event("startup")
+    async def startup():
+        """Warm the company profile and candle stores and start the optional trade stream, write-behind queue and universe index."""
+        app.state.background_tasks = {
+            asyncio.create_task(portfolio_service.finnhub.warm_profiles()),
+            asyncio.create_task(backtester.keep_history_current(float(os.getenv("CANDLE_REFRESH_HOURS", "24")) * 3600))
+        }
+        await portfolio_service.finnhub.start_stream()
+        portfolio_service.write_queue.start()
+        if portfolio_service.stock_picker.index:
+            portfolio_service.stock_picker.index.start()
+    
+    @app.on_event("shutdown")
+    async def shutdown():
+        """Flush pending writes, stop the warm-ups, trade stream and universe index and release shared connection pools."""
+        await portfolio_service.write_queue.stop(timeout=float(os.getenv("WRITE_BEHIND_FLUSH_TIMEOUT", "10")))
+        for task in app.state.background_tasks:
+            task.cancel()
+        await asyncio.gather(*app.state.background_tasks, return_exceptions=True)
+        if portfolio_service.stock_picker.index:
+            await portfolio_service.stock_picker.index.stop()
+        await FinnhubClient.aclose()
     
     @app.get("/")
     async def root():
@@ -305,14 +338,19 @@ def create_fastapi_app():
             "version": "1.0.0",
             "endpoints": {
                 "/api/stock-pick": "POST - Smart stock portfolio recommendations",
+                "/api/backtest": "POST - Replay the stock picker over historical prices",
+                "/api/screener": "GET - Screen the stock universe by sector, industry and market cap",
                 "/api/portfolio/create": "POST - Create auto portfolio from preferences",
                 "/api/portfolio/chat": "POST - Chat with your portfolio",
+                "/api/portfolio/chat/stream": "POST - Chat with your portfolio, streamed as Server-Sent Events",
+                "/api/portfolio/simulate": "POST - Monte Carlo chance of holdings reaching a goal",
                 "/api/portfolio/{user_id}": "GET - Get user's portfolios",
                 "/api/news/day": "Today's top 5 US financial news",
                 "/api/news/week": "This week's top 5 US financial news", 
                 "/api/news/month": "This month's top 5 US financial news",
                 "/api/news/all": "All periods combined",
                 "/api/article/full": "Get full article content from URL",
+                "/api/metrics": "Cache, upstream call, LLM cache and write queue metrics",
                 "/health": "API health status"
             }
         }
@@ -337,6 +375,20 @@ def create_fastapi_app():
             "timestamp": datetime.utcnow().isoformat() + "Z"
         }
 
+    @app.get("/api/metrics")
+    async def get_metrics():
+        """Cache and upstream call metrics."""
+        return {
+            "finnhub": portfolio_service.finnhub.get_metrics(),
+            "stock_picker_graph": stock_picker_graph.get_metrics(),
+            "openai": stock_picker_graph.openai_agent.get_metrics(),
+            "write_behind": portfolio_service.write_queue.stats(),
+            "risk_cache": portfolio_service.risk_engine.stats(),
+            "goal_simulation_cache": portfolio_service.goal_simulator.stats(),
+            "universe_index": portfolio_service.stock_picker.index.stats() if portfolio_service.stock_picker.index else None,
+            "timestamp": datetime.utcnow().isoformat() + "Z"
+        }
+
     @app.post("/api/stock-pick", response_model=StockPickResponse)
     async def stock_pick(request: StockPickRequest):
         """
@@ -357,6 +409,59 @@ def create_fastapi_app():
                 detail=f"Stock picking failed: {str(e)}"
             )
 
+    @app.post("/api/backtest", response_model=BacktestResponse)
+    async def backtest(request: BacktestRequest):
+        """
+        Backtest the stock picker's rules over historical prices.
+        
+        Re-runs the picker's risk filter, ranking and allocation on every
+        rebalance check over up to 15 years of local daily prices and returns
+        the equity curve, CAGR, drawdown and hit rate against the goal.
+        """
+        try:
+            return await asyncio.to_thread(backtester.run, request)
+        
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Backtest failed: {str(e)}"
+            )
+    
+    @app.get("/api/screener")
+    async def screener(
+        risk_profile: RiskProfile = RiskProfile.HIGH,
+        sector: Optional[str] = None,
+        industry: Optional[str] = None,
+        min_market_cap: float = Query(0, ge=0, description="Minimum market cap in millions of USD"),
+        limit: int = Query(25, ge=1, le=500)
+    ):
+        """
+        Screen the stock universe in the stock picker's ranking order.
+        
+        Served from the universe index, so only symbols quoted so far are
+        included; narrows by sector, industry and minimum market cap.
+        """
+        index = portfolio_service.stock_picker.index
+        if sector is not None and sector.lower() not in VALID_SECTORS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid sector: {sector}. Valid sectors: {', '.join(VALID_SECTORS)}"
+            )
+        if index is None or not index.ready:
+            raise HTTPException(status_code=503, detail="Universe index is not built yet")
+        
+        stocks = index.screen(
+            risk_profile, sector.lower() if sector else None, industry, min_market_cap, limit
+        )
+        return {
+            "stocks": stocks,
+            "count": len(stocks),
+            "universe_version": index.universe.version,
+            "timestamp": datetime.utcnow().isoformat() + "Z"
+        }
+    
     @app.post("/api/portfolio/create", response_model=Portfolio)
     async def create_auto_portfolio(request: AutoPortfolioRequest):
         """
@@ -399,7 +504,58 @@ def create_fastapi_app():
                 status_code=500,
                 detail=f"Chat failed: {str(e)}"
             )
-
+    
+    @app.post("/api/portfolio/chat/stream")
+    async def stream_chat_with_portfolio(request: ChatRequest):
+        """
+        Chat with your portfolio, streaming the reply as Server-Sent Events.
+        
+        Emits a `token` event per chunk of the reply, then a `done` event with
+        the full message, suggestions and portfolio analysis (or an `error` event).
+        """
+        
+        async def event_stream():
+            async for event in portfolio_service.stream_chat_with_portfolio(request):
+                yield f"event: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+        
+        return StreamingResponse(
+            event_stream(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+    
+    @app.post("/api/portfolio/simulate", response_model=GoalSimulation)
+    async def simulate_goal(request: GoalSimulationRequest):
+        """
+        Estimate the chance that a set of holdings reaches a goal.
+        
+        Simulates correlated price paths for the holdings from their historical
+        covariance and returns the probability of reaching the target return
+        over the horizon, with percentile bands of portfolio value.
+        """
+        composition: Dict[str, int] = {}
+        for holding in request.holdings:
+            ticker = holding.ticker.strip().upper()
+            composition[ticker] = composition.get(ticker, 0) + holding.quantity
+        
+        try:
+            result = await portfolio_service.goal_simulator.simulate(
+                composition,
+                request.goal.target_return,
+                request.goal.duration_years,
+                paths=request.paths,
+                seed=request.seed
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Simulation failed: {str(e)}"
+            )
+        
+        if result is None:
+            raise HTTPException(status_code=400, detail="Not enough price history for these holdings")
+        return result
+    
     @app.get("/api/portfolio/{user_id}")
     async def get_user_portfolios(user_id: str):
         """Get all portfolios for a user."""
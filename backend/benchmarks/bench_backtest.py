@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark: backtesting the stock picker over 10 sectors x 10 years.
+
+Runs the vectorized backtest for every risk profile and rebalance frequency
+against local price history (the deterministic mock history when no Finnhub
+key is set, otherwise the candle store) with both allocators and reports
+wall time, CAGR, drawdown and hit rate. A few days are also replayed through the live
+StockPicker (with the greedy allocator) to check the vectorized rules pick
+the same stocks.
+
+Usage:
+  python -m benchmarks.bench_backtest
+"""
+
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+from models.request import BacktestRequest, StockPickRequest, VALID_SECTORS
+from services.backtest import Backtester
+from services.allocator import GreedyAllocator, OptimizedAllocator
+from services.finnhub_client import FinnhubClient
+from services.picker import StockPicker
+
+
+END = date(2025, 12, 31)
+BUDGET = 100000
+
+
+def check_against_picker(backtester: Backtester, risk_profile: str) -> int:
+    """Compare the vectorized selection and allocation with StockPicker on sampled days. Returns days checked."""
+    sectors = VALID_SECTORS[:3]
+    tickers, codes = backtester.universe(sectors)
+    history = backtester.load_history(tickers, END - timedelta(days=730), END)
+    returns = history.closes[1:] / history.closes[:-1] - 1
+    betas = backtester.rolling_betas(returns, history.market[1:] / history.market[:-1] - 1)
+    change = returns * 100
+    prices = history.closes[1:]
+    caps = backtester.market_caps(tickers) * prices / prices[-1]
+    selection = backtester.select(
+        risk_profile, betas, caps, change, np.isfinite(betas) & np.isfinite(change), codes, len(sectors)
+    )
+    
+    picker = StockPicker(allocator=GreedyAllocator())
+    request = StockPickRequest(
+        budget=BUDGET, sectors=sectors, risk_profile=risk_profile, goal={"target_return": 8, "duration_years": 5}
+    )
+    days = range(backtester.beta_window, len(prices), 25)
+    for day in days:
+        stocks = [
+            {
+                "ticker": ticker, "name": ticker, "sector": sectors[codes[i]].title(), "price": float(prices[day, i]),
+                "change_percent": float(change[day, i]), "beta": float(betas[day, i]), "market_cap": float(caps[day, i])
+            }
+            for i, ticker in enumerate(tickers)
+        ]
+        recommendations, _, _ = picker.pick_from_universe(request, stocks)
+        shares, _ = backtester._allocate_greedy(np.array([day]), selection, prices, codes, len(sectors), BUDGET)
+        expected = {rec.ticker: rec.quantity for rec in recommendations}
+        assert {t: int(q) for t, q in zip(tickers, shares[0]) if q > 0} == expected, (risk_profile, day)
+    return len(days)
+
+
+def main():
+    finnhub = FinnhubClient()
+    backtester = Backtester(finnhub, allocator=GreedyAllocator())
+    checked = sum(check_against_picker(backtester, profile) for profile in ("low", "moderate", "high"))
+    print(f"vectorized picks match StockPicker on {checked} sampled days")
+    
+    print(
+        f"{'allocator':>10} {'risk':>9} {'rebalance':>10} {'ms':>8} {'rebalances':>11} {'CAGR %':>8} "
+        f"{'max DD %':>9} {'hit rate %':>11} {'SPY CAGR %':>11}"
+    )
+    for allocator in (GreedyAllocator(), OptimizedAllocator()):
+        backtester = Backtester(finnhub, allocator=allocator)
+        for profile in ("low", "moderate", "high"):
+            for rebalance in ("daily", "weekly", "monthly", "never"):
+                request = BacktestRequest(
+                    budget=BUDGET, sectors=VALID_SECTORS, risk_profile=profile,
+                    goal={"target_return": 8, "duration_years": 5}, years=10, rebalance=rebalance
+                )
+                best = float("inf")
+                for _ in range(3):
+                    started = time.perf_counter()
+                    result = backtester.run(request, end=END)
+                    best = min(best, time.perf_counter() - started)
+                print(
+                    f"{allocator.name:>10} {profile:>9} {rebalance:>10} {best * 1000:>8.1f} {result.rebalances:>11} "
+                    f"{result.cagr:>8.2f} {result.max_drawdown:>9.2f} {result.hit_rate:>11.1f} "
+                    f"{result.benchmark_cagr:>11.2f}"
+                )
+    print(f"{len(result.dates)} trading days x {len(backtester.universe(VALID_SECTORS)[0])} candidates per run")
+
+
+if __name__ == "__main__":
+    main()
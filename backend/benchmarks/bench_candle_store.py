@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Benchmark: reading the sector universe's price history from the candle store.
+
+Writes 10 years of daily candles for every ticker in the sector universe
+(100 tickers) plus SPY into a temporary columnar store, then times:
+
+- the initial bulk write and an incremental one-day append per ticker
+- memory-mapping the store from a fresh instance (files in page cache)
+- a zero-copy one-year slice per ticker
+- the full 10-year close panel for the universe
+- stored betas for the universe, as computed by get_sector_stocks
+
+The same closes are also loaded into the previous SQLite table layout for
+comparison.
+
+Usage:
+  python -m benchmarks.bench_candle_store
+"""
+
+import os
+import time
+import sqlite3
+import tempfile
+from datetime import date, timedelta
+from typing import Callable
+
+import numpy as np
+
+from services.candle_store import CandleStore
+from services.finnhub_client import FinnhubClient
+
+
+END = date(2025, 12, 31)
+START = END - timedelta(days=3652)
+
+
+def to_candles(days: np.ndarray, closes: np.ndarray) -> dict:
+    """Shape a close series like a Finnhub /stock/candle response."""
+    timestamps = (days.astype("datetime64[s]").astype(np.int64)).tolist()
+    values = closes.tolist()
+    return {"s": "ok", "t": timestamps, "o": values, "h": values, "l": values, "c": values, "v": [1e6] * len(values)}
+
+
+def best_of(fn: Callable[[], None], repeats: int) -> float:
+    """Best wall time in milliseconds over several runs."""
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main():
+    client = FinnhubClient()
+    tickers = list(dict.fromkeys(ticker for tickers in FinnhubClient.SECTOR_TICKERS.values() for ticker in tickers))
+    universe = tickers + ["SPY"]
+    history = {ticker: client._get_mock_closes(ticker, START, END) for ticker in universe}
+    rows = sum(len(days) for days, _ in history.values())
+    
+    with tempfile.TemporaryDirectory() as root:
+        store = CandleStore(os.path.join(root, "candles"))
+        
+        # Everything but the last day, then the last day as an incremental update
+        started = time.perf_counter()
+        for ticker, (days, closes) in history.items():
+            store.append(ticker, to_candles(days[:-1], closes[:-1]))
+        write_ms = (time.perf_counter() - started) * 1000
+        started = time.perf_counter()
+        for ticker, (days, closes) in history.items():
+            store.append(ticker, to_candles(days[-1:], closes[-1:]))
+        append_ms = (time.perf_counter() - started) * 1000
+        
+        def open_store():
+            fresh = CandleStore(store.path)
+            for ticker in universe:
+                fresh.last_date(ticker)
+        open_ms = best_of(open_store, 20)
+        
+        one_year = END - timedelta(days=365)
+        slice_ms = best_of(lambda: [store.get_closes(ticker, one_year, END) for ticker in universe], 50)
+        panel_ms = best_of(lambda: store.get_panel(universe, START, END), 50)
+        
+        client.candle_store = store
+        betas_ms = best_of(lambda: client.get_stored_betas(tickers, as_of=END), 50)
+        
+        # Data must round-trip and beta must track the mock market model
+        days, panel = store.get_panel(universe, START, END)
+        assert panel.shape == (len(history["SPY"][0]), len(universe))
+        assert np.array_equal(panel[:, 0], history[universe[0]][1])
+        betas = client.get_stored_betas(tickers, as_of=END)
+        assert len(betas) == len(tickers)
+        assert all(abs(betas[ticker] - client._get_mock_beta(ticker)) < 0.25 for ticker in tickers)
+        
+        # Previous layout: one SQLite row per (ticker, day)
+        connection = sqlite3.connect(os.path.join(root, "candles.db"))
+        connection.execute(
+            "CREATE TABLE candles (ticker TEXT NOT NULL, day TEXT NOT NULL, close REAL NOT NULL, "
+            "PRIMARY KEY (ticker, day))"
+        )
+        connection.executemany(
+            "INSERT INTO candles VALUES (?, ?, ?)",
+            [(ticker, str(day), close) for ticker, (days, closes) in history.items()
+             for day, close in zip(days.tolist(), closes.tolist())]
+        )
+        connection.commit()
+        
+        def sqlite_panel():
+            for ticker in universe:
+                fetched = connection.execute(
+                    "SELECT day, close FROM candles WHERE ticker = ? AND day BETWEEN ? AND ? ORDER BY day",
+                    (ticker, START.isoformat(), END.isoformat())
+                ).fetchall()
+                np.array([row[1] for row in fetched], dtype=np.float64)
+        sqlite_ms = best_of(sqlite_panel, 5)
+        connection.close()
+    
+    print(f"universe: {len(universe)} tickers x {len(history['SPY'][0])} days ({rows:,} candles)")
+    print(f"{'bulk write':<34} {write_ms:>10.2f} ms")
+    print(f"{'incremental append (1 day each)':<34} {append_ms:>10.2f} ms")
+    print(f"{'open + map all tickers':<34} {open_ms:>10.2f} ms")
+    print(f"{'1-year slice, all tickers':<34} {slice_ms:>10.2f} ms")
+    print(f"{'10-year close panel':<34} {panel_ms:>10.2f} ms")
+    print(f"{'stored betas (get_sector_stocks)':<34} {betas_ms:>10.2f} ms  ({len(betas)} betas)")
+    print(f"{'10-year panel via SQLite':<34} {sqlite_ms:>10.2f} ms  ({sqlite_ms / panel_ms:.0f}x slower)")
+
+
+if __name__ == "__main__":
+    main()
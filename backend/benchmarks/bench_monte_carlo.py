@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Monte Carlo goal simulation latency.
+
+Simulates 100,000 correlated paths for portfolios of 3 to 20 holdings over
+5 to 30 years, using covariance from the risk engine's (mock) price history,
+and reports the time to draw the paths and summarize them. Also checks that
+the same seed reproduces the same result and that the single-asset median
+matches its closed form.
+
+Usage:
+  python -m benchmarks.bench_monte_carlo
+"""
+
+import time
+import asyncio
+from datetime import date
+
+import numpy as np
+
+from services.finnhub_client import FinnhubClient
+from services.monte_carlo import checkpoint_years, simulate_growth, summarize_growth
+from services.risk import RiskEngine
+
+
+PATHS = 100_000
+AS_OF = date(2025, 12, 31)
+
+
+def main():
+    engine = RiskEngine(FinnhubClient())
+    universe = list(dict.fromkeys(ticker for tickers in FinnhubClient.SECTOR_TICKERS.values() for ticker in tickers))
+    
+    # Closed form: the median of a log-normal asset is exp((mu - sigma^2 / 2) * t)
+    growth = simulate_growth(np.ones(1), np.array([0.08]), np.array([[0.04]]), np.array([10]), PATHS, seed=1)
+    assert abs(np.median(growth) / np.exp(0.06 * 10) - 1) < 0.01
+    
+    print(f"{'holdings':>8} {'years':>6} {'simulate ms':>12} {'summary ms':>11} {'P(goal) %':>10} {'median CAGR %':>14}")
+    for holdings in (3, 9, 15, 20):
+        composition = {ticker: 10 for ticker in universe[::len(universe) // holdings][:holdings]}
+        model = asyncio.run(engine.analyze_composition(composition, AS_OF))["model"]
+        mean = 0.04 + model["betas"] * 0.055
+        for years in (5, 10, 30):
+            checkpoints = checkpoint_years(years)
+            args = (model["weights"], mean, model["covariance"], checkpoints, PATHS, 42)
+            simulate_growth(*args)
+            
+            best_sim, best_summary = float("inf"), float("inf")
+            for _ in range(5):
+                started = time.perf_counter()
+                growth = simulate_growth(*args)
+                simulated = time.perf_counter()
+                summary = summarize_growth(growth, checkpoints, model["value"], 8, years)
+                best_sim = min(best_sim, simulated - started)
+                best_summary = min(best_summary, time.perf_counter() - simulated)
+            assert np.array_equal(growth, simulate_growth(*args))
+            
+            print(
+                f"{holdings:>8} {years:>6} {best_sim * 1000:>12.1f} {best_summary * 1000:>11.1f} "
+                f"{summary['probability']:>10.2f} {summary['median_annual_return']:>14.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark: upstream Finnhub lookups per /api/stock-pick request.
+
+Compares the old graph flow (fetch_stocks node, then StockPicker.pick_stocks
+fetching every sector again) with the current flow where the fetch node feeds
+StockPicker.pick_from_universe directly. Caches are cleared before every
+request so the counts reflect cold-cache upstream traffic.
+
+Usage:
+  python -m benchmarks.bench_stock_pick_calls
+"""
+
+import asyncio
+from collections import Counter
+
+from models.request import StockPickRequest, Goal
+from graph.stock_picker_graph import StockPickerGraph
+
+
+def instrument(client, counter: Counter):
+    """Count quote and profile lookups made through a FinnhubClient."""
+    get_quote = client.get_stock_quote
+    get_profile = client.get_company_profile
+    get_quote_async = client.get_stock_quote_async
+    get_profile_async = client.get_company_profile_async
+    
+    def counted_quote(ticker, *args):
+        counter["quote"] += 1
+        return get_quote(ticker, *args)
+    
+    def counted_profile(ticker, *args):
+        counter["profile"] += 1
+        return get_profile(ticker, *args)
+    
+    async def counted_quote_async(ticker, *args):
+        counter["quote"] += 1
+        return await get_quote_async(ticker, *args)
+    
+    async def counted_profile_async(ticker, *args):
+        counter["profile"] += 1
+        return await get_profile_async(ticker, *args)
+    
+    client.get_stock_quote = counted_quote
+    client.get_company_profile = counted_profile
+    client.get_stock_quote_async = counted_quote_async
+    client.get_company_profile_async = counted_profile_async
+
+
+def reset_caches(client):
+    """Start each request from a cold cache."""
+    client.quote_cache.clear()
+
+
+def old_flow(graph: StockPickerGraph, request: StockPickRequest):
+    """Replicates the previous fetch-then-refetch graph behaviour."""
+    graph.picker.fetch_universe(request.sectors)
+    return graph.picker.pick_stocks(request)
+
+
+def new_flow(graph: StockPickerGraph, request: StockPickRequest):
+    """The current graph: fetched stocks feed filtering and allocation directly."""
+    return asyncio.run(graph.process_request(request))
+
+
+def main():
+    graph = StockPickerGraph()
+    counter = Counter()
+    instrument(graph.picker.finnhub, counter)
+    
+    scenarios = [
+        ["technology"],
+        ["technology", "healthcare"],
+        ["technology", "healthcare", "finance"],
+    ]
+    
+    print(f"{'sectors':<40} {'before':>8} {'after':>8}")
+    for sectors in scenarios:
+        request = StockPickRequest(
+            budget=10000,
+            sectors=sectors,
+            risk_profile="moderate",
+            goal=Goal(target_return=8, duration_years=5)
+        )
+        
+        counter.clear()
+        reset_caches(graph.picker.finnhub)
+        old_flow(graph, request)
+        before = sum(counter.values())
+        
+        counter.clear()
+        reset_caches(graph.picker.finnhub)
+        new_flow(graph, request)
+        after = sum(counter.values())
+        
+        print(f"{', '.join(sectors):<40} {before:>8} {after:>8}")
+
+
+if __name__ == "__main__":
+    main()
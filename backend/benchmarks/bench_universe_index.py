@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark: stock-pick candidates from the universe index vs fetching them.
+
+Builds the index over the universe file and quotes every symbol, then
+compares the candidate step of a 3-sector pick: fetching quotes and profiles
+(warm caches) then filtering and sorting, against slicing the precomputed
+ranking. Also times an incremental update after a handful of quotes change
+and checks that picks from the index match picks from the same records.
+
+Usage:
+  python -m benchmarks.bench_universe_index
+"""
+
+import time
+import asyncio
+
+from models.request import StockPickRequest, VALID_SECTORS
+from services.picker import StockPicker
+
+
+ROUNDS = 200
+
+
+async def main():
+    picker = StockPicker()
+    index = picker.index
+    started = time.perf_counter()
+    rows = await index.rebuild()
+    print(f"full build: {rows} rows in {(time.perf_counter() - started) * 1000:.1f} ms")
+    for _ in range(0, rows, index.quote_batch_size):
+        await index.refresh_quotes()
+    
+    snapshot = index._current()
+    universe = [snapshot.record(row) for row in range(len(snapshot.tickers))]
+    for profile in ("low", "moderate", "high"):
+        for start in range(0, len(VALID_SECTORS), 3):
+            request = StockPickRequest(
+                budget=25000, sectors=VALID_SECTORS[start:start + 3], risk_profile=profile,
+                goal={"target_return": 8, "duration_years": 5}
+            )
+            from_index = picker.pick_from_index(request)[0]
+            from_records = picker.pick_from_universe(request, universe)[0]
+            assert [(r.ticker, r.quantity) for r in from_index] == [(r.ticker, r.quantity) for r in from_records]
+    print("picks from the index match picks from the same records")
+    
+    request = StockPickRequest(
+        budget=25000, sectors=VALID_SECTORS[:3], risk_profile="moderate", goal={"target_return": 8, "duration_years": 5}
+    )
+    await picker.fetch_universe_async(request.sectors)
+    
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        stocks = await picker.fetch_universe_async(request.sectors)
+        picker._sort_stocks(picker._filter_by_risk(stocks, "moderate"), "moderate")
+    fetched = (time.perf_counter() - started) / ROUNDS
+    
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        index.ranked(request.sectors, request.risk_profile, picker.allocator.picks_per_sector)
+    sliced = (time.perf_counter() - started) / ROUNDS
+    print(f"candidates: fetch + filter + sort {fetched * 1e6:.0f} us, index slice {sliced * 1e6:.0f} us")
+    
+    # Five quotes move; the next read applies them and re-ranks only their sectors
+    elapsed = 0.0
+    for round_number in range(ROUNDS):
+        for i, ticker in enumerate(("AAPL", "JNJ", "JPM", "XOM", "NEE")):
+            picker.finnhub._store_quote(ticker, {"c": 100.0 + round_number, "d": 1.0, "dp": (round_number + i) % 7 - 3.0})
+        started = time.perf_counter()
+        index.ranked(request.sectors, request.risk_profile, picker.allocator.picks_per_sector)
+        elapsed += time.perf_counter() - started
+    print(f"incremental update of 5 quotes + slice: {elapsed / ROUNDS * 1e6:.0f} us")
+    print(index.stats())
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark: stock picks over a 5,000-symbol universe.
+
+Writes a synthetic universe file (the checked-in universe padded with
+generated symbols across every sector), builds the universe index over it
+and quotes every symbol in background batches, then times a 3-sector pick
+from the index against filtering and sorting all 5,000 records per request.
+Also times a cross-sector screen, a full rebuild and the incremental update
+after one quote batch moves. Picks from the index must stay under 100 ms at
+the 99th percentile.
+
+Usage:
+  python -m benchmarks.bench_universe_scale
+"""
+
+import os
+import csv
+import time
+import random
+import asyncio
+import tempfile
+
+import numpy as np
+
+from models.request import StockPickRequest, VALID_SECTORS
+from services.finnhub_client import FinnhubClient
+from services.picker import StockPicker
+from services.universe import COLUMNS, load_universe
+from services.universe_index import UniverseIndex
+
+
+SYMBOLS = 5_000
+ROUNDS = 500
+PICK_BUDGET_MS = 100
+
+
+def write_universe(path: str, symbols: int):
+    """Checked-in universe rows first, then generated symbols spread evenly across sectors."""
+    rows = [[row[column] for column in COLUMNS] for row in FinnhubClient.UNIVERSE.rows]
+    for i in range(symbols - len(rows)):
+        sector = VALID_SECTORS[i % len(VALID_SECTORS)]
+        rows.append([f"X{i:05d}", f"Synthetic {i} Inc.", sector, f"Synthetic {sector.title()} {i % 7}", "other"])
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        writer.writerows(rows)
+
+
+def percentiles(samples) -> str:
+    samples = np.array(samples) * 1000
+    return f"p50 {np.percentile(samples, 50):.3f} ms, p99 {np.percentile(samples, 99):.3f} ms"
+
+
+async def main():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "universe_v1.csv")
+        write_universe(path, SYMBOLS)
+        universe = load_universe(path)
+    
+    picker = StockPicker()
+    index = UniverseIndex(picker.finnhub, universe=universe)
+    picker.index = index
+    
+    await index.rebuild()
+    started = time.perf_counter()
+    for _ in range(0, len(universe), index.quote_batch_size):
+        await index.refresh_quotes()
+    quoted = time.perf_counter() - started
+    started = time.perf_counter()
+    await index.rebuild()
+    rebuilt = time.perf_counter() - started
+    print(
+        f"universe {universe.version}: {len(universe)} symbols, {index.quote_batches} quote batches "
+        f"in {quoted * 1000:.0f} ms (mock quotes), full rebuild {rebuilt * 1000:.1f} ms"
+    )
+    
+    rng = random.Random(11)
+    requests = [
+        StockPickRequest(
+            budget=round(10 ** rng.uniform(3, 6), 2), sectors=rng.sample(VALID_SECTORS, 3),
+            risk_profile=rng.choice(("low", "moderate", "high")), goal={"target_return": 8, "duration_years": 5}
+        )
+        for _ in range(ROUNDS)
+    ]
+    assert all(picker._use_index(request) for request in requests)
+    
+    snapshot = index._current()
+    records = [snapshot.record(row) for row in range(len(snapshot.tickers))]
+    
+    from_index, from_records = [], []
+    for request in requests:
+        started = time.perf_counter()
+        picked = picker.pick_from_index(request)[0]
+        from_index.append(time.perf_counter() - started)
+        
+        started = time.perf_counter()
+        expected = picker.pick_from_universe(request, records)[0]
+        from_records.append(time.perf_counter() - started)
+        assert [(r.ticker, r.quantity) for r in picked] == [(r.ticker, r.quantity) for r in expected]
+    print(f"pick from index:              {percentiles(from_index)}")
+    print(f"filter + sort 5,000 records:  {percentiles(from_records)}")
+    
+    screens = []
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        index.screen(rng.choice(("low", "moderate", "high")), min_market_cap=50_000, limit=50)
+        screens.append(time.perf_counter() - started)
+    print(f"screen across all sectors:    {percentiles(screens)}")
+    
+    # One background batch moves; the next pick applies it and re-ranks only the sectors it touches
+    updates = []
+    for round_number in range(ROUNDS // 10):
+        for ticker in rng.sample(universe.tickers, index.quote_batch_size):
+            picker.finnhub._store_quote(ticker, {"c": 50.0 + round_number, "d": 1.0, "dp": rng.uniform(-3, 3)})
+        started = time.perf_counter()
+        picker.pick_from_index(requests[round_number])
+        updates.append(time.perf_counter() - started)
+    print(f"pick after a batch of {index.quote_batch_size} quotes: {percentiles(updates)}")
+    
+    p99 = np.percentile(np.array(from_index + updates) * 1000, 99)
+    assert p99 < PICK_BUDGET_MS, f"p99 pick latency {p99:.1f} ms exceeds {PICK_BUDGET_MS} ms"
+    print(f"picks stay under {PICK_BUDGET_MS} ms at {len(universe)} symbols (p99 {p99:.2f} ms)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
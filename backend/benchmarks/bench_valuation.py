@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark: portfolio valuation, per-holding Python loop vs the vectorized engine.
+
+Values 1, 100 and 10,000 synthetic portfolios (10 holdings each) from a
+fixed price map. "loop" is the previous per-holding repricing, total
+recalculation and sector allocation walk. "engine" builds the columnar
+frame, values everything in one NumPy pass and writes the results back onto
+the models. "arrays only" is the NumPy valuation pass on its own.
+
+Usage:
+  python -m benchmarks.bench_valuation
+"""
+
+import time
+import random
+from typing import Callable, Dict, List
+
+from models.portfolio import Portfolio, PortfolioPreferences, StockHolding
+from services.finnhub_client import FinnhubClient
+from services.valuation import HoldingsFrame, Valuation, value_portfolios
+
+
+HOLDINGS_PER_PORTFOLIO = 10
+
+
+def make_portfolios(count: int, rng: random.Random) -> List[Portfolio]:
+    """Build portfolios drawn from the sector universe."""
+    universe = [(ticker, sector.title()) for sector, tickers in FinnhubClient.SECTOR_TICKERS.items() for ticker in tickers]
+    preferences = PortfolioPreferences(
+        budget=10000, risk_profile="moderate", investment_goal="growth",
+        target_return=8, time_horizon_years=5, preferred_sectors=["technology"]
+    )
+    portfolios = []
+    for i in range(count):
+        holdings = [
+            StockHolding(
+                ticker=ticker, name=ticker, sector=sector,
+                quantity=rng.randint(1, 50), average_price=round(rng.uniform(20, 500), 2)
+            )
+            for ticker, sector in rng.sample(universe, HOLDINGS_PER_PORTFOLIO)
+        ]
+        total_invested = sum(h.quantity * h.average_price for h in holdings)
+        portfolios.append(Portfolio(
+            id=str(i), user_id="bench", name=f"p{i}", preferences=preferences,
+            holdings=holdings, total_invested=total_invested
+        ))
+    return portfolios
+
+
+def loop_valuation(portfolios: List[Portfolio], prices: Dict[str, float]):
+    """The previous per-holding implementation."""
+    for portfolio in portfolios:
+        for holding in portfolio.holdings:
+            price = prices.get(holding.ticker.upper())
+            if price:
+                holding.current_price = price
+                holding.total_value = holding.current_price * holding.quantity
+                cost_basis = holding.average_price * holding.quantity
+                holding.gain_loss = holding.total_value - cost_basis
+                if cost_basis > 0:
+                    holding.gain_loss_percent = (holding.gain_loss / cost_basis) * 100
+        
+        portfolio.current_value = sum(h.total_value or 0 for h in portfolio.holdings)
+        portfolio.total_gain_loss = sum(h.gain_loss or 0 for h in portfolio.holdings)
+        if portfolio.total_invested > 0:
+            portfolio.total_gain_loss_percent = (portfolio.total_gain_loss / portfolio.total_invested) * 100
+        
+        sector_allocation = {}
+        for holding in portfolio.holdings:
+            sector_allocation[holding.sector] = sector_allocation.get(holding.sector, 0) + (holding.total_value or 0)
+        if portfolio.current_value > 0:
+            sector_allocation = {k: v / portfolio.current_value * 100 for k, v in sector_allocation.items()}
+
+
+def engine_valuation(portfolios: List[Portfolio], prices: Dict[str, float]):
+    """Vectorized valuation including model write-back."""
+    valuation = value_portfolios(portfolios, prices)
+    valuation.write_portfolios(portfolios)
+
+
+def best_of(fn: Callable[[], None], repeats: int) -> float:
+    """Best wall time in milliseconds over several runs."""
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main():
+    rng = random.Random(7)
+    tickers = [ticker for tickers in FinnhubClient.SECTOR_TICKERS.values() for ticker in tickers]
+    prices = {ticker: round(rng.uniform(20, 600), 2) for ticker in tickers}
+    
+    print(f"{'portfolios':>10} {'holdings':>9} {'loop ms':>10} {'engine ms':>10} {'arrays only ms':>15} {'speedup':>8}")
+    for count in (1, 100, 10_000):
+        portfolios = make_portfolios(count, rng)
+        repeats = 5 if count >= 10_000 else 50
+        
+        loop_ms = best_of(lambda: loop_valuation(portfolios, prices), repeats)
+        engine_ms = best_of(lambda: engine_valuation(portfolios, prices), repeats)
+        
+        frame = HoldingsFrame.from_portfolios(portfolios)
+        frame.apply_prices(prices)
+        arrays_ms = best_of(lambda: Valuation(frame), repeats)
+        
+        # Both paths must agree
+        check = make_portfolios(min(count, 100), random.Random(count))
+        expected = [p.model_copy(deep=True) for p in check]
+        loop_valuation(expected, prices)
+        engine_valuation(check, prices)
+        assert all(abs(a.current_value - b.current_value) < 1e-6 for a, b in zip(expected, check))
+        
+        print(
+            f"{count:>10} {count * HOLDINGS_PER_PORTFOLIO:>9} {loop_ms:>10.2f} {engine_ms:>10.2f} "
+            f"{arrays_ms:>15.2f} {loop_ms / engine_ms:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
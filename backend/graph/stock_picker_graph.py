@@ -1,4 +1,8 @@
-from typing import Dict, Any, List
+import time
+import asyncio
+import inspect
+from typing import Dict, Any, List, Callable
+from typing_extensions import Annotated
 from langgraph.graph import StateGraph
 from pydantic import BaseModel, Field
 
@@ -8,6 +12,11 @@ from services.picker import StockPicker
 from services.openai_agent import OpenAIAgent
 
 
+def merge_timings(current: Dict[str, float], update: Dict[str, float]) -> Dict[str, float]:
+    """Reducer so parallel nodes can each record their own timing."""
+    return {**(current or {}), **(update or {})}
+
+
 class StockPickerState(BaseModel):
     """State for the stock picker graph."""
     request: StockPickRequest = Field(..., description="The original request")
@@ -17,6 +26,9 @@ class StockPickerState(BaseModel):
     remaining_cash: float = Field(default=0.0, description="Remaining cash")
     summary: str = Field(default="", description="Portfolio summary")
     errors: List[str] = Field(default_factory=list, description="Any errors encountered")
+    node_timings: Annotated[Dict[str, float], merge_timings] = Field(
+        default_factory=dict, description="Milliseconds spent in each node"
+    )
 
 
 class StockPickerGraph:
@@ -25,6 +37,7 @@ class StockPickerGraph:
     def __init__(self):
         self.picker = StockPicker()
         self.openai_agent = OpenAIAgent()
+        self.node_stats: Dict[str, Dict[str, float]] = {}
         self.graph = self._build_graph()
     
     def _build_graph(self) -> StateGraph:
@@ -34,18 +47,18 @@ class StockPickerGraph:
         workflow = StateGraph(StockPickerState)
         
         # Add nodes
-        workflow.add_node("validate_input", self._validate_input)
-        workflow.add_node("fetch_stocks", self._fetch_stocks)
-        workflow.add_node("filter_and_allocate", self._filter_and_allocate)
-        workflow.add_node("enhance_reasoning", self._enhance_reasoning)
-        workflow.add_node("generate_summary", self._generate_summary)
-        workflow.add_node("handle_error", self._handle_error)
+        workflow.add_node("validate_input", self._timed("validate_input", self._validate_input))
+        workflow.add_node("fetch_stocks", self._timed("fetch_stocks", self._fetch_stocks))
+        workflow.add_node("filter_and_allocate", self._timed("filter_and_allocate", self._filter_and_allocate))
+        workflow.add_node("enhance_reasoning", self._timed("enhance_reasoning", self._enhance_reasoning))
+        workflow.add_node("generate_summary", self._timed("generate_summary", self._generate_summary))
+        workflow.add_node("finalize", self._timed("finalize", self._finalize))
+        workflow.add_node("handle_error", self._timed("handle_error", self._handle_error))
         
-        # Define edges
-        workflow.add_edge("validate_input", "fetch_stocks")
-        workflow.add_edge("fetch_stocks", "filter_and_allocate")
+        # The two LLM stages are independent: fan out after allocation, join before the response
         workflow.add_edge("filter_and_allocate", "enhance_reasoning")
-        workflow.add_edge("enhance_reasoning", "generate_summary")
+        workflow.add_edge("filter_and_allocate", "generate_summary")
+        workflow.add_edge(["enhance_reasoning", "generate_summary"], "finalize")
         
         # Add conditional edges for error handling
         workflow.add_conditional_edges(
@@ -68,11 +81,51 @@ class StockPickerGraph:
         
         # Set entry and exit points
         workflow.set_entry_point("validate_input")
-        workflow.set_finish_point("generate_summary")
+        workflow.set_finish_point("finalize")
         workflow.set_finish_point("handle_error")
         
         return workflow.compile()
     
+    def _timed(self, name: str, node: Callable) -> Callable:
+        """Wrap a node so its wall-clock time is recorded in state.node_timings."""
+        
+        def record(result: Any, started: float) -> Any:
+            elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+            if isinstance(result, dict):
+                return {**result, "node_timings": {name: elapsed_ms}}
+            result.node_timings = {**result.node_timings, name: elapsed_ms}
+            return result
+        
+        if inspect.iscoroutinefunction(node):
+            async def timed_async(state: StockPickerState):
+                started = time.perf_counter()
+                return record(await node(state), started)
+            return timed_async
+        
+        def timed(state: StockPickerState):
+            started = time.perf_counter()
+            return record(node(state), started)
+        return timed
+    
+    def _record_timings(self, timings: Dict[str, float], total_ms: float):
+        """Accumulate per-node timings across requests."""
+        for name, elapsed_ms in {**timings, "total": total_ms}.items():
+            stats = self.node_stats.setdefault(name, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            stats["count"] += 1
+            stats["total_ms"] += elapsed_ms
+            stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """Return average and max time per node."""
+        return {
+            name: {
+                "count": stats["count"],
+                "avg_ms": round(stats["total_ms"] / stats["count"], 2),
+                "max_ms": round(stats["max_ms"], 2)
+            }
+            for name, stats in self.node_stats.items()
+        }
+    
     async def process_request(self, request: StockPickRequest) -> StockPickResponse:
         """Process a stock picking request through the graph."""
         
@@ -80,8 +133,10 @@ class StockPickerGraph:
         initial_state = StockPickerState(request=request)
         
         try:
-            # Run the graph
-            result = await self.graph.ainvoke(initial_state)
+            # Run the graph (returns the final state as a dict)
+            started = time.perf_counter()
+            result = StockPickerState(**await self.graph.ainvoke(initial_state))
+            self._record_timings(result.node_timings, round((time.perf_counter() - started) * 1000, 2))
             
             # Return the response
             return StockPickResponse(
@@ -125,17 +180,14 @@ class StockPickerGraph:
         
         return state
     
-    def _fetch_stocks(self, state: StockPickerState) -> StockPickerState:
-        """Fetch stock data for the requested sectors."""
+    async def _fetch_stocks(self, state: StockPickerState) -> StockPickerState:
+        """Fetch stock data for the requested sectors (from the universe index once it is built)."""
         
         try:
             request = state.request
-            stocks_data = []
             
-            for sector in request.sectors:
-                print(f"📈 Fetching stocks for sector: {sector}")
-                sector_stocks = self.picker.finnhub.get_sector_stocks(sector, limit=5)
-                stocks_data.extend(sector_stocks)
+            print(f"📈 Fetching stocks for sectors: {', '.join(request.sectors)}")
+            stocks_data = await self.picker.fetch_candidates_async(request)
             
             state.stocks_data = stocks_data
             print(f"✅ Fetched {len(stocks_data)} stocks across {len(request.sectors)} sectors")
@@ -151,8 +203,10 @@ class StockPickerGraph:
         try:
             request = state.request
             
-            # Use the picker to filter and allocate
-            recommendations, total_allocated, remaining_cash = self.picker.pick_stocks(request)
+            # Filter and allocate over the stocks fetched by the previous node
+            recommendations, total_allocated, remaining_cash = self.picker.pick_from_universe(
+                request, state.stocks_data
+            )
             
             state.recommendations = recommendations
             state.total_allocated = total_allocated
@@ -165,49 +219,56 @@ class StockPickerGraph:
         
         return state
     
-    def _enhance_reasoning(self, state: StockPickerState) -> StockPickerState:
+    async def _enhance_reasoning(self, state: StockPickerState) -> Dict[str, Any]:
         """Enhance stock justifications using OpenAI if available."""
         
+        # Runs in parallel with generate_summary, so only return the keys this node owns
         try:
             request = state.request
-            recommendations = state.recommendations
+            recommendations = [rec.model_copy() for rec in state.recommendations]
             
-            # Enhance justifications with OpenAI
-            enhanced_recommendations = self.openai_agent.enhance_stock_justifications(
-                request, recommendations
+            # Enhance justifications with OpenAI (sync SDK, so keep it off the event loop)
+            enhanced_recommendations = await asyncio.to_thread(
+                self.openai_agent.enhance_stock_justifications, request, recommendations
             )
             
-            state.recommendations = enhanced_recommendations
             print(f"✅ Enhanced reasoning for {len(enhanced_recommendations)} recommendations")
+            return {"recommendations": enhanced_recommendations}
             
         except Exception as e:
             print(f"⚠️ Reasoning enhancement failed: {str(e)}")
             # Not critical, continue with basic justifications
-        
-        return state
+            return {}
     
-    def _generate_summary(self, state: StockPickerState) -> StockPickerState:
+    async def _generate_summary(self, state: StockPickerState) -> Dict[str, Any]:
         """Generate portfolio summary using OpenAI if available."""
         
+        # The summary prompt only needs tickers, quantities and prices, so it
+        # does not wait for enhanced justifications
         try:
             request = state.request
             recommendations = state.recommendations
             total_allocated = state.total_allocated
             remaining_cash = state.remaining_cash
             
-            # Generate summary
-            summary = self.openai_agent.generate_portfolio_reasoning(
+            # Generate summary (sync SDK, so keep it off the event loop)
+            summary = await asyncio.to_thread(
+                self.openai_agent.generate_portfolio_reasoning,
                 request, recommendations, total_allocated, remaining_cash
             )
             
-            state.summary = summary or "Portfolio created successfully"
             print(f"✅ Generated portfolio summary")
+            return {"summary": summary or "Portfolio created successfully"}
             
         except Exception as e:
             print(f"⚠️ Summary generation failed: {str(e)}")
-            state.summary = "Portfolio created successfully"
-        
-        return state
+            return {"summary": "Portfolio created successfully"}
+    
+    def _finalize(self, state: StockPickerState) -> Dict[str, Any]:
+        """Join point for the parallel LLM stages."""
+        timings = ", ".join(f"{name}={ms:.0f}ms" for name, ms in state.node_timings.items())
+        print(f"✅ Stock pick complete ({timings})")
+        return {}
     
     def _handle_error(self, state: StockPickerState) -> StockPickerState:
         """Handle errors in the workflow."""
@@ -238,10 +299,11 @@ class StockPickerGraph:
             print("🔄 Using fallback processing")
             
             # Direct processing without graph
-            recommendations, total_allocated, remaining_cash = self.picker.pick_stocks(request)
+            recommendations, total_allocated, remaining_cash = await self.picker.pick_stocks_async(request)
             
             # Generate basic summary
-            summary = self.openai_agent.generate_portfolio_reasoning(
+            summary = await asyncio.to_thread(
+                self.openai_agent.generate_portfolio_reasoning,
                 request, recommendations, total_allocated, remaining_cash
             )
             
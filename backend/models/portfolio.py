@@ -73,6 +73,26 @@ class ChatMessage(BaseModel):
     metadata: Optional[Dict[str, Any]] = Field(default={}, description="Additional metadata")
 
 
+class GoalSimulation(BaseModel):
+    """Monte Carlo estimate of reaching a target return"""
+    probability: float = Field(..., description="% of paths reaching the target value")
+    probability_of_loss: float = Field(..., description="% of paths ending below the starting value")
+    target_return: float = Field(..., description="Target annual return %")
+    horizon_years: int = Field(..., description="Years simulated")
+    initial_value: float = Field(..., description="Starting portfolio value")
+    target_value: float = Field(..., description="Value needed at the horizon")
+    median_final_value: float
+    mean_final_value: float
+    median_annual_return: float
+    expected_annual_return: float = Field(..., description="Expected annual return % (CAPM)")
+    annual_volatility: float = Field(..., description="Annualized volatility % from price history")
+    years: List[int] = Field(..., description="Years at which percentile bands are reported")
+    percentiles: Dict[str, List[float]] = Field(..., description="Portfolio value bands (p5..p95) per year")
+    paths: int
+    seed: int
+    as_of: str
+
+
 class PortfolioAnalysis(BaseModel):
     """Portfolio analysis response"""
     portfolio_id: str
@@ -82,6 +102,10 @@ class PortfolioAnalysis(BaseModel):
     gain_loss_percent: float
     sector_allocation: Dict[str, float]
     risk_metrics: Dict[str, float]
+    holding_risk: Optional[Dict[str, Dict[str, float]]] = None
+    correlation_matrix: Optional[Dict[str, Dict[str, float]]] = None
+    covariance_matrix: Optional[Dict[str, Dict[str, float]]] = None
+    goal_simulation: Optional[GoalSimulation] = None
     recommendations: List[str]
     last_updated: datetime
 
@@ -3,6 +3,21 @@ from typing import List, Optional
 from enum import Enum
 
 
+VALID_SECTORS = [
+    "technology", "healthcare", "finance", "consumer", "energy", 
+    "utilities", "materials", "industrials", "telecommunications", "real_estate"
+]
+
+
+def validate_sector_names(sectors: List[str]) -> List[str]:
+    """Check sectors against the supported universe and normalize to lower case."""
+    for sector in sectors:
+        if sector.lower() not in VALID_SECTORS:
+            raise ValueError(f"Invalid sector: {sector}. Valid sectors: {', '.join(VALID_SECTORS)}")
+    
+    return [sector.lower() for sector in sectors]
+
+
 class RiskProfile(str, Enum):
     LOW = "low"
     MODERATE = "moderate"
@@ -23,19 +38,45 @@ class StockPickRequest(BaseModel):
     
     @validator('sectors')
     def validate_sectors(cls, v):
-        valid_sectors = [
-            "technology", "healthcare", "finance", "consumer", "energy", 
-            "utilities", "materials", "industrials", "telecommunications", "real_estate"
-        ]
-        
-        for sector in v:
-            if sector.lower() not in valid_sectors:
-                raise ValueError(f"Invalid sector: {sector}. Valid sectors: {', '.join(valid_sectors)}")
-        
-        return [sector.lower() for sector in v]
+        return validate_sector_names(v)
     
     @validator('budget')
     def validate_budget(cls, v):
         if v < 100:
             raise ValueError("Minimum budget is $100")
-        return v 
\ No newline at end of file
+        return v 
+
+
+class RebalanceFrequency(str, Enum):
+    DAILY = "daily"
+    WEEKLY = "weekly"
+    MONTHLY = "monthly"
+    QUARTERLY = "quarterly"
+    NEVER = "never"
+
+
+class BacktestRequest(BaseModel):
+    budget: float = Field(10000, gt=0, description="Starting capital in USD")
+    sectors: List[str] = Field(..., min_items=1, max_items=10, description="Sectors to replay (max 10)")
+    risk_profile: RiskProfile = Field(..., description="Risk tolerance level")
+    goal: Goal = Field(..., description="Target return and horizon to measure against")
+    years: int = Field(10, ge=1, le=15, description="Years of history to replay")
+    rebalance: RebalanceFrequency = Field(
+        RebalanceFrequency.DAILY, description="How often to re-run the picker and rebalance if its picks change"
+    )
+    
+    @validator('sectors')
+    def validate_sectors(cls, v):
+        return validate_sector_names(v)
+
+
+class SimulationHolding(BaseModel):
+    ticker: str = Field(..., description="Stock ticker symbol")
+    quantity: int = Field(..., gt=0, description="Number of shares")
+
+
+class GoalSimulationRequest(BaseModel):
+    holdings: List[SimulationHolding] = Field(..., min_items=1, max_items=50, description="Holdings to simulate")
+    goal: Goal = Field(..., description="Target return and horizon")
+    paths: int = Field(100000, ge=1000, le=1000000, description="Number of simulated paths")
+    seed: int = Field(42, ge=0, description="Random seed; the same request and seed give the same result")
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 
 class StockRecommendation(BaseModel):
@@ -16,4 +16,27 @@ class StockPickResponse(BaseModel):
     portfolio: List[StockRecommendation]
     total_allocated: float
     remaining_cash: float
-    summary: Optional[str] = None 
\ No newline at end of file
+    summary: Optional[str] = None 
+
+
+class BacktestResponse(BaseModel):
+    start_date: str
+    end_date: str
+    initial_value: float
+    final_value: float
+    total_return: float
+    cagr: float
+    max_drawdown: float
+    annualized_volatility: float
+    target_return: float
+    meets_target: bool
+    hit_rate: Optional[float] = None
+    horizon_years: int
+    rebalances: int
+    benchmark: str
+    benchmark_cagr: Optional[float] = None
+    final_holdings: Dict[str, int]
+    final_cash: float
+    dates: List[str]
+    equity_curve: List[float]
+    benchmark_curve: List[float]
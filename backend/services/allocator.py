@@ -0,0 +1,245 @@
+import math
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Sequence, Tuple
+
+
+Allocation = List[Tuple[Dict[str, Any], int]]
+
+
+class Allocator(ABC):
+    """Turns ranked candidate stocks and a budget into whole-share quantities.
+    
+    Stocks arrive sorted best-first; the top ``picks_per_sector`` of each
+    requested sector are eligible. ``allocate`` returns (stock, quantity)
+    pairs in recommendation order, omitting stocks that get no shares.
+    """
+    
+    name = "base"
+    picks_per_sector = 3
+    
+    @abstractmethod
+    def allocate(self, stocks: List[Dict[str, Any]], budget: float, sectors: List[str]) -> Allocation:
+        ...
+    
+    def select(self, stocks: List[Dict[str, Any]], sectors: List[str]) -> List[Tuple[str, List[Dict[str, Any]]]]:
+        """(sector, top picks) for each requested sector with candidates, keeping the ranked order."""
+        stocks_by_sector: Dict[str, List[Dict[str, Any]]] = {}
+        for stock in stocks:
+            stocks_by_sector.setdefault(stock["sector"].lower(), []).append(stock)
+        return [
+            (sector, stocks_by_sector[sector][:self.picks_per_sector])
+            for sector in sectors if stocks_by_sector.get(sector)
+        ]
+
+
+class GreedyAllocator(Allocator):
+    """Equal budget per sector and per stock, each floored to whole shares."""
+    
+    name = "greedy"
+    
+    def allocate(self, stocks: List[Dict[str, Any]], budget: float, sectors: List[str]) -> Allocation:
+        if not stocks:
+            return []
+        
+        allocation = []
+        remaining_budget = budget
+        
+        # Allocate budget per sector first
+        budget_per_sector = budget / len(sectors)
+        
+        for sector, selected_stocks in self.select(stocks, sectors):
+            sector_budget = min(budget_per_sector, remaining_budget)
+            stock_budget = sector_budget / len(selected_stocks)
+            
+            for stock in selected_stocks:
+                if remaining_budget <= 0:
+                    break
+                
+                price = stock["price"]
+                if price <= 0:
+                    continue
+                
+                # Calculate quantity (minimum 1 share)
+                max_quantity = int(min(stock_budget, remaining_budget) / price)
+                quantity = max(1, max_quantity) if max_quantity > 0 else 0
+                
+                if quantity > 0 and (quantity * price) <= remaining_budget:
+                    allocation.append((stock, quantity))
+                    remaining_budget -= (quantity * price)
+        
+        return allocation
+
+
+class OptimizedAllocator(Allocator):
+    """Whole-share allocation that minimizes leftover cash while tracking sector weights.
+    
+    Each sector with candidates gets an equal share of the budget, split
+    across its picks either equally or by risk parity (inverse beta). Share
+    counts are then chosen jointly by ``allocate_whole_shares`` rather than
+    floored one stock at a time, so an expensive stock can still get a share
+    and leftover cash is spent on the stocks furthest below target.
+    """
+    
+    name = "optimized"
+    
+    def __init__(self, weighting: str = "risk_parity", deviation_penalty: float = 0.5, max_nodes: int = 20_000):
+        if weighting not in ("equal", "risk_parity"):
+            raise ValueError(f"Unknown weighting: {weighting}")
+        self.weighting = weighting
+        self.deviation_penalty = deviation_penalty
+        self.max_nodes = max_nodes
+    
+    def allocate(self, stocks: List[Dict[str, Any]], budget: float, sectors: List[str]) -> Allocation:
+        selected = [
+            [stock for stock in sector_stocks if stock["price"] > 0]
+            for _, sector_stocks in self.select(stocks, list(dict.fromkeys(sectors)))
+        ]
+        selected = [sector_stocks for sector_stocks in selected if sector_stocks]
+        if not selected:
+            return []
+        
+        # Sectors without candidates hand their share to the others rather than sitting in cash
+        candidates, targets = [], []
+        sector_budget = budget / len(selected)
+        for sector_stocks in selected:
+            weights = self._weights(sector_stocks)
+            for stock, weight in zip(sector_stocks, weights):
+                candidates.append(stock)
+                targets.append(sector_budget * weight)
+        
+        quantities = allocate_whole_shares(
+            [stock["price"] for stock in candidates], targets, budget, self.deviation_penalty, self.max_nodes
+        )
+        return [(stock, quantity) for stock, quantity in zip(candidates, quantities) if quantity > 0]
+    
+    def _weights(self, stocks: List[Dict[str, Any]]) -> List[float]:
+        """Within-sector weights summing to 1."""
+        if self.weighting == "equal":
+            return [1 / len(stocks)] * len(stocks)
+        # Beta is the risk measure every candidate carries; floor it so near-zero betas don't dominate
+        inverse_risk = [1 / max(stock.get("beta", 1.0), 0.25) for stock in stocks]
+        total = sum(inverse_risk)
+        return [value / total for value in inverse_risk]
+
+
+def allocate_whole_shares(
+    prices: Sequence[float],
+    targets: Sequence[float],
+    budget: float,
+    deviation_penalty: float = 0.5,
+    max_nodes: int = 20_000,
+    tolerance: float = 1e-4
+) -> List[int]:
+    """
+    Branch-and-bound over whole-share quantities.
+    
+    Minimizes  leftover cash + deviation_penalty * sum(|shares * price - target|)
+    subject to total spend <= budget. With a penalty below 1 every extra dollar
+    invested lowers the objective, so cash is spent wherever possible, first on
+    the stocks furthest below target. Quantities are searched within one
+    maximum share price of each target, expensive stocks first. The bound
+    charges the fixed stocks' deviations plus the larger of the rounding the
+    rest cannot avoid and the net overshoot they would have to absorb.
+    Branches that cannot beat the best found by more than tolerance * budget
+    are pruned, and the search stops at max_nodes.
+    
+    Returns: quantities aligned with prices
+    """
+    n = len(prices)
+    if n == 0:
+        return []
+    penalty = deviation_penalty
+    order = sorted(range(n), key=lambda i: -prices[i])
+    p = [prices[i] for i in order]
+    t = [targets[i] for i in order]
+    widest = p[0]
+    
+    # Candidate quantities for each stock, closest to its target first
+    options, highs = [], []
+    for price, target in zip(p, t):
+        low = max(0, math.floor((target - widest) / price))
+        high = min(math.floor(budget / price), math.floor((target + widest) / price) + 1)
+        options.append(sorted(range(low, high + 1), key=lambda q: abs(q * price - target)))
+        highs.append(high)
+    
+    # Deviation no choice can avoid: each target's distance to the nearest whole-share amount, summed over later stocks
+    unavoidable = [0.0] * (n + 1)
+    for i in range(n - 1, -1, -1):
+        if t[i] >= highs[i] * p[i]:
+            nearest = t[i] - highs[i] * p[i]
+        else:
+            nearest = min(t[i] % p[i], p[i] - t[i] % p[i])
+        unavoidable[i] = unavoidable[i + 1] + nearest
+    
+    # Incumbent: every stock floored to its target (the greedy answer), then leftover cash
+    # spent one share at a time wherever it lowers the objective most
+    best_quantities = [min(math.floor(target / price), math.floor(budget / price)) for price, target in zip(p, t)]
+    if sum(q * price for q, price in zip(best_quantities, p)) > budget:
+        best_quantities = [0] * n
+    remaining = budget - sum(q * price for q, price in zip(best_quantities, p))
+    while True:
+        gains = [
+            (price - penalty * (abs((q + 1) * price - target) - abs(q * price - target)), i)
+            for i, (q, price, target) in enumerate(zip(best_quantities, p, t)) if price <= remaining
+        ]
+        if not gains:
+            break
+        _, i = max(gains)
+        best_quantities[i] += 1
+        remaining -= p[i]
+    best = remaining + penalty * sum(abs(q * price - target) for q, price, target in zip(best_quantities, p, t))
+    
+    gap = tolerance * budget
+    quantities = [0] * n
+    nodes = 0
+    last = n - 1
+    
+    def search(i: int, spent: float, deviation: float, overshoot: float):
+        nonlocal best, best_quantities, nodes
+        nodes += 1
+        remaining = budget - spent
+        if i == last:
+            # Objective falls with every share of the last stock, so buy as many as fit
+            price, target = p[i], t[i]
+            q = max(0, min(highs[i], math.floor(remaining / price)))
+            cost = (remaining - q * price) + penalty * (deviation + abs(q * price - target))
+            if cost < best:
+                best = cost
+                quantities[i] = q
+                best_quantities = list(quantities)
+            return
+        
+        price, target, rest = p[i], t[i], unavoidable[i + 1]
+        for q in options[i]:
+            if nodes >= max_nodes:
+                return
+            outlay = q * price
+            over = outlay - target
+            # Options come closest-first, so once this stock's own deviation rules it out so does every later one
+            if penalty * (deviation + abs(over) + rest) >= best - gap:
+                break
+            if outlay > remaining or penalty * (deviation + abs(over) + max(rest, abs(overshoot + over))) >= best - gap:
+                continue
+            quantities[i] = q
+            search(i + 1, spent + outlay, deviation + abs(over), overshoot + over)
+        quantities[i] = 0
+    
+    search(0, 0.0, 0.0, 0.0)
+    
+    result = [0] * n
+    for position, i in enumerate(order):
+        result[i] = best_quantities[position]
+    return result
+
+
+ALLOCATORS = {
+    GreedyAllocator.name: GreedyAllocator,
+    OptimizedAllocator.name: OptimizedAllocator
+}
+
+
+def get_allocator(name: str) -> Allocator:
+    """Build an allocator by name ("greedy" or "optimized")."""
+    if name not in ALLOCATORS:
+        raise ValueError(f"Unknown allocator: {name}. Available: {', '.join(ALLOCATORS)}")
+    return ALLOCATORS[name]()
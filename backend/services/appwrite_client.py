@@ -1,4 +1,5 @@
 import os
+import asyncio
 from typing import List, Optional, Dict, Any
 from appwrite.client import Client
 from appwrite.services.databases import Databases
@@ -176,8 +177,9 @@ class AppwriteClient:
         if not self.client:
             return self._mock_save_chat_message(message)
         
+        # An id set by the caller keeps retries of the same message from creating duplicates
+        message_id = message.id or str(uuid.uuid4())
         try:
-            message_id = str(uuid.uuid4())
             message_data = {
                 "portfolio_id": message.portfolio_id,
                 "user_id": message.user_id,
@@ -187,7 +189,9 @@ class AppwriteClient:
                 "metadata": json.dumps(message.metadata or {})
             }
             
-            result = self.databases.create_document(
+            # The SDK call is blocking; keep it off the event loop so queued writes overlap
+            result = await asyncio.to_thread(
+                self.databases.create_document,
                 database_id=self.database_id,
                 collection_id="chat_messages",
                 document_id=message_id,
@@ -197,6 +201,9 @@ class AppwriteClient:
             return result["$id"]
             
         except AppwriteException as e:
+            if e.code == 409:
+                # An earlier attempt was stored even though the client saw it fail
+                return message_id
             print(f"❌ Failed to save chat message: {str(e)}")
             return None
     
@@ -309,7 +316,7 @@ class AppwriteClient:
     
     def _mock_save_chat_message(self, message: ChatMessage) -> str:
         """Mock chat message save"""
-        message_id = str(uuid.uuid4())
+        message_id = message.id or str(uuid.uuid4())
         print(f"📝 Mock: Saved chat message {message_id}")
         return message_id
     
@@ -0,0 +1,418 @@
+import asyncio
+import os
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from models.request import BacktestRequest, RebalanceFrequency
+from models.response import BacktestResponse
+from .allocator import Allocator, GreedyAllocator, get_allocator
+from .finnhub_client import FinnhubClient
+
+
+TRADING_DAYS = 252
+
+# Longest replay a BacktestRequest allows
+MAX_HISTORY_YEARS = 15
+
+
+class PriceHistory:
+    """Aligned daily closes for a ticker universe plus the benchmark."""
+    
+    def __init__(self, days: np.ndarray, closes: np.ndarray, market: np.ndarray):
+        self.days = days
+        self.closes = closes
+        self.market = market
+
+
+class Backtester:
+    """Replays StockPicker's selection rules over historical prices.
+    
+    Every day of history is turned into the same inputs the live picker
+    sees - beta, market cap and daily change per candidate - as (days x
+    tickers) matrices, and the picker's risk filter, sort order and top
+    picks per sector are applied to all days at once. Candidates are
+    every universe symbol in the requested sectors, the same set the
+    universe index ranks for live picks. On check days when its picks
+    change the portfolio is rebalanced by the same allocator live picks use
+    (``STOCK_ALLOCATOR`` unless one is passed in; the greedy one runs
+    vectorized), and it is valued with one gather over the price matrix.
+    
+    Prices come only from local data: the candle store when there is a
+    Finnhub key, otherwise the deterministic mock history, so a backtest
+    never calls upstream APIs. ``keep_history_current`` fills the store in
+    the background.
+    """
+    
+    # Same window the live stored betas use (one year of trading days)
+    beta_window = TRADING_DAYS
+    min_beta_observations = 60
+    
+    def __init__(
+        self,
+        finnhub: FinnhubClient,
+        benchmark: str = "SPY",
+        candidates_per_sector: Optional[int] = None,
+        allocator: Optional[Allocator] = None
+    ):
+        self.finnhub = finnhub
+        self.benchmark = benchmark
+        self.candidates_per_sector = candidates_per_sector
+        # Same default as StockPicker so the replay follows the strategy users are served
+        self.allocator = allocator or get_allocator(os.getenv("STOCK_ALLOCATOR", "optimized"))
+    
+    def universe(self, sectors: List[str]) -> Tuple[List[str], np.ndarray]:
+        """
+        Candidate tickers for the sectors: every symbol the universe index
+        ranks, or only each sector's first ``candidates_per_sector`` (the
+        picker's per-request fallback) when that is set.
+        Returns: (tickers, sector index of each ticker)
+        """
+        tickers, codes = [], []
+        for code, sector in enumerate(sectors):
+            candidates = list(dict.fromkeys(FinnhubClient.SECTOR_TICKERS.get(sector, [])))
+            for ticker in candidates[:self.candidates_per_sector]:
+                tickers.append(ticker)
+                codes.append(code)
+        return tickers, np.array(codes, dtype=np.int64)
+    
+    def load_history(self, tickers: List[str], start: date, end: date) -> Optional[PriceHistory]:
+        """Load closes for the tickers and benchmark from local data only."""
+        symbols = tickers + [self.benchmark]
+        if self.finnhub.candle_store is not None:
+            days, panel = self.finnhub.candle_store.get_panel(symbols, start, end)
+        else:
+            series = [self.finnhub._get_mock_closes(ticker, start, end) for ticker in symbols]
+            days = series[0][0]
+            panel = np.column_stack([closes for _, closes in series])
+        
+        # Only days the benchmark traded; a stock's gaps stay NaN
+        traded = np.isfinite(panel[:, -1])
+        if traded.sum() <= self.beta_window:
+            return None
+        return PriceHistory(days[traded], panel[traded, :-1], panel[traded, -1])
+    
+    def market_caps(self, tickers: List[str]) -> np.ndarray:
+        """Current market cap per ticker from local profiles (0 when unknown, as in live picks)."""
+        caps = []
+        for ticker in tickers:
+            if not self.finnhub.api_key:
+                profile = self.finnhub._get_mock_profile(ticker)
+            else:
+                profile, _ = self.finnhub.profile_store.get(ticker)
+            caps.append((profile or {}).get("marketCapitalization", 0) or 0)
+        return np.array(caps, dtype=np.float64)
+    
+    def rolling_betas(self, returns: np.ndarray, market: np.ndarray) -> np.ndarray:
+        """Trailing-window beta of every column vs the market for every day, via cumulative sums."""
+        valid = np.isfinite(returns) & np.isfinite(market)[:, None]
+        x = np.where(valid, returns, 0.0)
+        y = np.where(valid, market[:, None], 0.0)
+        
+        def rolling_sum(values: np.ndarray) -> np.ndarray:
+            totals = np.cumsum(np.vstack([np.zeros((1, values.shape[1])), values]), axis=0)
+            window = np.minimum(np.arange(1, len(values) + 1), self.beta_window)
+            return totals[1:] - totals[np.arange(1, len(values) + 1) - window]
+        
+        n = rolling_sum(valid.astype(np.float64))
+        sum_x, sum_y = rolling_sum(x), rolling_sum(y)
+        sum_xy, sum_yy = rolling_sum(x * y), rolling_sum(y * y)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            betas = (sum_xy - sum_x * sum_y / n) / (sum_yy - sum_y * sum_y / n)
+        betas[n < self.min_beta_observations] = np.nan
+        # Live betas are rounded to 2 places before the picker's thresholds see them
+        return np.round(betas, 2)
+    
+    def select(
+        self,
+        risk_profile: str,
+        betas: np.ndarray,
+        caps: np.ndarray,
+        change: np.ndarray,
+        eligible: np.ndarray,
+        sector_codes: np.ndarray,
+        n_sectors: int
+    ) -> np.ndarray:
+        """
+        The picker's filter, sort and top picks per sector for every day at once.
+        Returns: (days x tickers) boolean selection
+        """
+        ranks = self.rank(risk_profile, betas, caps, change, eligible, sector_codes, n_sectors)
+        return ranks < self.allocator.picks_per_sector
+    
+    def rank(
+        self,
+        risk_profile: str,
+        betas: np.ndarray,
+        caps: np.ndarray,
+        change: np.ndarray,
+        eligible: np.ndarray,
+        sector_codes: np.ndarray,
+        n_sectors: int
+    ) -> np.ndarray:
+        """
+        Each stock's place in its sector under the picker's filter and sort for every day at once.
+        Returns: (days x tickers) ranks from 0, with filtered-out stocks ranked past every sector
+        """
+        # StockPicker._filter_by_risk
+        if risk_profile == "low":
+            keep = betas < 1.0
+        elif risk_profile == "moderate":
+            keep = (betas >= 0.8) & (betas <= 1.3)
+        else:
+            keep = np.ones_like(eligible)
+        keep &= eligible
+        
+        # StockPicker._sort_stocks keys (ascending), most significant last for lexsort
+        if risk_profile == "low":
+            keys = (betas, -caps)
+        elif risk_profile == "moderate":
+            keys = (-np.abs(change), -caps)
+        else:
+            keys = (-change,)
+        
+        ranks = np.full(keep.shape, keep.shape[1], dtype=np.int64)
+        for code in range(n_sectors):
+            columns = np.nonzero(sector_codes == code)[0]
+            if not len(columns):
+                continue
+            # Filtered-out stocks sort last; lexsort is stable like sorted()
+            excluded = (~keep[:, columns]).astype(np.int8)
+            order = np.lexsort([np.nan_to_num(key[:, columns]) for key in keys] + [excluded], axis=-1)
+            sector_ranks = np.empty_like(order)
+            np.put_along_axis(
+                sector_ranks, order, np.arange(len(columns))[None, :].repeat(len(order), axis=0), axis=1
+            )
+            ranks[:, columns] = np.where(keep[:, columns], sector_ranks, keep.shape[1])
+        return ranks
+    
+    def check_days(self, days: np.ndarray, frequency: RebalanceFrequency) -> np.ndarray:
+        """Boolean mask of days on which the picker is re-run (first trading day of each period)."""
+        if frequency == RebalanceFrequency.DAILY:
+            return np.ones(len(days), dtype=bool)
+        if frequency == RebalanceFrequency.NEVER:
+            periods = np.zeros(len(days), dtype=np.int64)
+        elif frequency == RebalanceFrequency.WEEKLY:
+            periods = days.astype("datetime64[W]").astype(np.int64)
+        elif frequency == RebalanceFrequency.MONTHLY:
+            periods = days.astype("datetime64[M]").astype(np.int64)
+        else:
+            periods = days.astype("datetime64[M]").astype(np.int64) // 3
+        return np.concatenate([[True], periods[1:] != periods[:-1]])
+    
+    def history_start(self, end: date, years: float) -> date:
+        """First day of history a replay of the given years needs, including the beta warm-up."""
+        return end - timedelta(days=round(years * 365.25)) - timedelta(days=round(self.beta_window * 1.5))
+    
+    async def warm_history(self, years: float = MAX_HISTORY_YEARS, end: Optional[date] = None) -> int:
+        """
+        Store daily candles for every universe ticker plus the benchmark over the longest replay window,
+        backfilling earlier history and topping up recent days at background priority.
+        Returns: number of new candles stored
+        """
+        end = end or date.today()
+        tickers = FinnhubClient.UNIVERSE.tickers + [self.benchmark]
+        return await self.finnhub.update_candles(tickers, self.history_start(end, years), end)
+    
+    async def keep_history_current(self, interval: float = 86400.0):
+        """Warm the candle store now and then every interval seconds (a no-op without a Finnhub key)."""
+        while True:
+            try:
+                written = await self.warm_history()
+                if written:
+                    print(f"✅ Stored {written} daily candles for backtests and betas")
+            except Exception as e:
+                print(f"⚠️ Candle warm-up failed: {str(e)}")
+            await asyncio.sleep(interval)
+    
+    def run(self, request: BacktestRequest, end: Optional[date] = None) -> BacktestResponse:
+        """Replay the picker over the requested years of history."""
+        tickers, sector_codes = self.universe(request.sectors)
+        if not tickers:
+            raise ValueError("No candidate stocks for the requested sectors")
+        
+        end = end or self._latest_day()
+        start = end - timedelta(days=round(request.years * 365.25))
+        # One extra beta window of history so day one already has betas
+        history = self.load_history(tickers, self.history_start(end, request.years), end)
+        if history is None:
+            raise ValueError("Not enough local price history to backtest; store daily candles first")
+        
+        returns = history.closes[1:] / history.closes[:-1] - 1
+        market = history.market[1:] / history.market[:-1] - 1
+        betas = self.rolling_betas(returns, market)
+        
+        # Drop the warm-up; row i of the feature matrices describes day i
+        first = max(1, int(np.searchsorted(history.days, np.datetime64(start, "D"))))
+        days = history.days[first:]
+        closes = history.closes[first:]
+        betas = betas[first - 1:]
+        change = returns[first - 1:] * 100
+        
+        # Market cap on each day, holding today's share count fixed
+        prices = self._forward_fill(closes)
+        caps = self.market_caps(tickers)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            caps_by_day = caps * closes / prices[-1]
+        eligible = np.isfinite(closes) & np.isfinite(betas) & np.isfinite(change)
+        ranks = self.rank(
+            request.risk_profile.value, betas, np.nan_to_num(caps_by_day), change, eligible,
+            sector_codes, len(request.sectors)
+        )
+        selection = ranks < self.allocator.picks_per_sector
+        
+        # Rebalance on day one and on check days where the picks differ from the last check
+        check = np.nonzero(self.check_days(days, request.rebalance))[0]
+        changed = np.concatenate([[True], np.any(selection[check[1:]] != selection[check[:-1]], axis=1)])
+        events = check[changed]
+        
+        if type(self.allocator) is GreedyAllocator:
+            shares, cash = self._allocate_greedy(
+                events, selection, prices, sector_codes, len(request.sectors), request.budget
+            )
+        else:
+            shares, cash = self._allocate(events, ranks, prices, betas, sector_codes, request.sectors, request.budget)
+        
+        # Value every day from the holdings of its latest rebalance
+        segment = np.searchsorted(events, np.arange(len(days)), side="right") - 1
+        equity = cash[segment] + np.einsum("ij,ij->i", shares[segment], np.nan_to_num(prices))
+        benchmark_curve = request.budget * history.market[first:] / history.market[first]
+        
+        return self._report(request, days, equity, benchmark_curve, events, tickers, shares[-1], cash[-1])
+    
+    def _allocate(
+        self,
+        events: np.ndarray,
+        ranks: np.ndarray,
+        prices: np.ndarray,
+        betas: np.ndarray,
+        sector_codes: np.ndarray,
+        sectors: List[str],
+        budget: float
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Whole-share holdings and cash after each rebalance from the configured allocator, fed each
+        event's picks best-first with their price and beta as live picks would be.
+        Returns: (shares per event x ticker, cash per event)
+        """
+        shares = np.zeros((len(events), prices.shape[1]))
+        cash = np.zeros(len(events))
+        held = np.zeros(prices.shape[1])
+        free = budget
+        for i, day in enumerate(events):
+            price = prices[day]
+            equity = free + np.nansum(held * price)
+            columns = np.nonzero(ranks[day] < self.allocator.picks_per_sector)[0]
+            columns = columns[np.argsort(ranks[day, columns], kind="stable")]
+            stocks = [
+                {"column": column, "sector": sectors[sector_codes[column]], "price": float(price[column]),
+                 "beta": float(betas[day, column])}
+                for column in columns
+            ]
+            held = np.zeros(prices.shape[1])
+            for stock, quantity in self.allocator.allocate(stocks, equity, sectors):
+                held[stock["column"]] = quantity
+            free = equity - np.nansum(held * price)
+            shares[i] = held
+            cash[i] = free
+        return shares, cash
+    
+    def _allocate_greedy(
+        self,
+        events: np.ndarray,
+        selection: np.ndarray,
+        prices: np.ndarray,
+        sector_codes: np.ndarray,
+        n_sectors: int,
+        budget: float
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Whole-share holdings and cash after each rebalance, following GreedyAllocator:
+        an equal budget per requested sector, split equally across that sector's picks.
+        Returns: (shares per event x ticker, cash per event)
+        """
+        picks_per_sector = np.zeros((len(events), n_sectors))
+        np.add.at(picks_per_sector.T, sector_codes, selection[events].T)
+        picks = picks_per_sector[:, sector_codes]
+        
+        shares = np.zeros((len(events), prices.shape[1]))
+        cash = np.zeros(len(events))
+        held = np.zeros(prices.shape[1])
+        free = budget
+        for i, day in enumerate(events):
+            price = prices[day]
+            equity = free + np.nansum(held * price)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                target = np.floor(equity / n_sectors / picks[i] / price)
+            held = np.where(selection[day] & np.isfinite(target), target, 0.0)
+            free = equity - np.nansum(held * price)
+            shares[i] = held
+            cash[i] = free
+        return shares, cash
+    
+    def _report(
+        self,
+        request: BacktestRequest,
+        days: np.ndarray,
+        equity: np.ndarray,
+        benchmark_curve: np.ndarray,
+        events: np.ndarray,
+        tickers: List[str],
+        final_shares: np.ndarray,
+        final_cash: float
+    ) -> BacktestResponse:
+        """Summary statistics and curves."""
+        elapsed_years = max((days[-1] - days[0]).astype(np.int64) / 365.25, 1 / 365.25)
+        cagr = (equity[-1] / equity[0]) ** (1 / elapsed_years) - 1
+        benchmark_cagr = (benchmark_curve[-1] / benchmark_curve[0]) ** (1 / elapsed_years) - 1
+        drawdown = 1 - equity / np.maximum.accumulate(equity)
+        daily = equity[1:] / equity[:-1] - 1
+        volatility = daily.std(ddof=1) * np.sqrt(TRADING_DAYS) if len(daily) > 1 else 0.0
+        
+        # Share of all start days whose return over the goal horizon met the target
+        horizon = max(1, min(request.goal.duration_years, int(elapsed_years)))
+        ends = np.searchsorted(days, days + np.timedelta64(round(horizon * 365.25), "D"))
+        starts = np.nonzero(ends < len(days))[0]
+        hit_rate = None
+        if len(starts):
+            annualized = (equity[ends[starts]] / equity[starts]) ** (1 / horizon) - 1
+            hit_rate = float(np.mean(annualized * 100 >= request.goal.target_return) * 100)
+        
+        return BacktestResponse(
+            start_date=str(days[0]),
+            end_date=str(days[-1]),
+            initial_value=round(float(equity[0]), 2),
+            final_value=round(float(equity[-1]), 2),
+            total_return=round(float(equity[-1] / equity[0] - 1) * 100, 4),
+            cagr=round(float(cagr) * 100, 4),
+            max_drawdown=round(float(drawdown.max()) * 100, 4),
+            annualized_volatility=round(float(volatility) * 100, 4),
+            target_return=request.goal.target_return,
+            meets_target=bool(cagr * 100 >= request.goal.target_return),
+            hit_rate=round(hit_rate, 4) if hit_rate is not None else None,
+            horizon_years=horizon,
+            rebalances=int(len(events)),
+            benchmark=self.benchmark,
+            benchmark_cagr=round(float(benchmark_cagr) * 100, 4),
+            final_holdings={ticker: int(n) for ticker, n in zip(tickers, final_shares) if n > 0},
+            final_cash=round(float(final_cash), 2),
+            dates=days.astype(str).tolist(),
+            equity_curve=np.round(equity, 2).tolist(),
+            benchmark_curve=np.round(benchmark_curve, 2).tolist()
+        )
+    
+    def _latest_day(self) -> date:
+        """Most recent local trading day for the benchmark."""
+        if self.finnhub.candle_store is not None:
+            last = self.finnhub.candle_store.last_date(self.benchmark)
+            if last is not None:
+                return last
+        return date.today()
+    
+    @staticmethod
+    def _forward_fill(values: np.ndarray) -> np.ndarray:
+        """Carry each column's last price over gaps."""
+        rows = np.where(np.isfinite(values), np.arange(len(values))[:, None], 0)
+        np.maximum.accumulate(rows, axis=0, out=rows)
+        return np.take_along_axis(values, rows, axis=0)
@@ -0,0 +1,102 @@
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """Bounded LRU cache whose entries expire after a TTL.
+    
+    Entries older than ``ttl`` but younger than ``ttl + stale_ttl`` are still
+    returned by ``lookup`` (marked "stale") so callers can serve them while a
+    refresh happens in the background.
+    """
+    
+    FRESH = "fresh"
+    STALE = "stale"
+    MISS = "miss"
+    
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0, stale_ttl: float = 0.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def lookup(self, key: Hashable) -> Tuple[Optional[Any], str]:
+        """Return (value, state) where state is fresh, stale or miss."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, self.MISS
+            
+            stored_at, value = entry
+            age = now - stored_at
+            if age <= self.ttl:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value, self.FRESH
+            if age <= self.ttl + self.stale_ttl:
+                self._data.move_to_end(key)
+                self.stale_hits += 1
+                return value, self.STALE
+            
+            # Too old to serve at all
+            del self._data[key]
+            self.misses += 1
+            return None, self.MISS
+    
+    def age(self, key: Hashable) -> Optional[float]:
+        """Seconds since a key was stored, or None if absent (does not count as a lookup)."""
+        with self._lock:
+            entry = self._data.get(key)
+            return time.monotonic() - entry[0] if entry is not None else None
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return a fresh value or default."""
+        value, state = self.lookup(key)
+        return value if state == self.FRESH else default
+    
+    def set(self, key: Hashable, value: Any):
+        """Store a value, evicting the least recently used entry when full."""
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+    
+    def delete(self, key: Hashable):
+        """Remove a key if present."""
+        with self._lock:
+            self._data.pop(key, None)
+    
+    def clear(self):
+        """Remove every entry."""
+        with self._lock:
+            self._data.clear()
+    
+    def __len__(self) -> int:
+        return len(self._data)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters for monitoring."""
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "stale_ttl_seconds": self.stale_ttl,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0
+        }
@@ -0,0 +1,278 @@
+import os
+import threading
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+DEFAULT_CANDLE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "candles")
+
+FIELDS = ("open", "high", "low", "close", "volume")
+DAY_DTYPE = np.dtype("datetime64[D]")
+EMPTY_DAYS = np.array([], dtype=DAY_DTYPE)
+
+
+class _Columns:
+    """Read-only memory maps of one ticker's columns, valid for its first ``rows`` rows.
+    
+    The day index is mapped up front; field files are mapped on first use.
+    """
+    
+    __slots__ = ("directory", "rows", "day", "_fields")
+    
+    def __init__(self, directory: str, rows: int):
+        self.directory = directory
+        self.rows = rows
+        self._fields: Dict[str, np.ndarray] = {}
+        self.day = (
+            np.memmap(os.path.join(directory, "day.bin"), dtype=DAY_DTYPE, mode="r", shape=(rows,))
+            if rows else EMPTY_DAYS
+        )
+    
+    def field(self, name: str) -> np.ndarray:
+        values = self._fields.get(name)
+        if values is None:
+            values = (
+                np.memmap(os.path.join(self.directory, f"{name}.bin"), dtype=np.float64, mode="r", shape=(self.rows,))
+                if self.rows else np.array([], dtype=np.float64)
+            )
+            self._fields[name] = values
+        return values
+
+
+class CandleStore:
+    """Columnar, append-only store of daily OHLCV candles.
+    
+    Each ticker is a directory holding one flat file per column: a
+    datetime64[D] day index and a float64 array per OHLCV field. Rows are
+    only ever appended in date order, so reads memory-map the files and a
+    date range is a searchsorted slice of the maps with no copying or
+    parsing; once the files are in the page cache a read is a few
+    microseconds per ticker.
+    
+    The day index is written last and defines how many rows are valid, so
+    a write interrupted part way leaves the store readable and is repaired
+    on the next append. Backfilling days before the first stored one
+    rewrites the ticker's files instead (see ``prepend``).
+    """
+    
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("FINNHUB_CANDLE_DIR", DEFAULT_CANDLE_DIR)
+        self._lock = threading.RLock()
+        self._maps: Dict[str, _Columns] = {}
+        self.persistent = True
+        
+        self.reads = 0
+        self.rows_written = 0
+        
+        try:
+            os.makedirs(self.path, exist_ok=True)
+        except OSError as e:
+            print(f"⚠️ Candle store unavailable: {str(e)}")
+            self.persistent = False
+    
+    def _directory(self, ticker: str) -> str:
+        return os.path.join(self.path, ticker.upper().replace(os.sep, "_"))
+    
+    def _columns(self, ticker: str) -> _Columns:
+        """Return (and cache) the memory maps for a ticker."""
+        key = ticker.upper()
+        columns = self._maps.get(key)
+        if columns is not None:
+            return columns
+        with self._lock:
+            columns = self._maps.get(key)
+            if columns is None:
+                directory = self._directory(key)
+                try:
+                    rows = os.path.getsize(os.path.join(directory, "day.bin")) // DAY_DTYPE.itemsize
+                except OSError:
+                    rows = 0
+                columns = _Columns(directory, rows)
+                self._maps[key] = columns
+        return columns
+    
+    def first_date(self, ticker: str) -> Optional[date]:
+        """Return the earliest stored day for a ticker."""
+        days = self._columns(ticker).day
+        return days[0].astype(date) if len(days) else None
+    
+    def last_date(self, ticker: str) -> Optional[date]:
+        """Return the most recent stored day for a ticker."""
+        days = self._columns(ticker).day
+        return days[-1].astype(date) if len(days) else None
+    
+    @staticmethod
+    def _parse(candles: Dict[str, Any]) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Finnhub candle response (t/o/h/l/c/v arrays) as days and field columns."""
+        # Finnhub daily timestamps are UTC; whole days since the epoch are datetime64[D]
+        days = (np.asarray(candles["t"], dtype=np.int64) // 86400).astype(DAY_DTYPE)
+        n = len(days)
+        columns = {"close": np.asarray(candles["c"], dtype=np.float64)}
+        for field, key in (("open", "o"), ("high", "h"), ("low", "l"), ("volume", "v")):
+            values = candles.get(key)
+            columns[field] = np.asarray(values, dtype=np.float64) if values else np.full(n, np.nan)
+        return days, columns
+    
+    def append(self, ticker: str, candles: Dict[str, Any]) -> int:
+        """Append a Finnhub candle response (t/o/h/l/c/v arrays). Returns rows written.
+        
+        Only candles after the last stored day are written; the store is
+        append-only, so earlier days are never rewritten.
+        """
+        if not self.persistent or not candles.get("t"):
+            return 0
+        
+        days, columns = self._parse(candles)
+        key = ticker.upper()
+        directory = self._directory(key)
+        try:
+            with self._lock:
+                # Keep one candle per day in date order, after what is already stored
+                stored = self._columns(key)
+                days, first = np.unique(days, return_index=True)
+                keep = days > stored.day[-1] if stored.rows else np.ones(len(days), dtype=bool)
+                if not keep.any():
+                    return 0
+                days = days[keep]
+                rows = first[keep]
+                
+                os.makedirs(directory, exist_ok=True)
+                for field in FIELDS:
+                    self._append_column(os.path.join(directory, f"{field}.bin"), columns[field][rows], stored.rows)
+                self._append_column(os.path.join(directory, "day.bin"), days, stored.rows)
+                # Remap on next read; views handed out earlier still cover their rows
+                self._maps.pop(key, None)
+            self.rows_written += len(days)
+            return len(days)
+        except OSError as e:
+            print(f"⚠️ Failed to store candles for {ticker}: {str(e)}")
+            return 0
+    
+    def prepend(self, ticker: str, candles: Dict[str, Any]) -> int:
+        """Backfill a Finnhub candle response before the first stored day. Returns rows written.
+        
+        Rewrites the ticker's files through replacement, so maps handed out
+        earlier keep reading the old files. The day index is replaced by an
+        empty one first and by the full one last: an interrupted rewrite
+        leaves the ticker empty (refetched on the next update), never
+        misaligned.
+        """
+        if not self.persistent or not candles.get("t"):
+            return 0
+        
+        key = ticker.upper()
+        directory = self._directory(key)
+        try:
+            with self._lock:
+                stored = self._columns(key)
+                if not stored.rows:
+                    return self.append(key, candles)
+                
+                days, columns = self._parse(candles)
+                days, first = np.unique(days, return_index=True)
+                keep = days < stored.day[0]
+                if not keep.any():
+                    return 0
+                rows = first[keep]
+                merged = {field: np.concatenate([columns[field][rows], stored.field(field)]) for field in FIELDS}
+                merged_days = np.concatenate([days[keep], stored.day])
+                
+                self._replace_column(os.path.join(directory, "day.bin"), EMPTY_DAYS)
+                for field in FIELDS:
+                    self._replace_column(os.path.join(directory, f"{field}.bin"), merged[field])
+                self._replace_column(os.path.join(directory, "day.bin"), merged_days)
+                self._maps.pop(key, None)
+            self.rows_written += len(rows)
+            return len(rows)
+        except OSError as e:
+            print(f"⚠️ Failed to backfill candles for {ticker}: {str(e)}")
+            return 0
+    
+    @staticmethod
+    def _replace_column(path: str, values: np.ndarray):
+        """Write a column to a new file and move it over the old one."""
+        with open(path + ".tmp", "wb") as f:
+            f.write(values.tobytes())
+        os.replace(path + ".tmp", path)
+    
+    @staticmethod
+    def _append_column(path: str, values: np.ndarray, valid: int):
+        """Append values to a column file, dropping any rows past the valid count first."""
+        with open(path, "ab") as f:
+            if f.tell() != valid * values.itemsize:
+                f.truncate(valid * values.itemsize)
+            f.write(values.tobytes())
+    
+    def _bounds(self, days: np.ndarray, start: date, end: date) -> Tuple[int, int]:
+        """Row slice covering start <= day <= end."""
+        lo = int(np.searchsorted(days, np.datetime64(start, "D"), side="left"))
+        hi = int(np.searchsorted(days, np.datetime64(end, "D"), side="right"))
+        return lo, hi
+    
+    def get_range(
+        self,
+        ticker: str,
+        start: date,
+        end: date,
+        fields: Sequence[str] = FIELDS
+    ) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Zero-copy views of the stored columns for start <= day <= end.
+        Returns: (days, {field: values})
+        """
+        self.reads += 1
+        columns = self._columns(ticker)
+        lo, hi = self._bounds(columns.day, start, end)
+        return columns.day[lo:hi], {field: columns.field(field)[lo:hi] for field in fields}
+    
+    def get_closes(self, ticker: str, start: date, end: date) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (days as datetime64[D], closes) for start <= day <= end."""
+        days, values = self.get_range(ticker, start, end, ("close",))
+        return days, values["close"]
+    
+    def get_panel(
+        self,
+        tickers: Sequence[str],
+        start: date,
+        end: date,
+        field: str = "close"
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        One field for many tickers on a shared calendar (the union of their days).
+        Returns: (days, values of shape (days, tickers) with NaN where a ticker has no candle)
+        """
+        series = [self.get_range(ticker, start, end, (field,)) for ticker in tickers]
+        calendars = [days for days, _ in series if len(days)]
+        if not calendars:
+            return EMPTY_DAYS, np.empty((0, len(tickers)))
+        
+        # Tickers usually share a calendar, so the union is just the longest index
+        calendar = max(calendars, key=len)
+        if not all(np.array_equal(days, calendar) for days in calendars):
+            calendar = np.unique(np.concatenate(calendars))
+        
+        panel = np.full((len(calendar), len(tickers)), np.nan)
+        for i, (days, values) in enumerate(series):
+            if len(days) == len(calendar):
+                panel[:, i] = values[field]
+            elif len(days):
+                panel[np.searchsorted(calendar, days), i] = values[field]
+        return np.asarray(calendar), panel
+    
+    def tickers(self) -> List[str]:
+        """Tickers with any stored candles."""
+        if not self.persistent:
+            return []
+        return sorted(name for name in os.listdir(self.path) if os.path.isfile(os.path.join(self.path, name, "day.bin")))
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return store counters for monitoring."""
+        return {
+            "persistent": self.persistent,
+            "path": self.path,
+            "mapped_tickers": len(self._maps),
+            "reads": self.reads,
+            "rows_written": self.rows_written
+        }
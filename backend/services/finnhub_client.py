@@ -1,57 +1,386 @@
 import os
+import time
+import zlib
+import asyncio
+import threading
+from datetime import date, datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
 import requests
-from typing import List, Dict, Any, Optional
+import httpx
+from requests.adapters import HTTPAdapter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+from urllib.parse import urlparse
 from dotenv import load_dotenv
 
+from .cache import TTLCache
+from .profile_store import ProfileStore
+from .candle_store import CandleStore
+from .rate_limiter import Priority, RequestScheduler
+from .singleflight import SingleFlight
+from .finnhub_stream import FinnhubTradeStream, stream_url
+from .universe import Universe, UniverseAttribute
+
 load_dotenv()
 
 
 class FinnhubClient:
     """Client for interacting with Finnhub API to fetch stock data."""
     
-    def __init__(self):
+    # Process-wide async connection pool shared by every client instance
+    _async_client: Optional[httpx.AsyncClient] = None
+    _host_semaphores: Dict[str, asyncio.Semaphore] = {}
+    
+    # Process-wide quote cache, profile store and background refresh bookkeeping
+    _quote_cache: Optional[TTLCache] = None
+    _profile_store: Optional[ProfileStore] = None
+    _candle_store: Optional[CandleStore] = None
+    _candles_checked: Dict[str, Tuple[date, date]] = {}
+    _scheduler: Optional[RequestScheduler] = None
+    _single_flight = SingleFlight()
+    _stream: Optional[FinnhubTradeStream] = None
+    # Portfolio id -> (last loaded, held tickers); their union is what the trade stream covers
+    _held_symbols: Dict[str, Tuple[float, List[str]]] = {}
+    _refreshing: set = set()
+    _refresh_lock = threading.Lock()
+    _refresh_tasks: set = set()
+    _refresh_executor: Optional[ThreadPoolExecutor] = None
+    
+    # Called with (ticker, quote) whenever a fresh quote is cached, e.g. to keep the universe index current
+    _quote_listeners: List[Callable[[str, Dict[str, Any]], None]] = []
+    
+    def __init__(self, pool_size: Optional[int] = None, per_host_limit: Optional[int] = None):
         self.api_key = os.getenv("FINNHUB_API_KEY")
         self.base_url = "https://finnhub.io/api/v1"
+        self.timeout = 10
+        
+        # Connection pool configuration
+        self.pool_size = pool_size or int(os.getenv("FINNHUB_POOL_SIZE", "20"))
+        self.per_host_limit = per_host_limit or int(os.getenv("FINNHUB_PER_HOST_LIMIT", "10"))
+        self.max_in_flight = int(os.getenv("FINNHUB_MAX_IN_FLIGHT", "10"))
+        self.max_retries = int(os.getenv("FINNHUB_MAX_RETRIES", "3"))
+        
+        # Process-wide rate limiter shared by every client instance
+        if FinnhubClient._scheduler is None:
+            FinnhubClient._scheduler = RequestScheduler(
+                rate_per_minute=float(os.getenv("FINNHUB_RATE_LIMIT_PER_MINUTE", "60")),
+                burst=int(os.getenv("FINNHUB_RATE_BURST", "10"))
+            )
+        self.scheduler = FinnhubClient._scheduler
+        self.single_flight = FinnhubClient._single_flight
+        
+        # Optional trade stream feeding a live price board
+        self.stream_enabled = os.getenv("FINNHUB_STREAM_ENABLED", "false").lower() == "true"
+        self.stream_max_age = float(os.getenv("FINNHUB_STREAM_MAX_AGE", "300"))
+        self.stream_max_symbols = int(os.getenv("FINNHUB_STREAM_MAX_SYMBOLS", "50"))
+        self.stream_active_seconds = float(os.getenv("FINNHUB_STREAM_ACTIVE_SECONDS", "3600"))
+        
+        # Quote cache with stale-while-revalidate
+        if FinnhubClient._quote_cache is None:
+            FinnhubClient._quote_cache = TTLCache(
+                maxsize=int(os.getenv("FINNHUB_QUOTE_CACHE_SIZE", "2048")),
+                ttl=float(os.getenv("FINNHUB_QUOTE_TTL", "15")),
+                stale_ttl=float(os.getenv("FINNHUB_QUOTE_STALE_TTL", "60"))
+            )
+        self.quote_cache = FinnhubClient._quote_cache
+        
+        # Keep-alive session for synchronous callers
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         
         if not self.api_key or self.api_key == "your_finnhub_api_key_here":
             print("⚠️ No valid Finnhub API key found - using mock data")
             self.api_key = None
+        
+        # Persistent company profiles (only real API data is worth persisting)
+        self.profile_store = None
+        if self.api_key:
+            if FinnhubClient._profile_store is None:
+                FinnhubClient._profile_store = ProfileStore()
+            self.profile_store = FinnhubClient._profile_store
+        
+        # Daily candles live in a columnar on-disk store and are topped up incrementally
+        self.candle_store = None
+        if self.api_key:
+            if FinnhubClient._candle_store is None:
+                FinnhubClient._candle_store = CandleStore()
+            self.candle_store = FinnhubClient._candle_store
     
-    def _make_request(self, endpoint: str, params: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
-        """Make a request to Finnhub API."""
+    def _make_request(
+        self,
+        endpoint: str,
+        params: Dict[str, Any] = None,
+        priority: Priority = Priority.INTERACTIVE
+    ) -> Optional[Dict[str, Any]]:
+        """Make a rate-limited request to Finnhub API, sharing identical in-flight requests."""
         if not self.api_key:
             return None
-            
+        
+        key = self._request_key(endpoint, params)
+        return self.single_flight.do(key, lambda: self._request_upstream(endpoint, params, priority))
+    
+    def _request_upstream(
+        self,
+        endpoint: str,
+        params: Optional[Dict[str, Any]],
+        priority: Priority
+    ) -> Optional[Dict[str, Any]]:
+        """Issue one rate-limited HTTP request to Finnhub."""
         url = f"{self.base_url}/{endpoint}"
-        params = params or {}
+        params = dict(params or {})
         params["token"] = self.api_key
         
         try:
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            return response.json()
+            for attempt in range(self.max_retries + 1):
+                self.scheduler.acquire(priority)
+                response = self.session.get(url, params=params, timeout=self.timeout)
+                if response.status_code == 429 and attempt < self.max_retries:
+                    pause = self.scheduler.record_throttle(self._retry_after(response.headers))
+                    print(f"⚠️ Finnhub rate limited, backing off {pause:.1f}s")
+                    continue
+                response.raise_for_status()
+                self.scheduler.record_success()
+                return response.json()
         except requests.RequestException as e:
             print(f"❌ Finnhub API error: {str(e)}")
             return None
     
+    @staticmethod
+    def _request_key(endpoint: str, params: Optional[Dict[str, Any]]) -> Tuple[Any, ...]:
+        """Identify a request by endpoint and parameters for coalescing."""
+        return (endpoint,) + tuple(sorted((params or {}).items()))
+    
+    @staticmethod
+    def _retry_after(headers: Any) -> Optional[float]:
+        """Parse a Retry-After header given in seconds."""
+        value = headers.get("Retry-After")
+        try:
+            return max(0.0, float(value)) if value is not None else None
+        except ValueError:
+            return None
+    
+    def _get_async_client(self) -> httpx.AsyncClient:
+        """Get the shared keep-alive async client, creating it on first use."""
+        cls = FinnhubClient
+        if cls._async_client is None or cls._async_client.is_closed:
+            limits = httpx.Limits(
+                max_connections=self.pool_size,
+                max_keepalive_connections=self.pool_size,
+                keepalive_expiry=30.0
+            )
+            cls._async_client = httpx.AsyncClient(limits=limits, timeout=self.timeout)
+        return cls._async_client
+    
+    def _get_host_semaphore(self, url: str) -> asyncio.Semaphore:
+        """Get the semaphore bounding concurrent requests to a single host."""
+        host = urlparse(url).netloc
+        semaphore = FinnhubClient._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.per_host_limit)
+            FinnhubClient._host_semaphores[host] = semaphore
+        return semaphore
+    
+    async def _make_request_async(
+        self,
+        endpoint: str,
+        params: Dict[str, Any] = None,
+        priority: Priority = Priority.INTERACTIVE
+    ) -> Optional[Dict[str, Any]]:
+        """Make a rate-limited request over the shared async pool, sharing identical in-flight requests."""
+        if not self.api_key:
+            return None
+        
+        key = self._request_key(endpoint, params)
+        return await self.single_flight.do_async(
+            key, lambda: self._request_upstream_async(endpoint, params, priority)
+        )
+    
+    async def _request_upstream_async(
+        self,
+        endpoint: str,
+        params: Optional[Dict[str, Any]],
+        priority: Priority
+    ) -> Optional[Dict[str, Any]]:
+        """Issue one rate-limited HTTP request to Finnhub over the shared async pool."""
+        url = f"{self.base_url}/{endpoint}"
+        params = dict(params or {})
+        params["token"] = self.api_key
+        
+        try:
+            client = self._get_async_client()
+            for attempt in range(self.max_retries + 1):
+                await self.scheduler.acquire_async(priority)
+                async with self._get_host_semaphore(url):
+                    response = await client.get(url, params=params)
+                if response.status_code == 429 and attempt < self.max_retries:
+                    pause = self.scheduler.record_throttle(self._retry_after(response.headers))
+                    print(f"⚠️ Finnhub rate limited, backing off {pause:.1f}s")
+                    continue
+                response.raise_for_status()
+                self.scheduler.record_success()
+                return response.json()
+        except httpx.HTTPError as e:
+            print(f"❌ Finnhub API error: {str(e)}")
+            return None
+    
+    async def start_stream(self) -> bool:
+        """Start the shared trade stream if enabled. Returns whether it is running."""
+        if not self.stream_enabled:
+            return False
+        
+        url = stream_url(self.api_key)
+        if not url:
+            print("⚠️ Finnhub trade stream enabled but no API key or FINNHUB_WS_URL configured")
+            return False
+        
+        if FinnhubClient._stream is None:
+            FinnhubClient._stream = FinnhubTradeStream(url, max_symbols=self.stream_max_symbols)
+            print(f"✅ Finnhub trade stream covers up to {self.stream_max_symbols} held symbols")
+        await self._sync_stream_symbols()
+        await FinnhubClient._stream.start()
+        return True
+    
+    async def track_portfolios(self, holdings: Dict[str, List[str]]):
+        """Record the tickers held by portfolios being served (keyed by portfolio id) and resync the stream."""
+        now = time.monotonic()
+        for portfolio_id, tickers in holdings.items():
+            FinnhubClient._held_symbols[portfolio_id] = (now, [t.strip().upper() for t in tickers if t and t.strip()])
+        await self._sync_stream_symbols()
+    
+    def held_symbols(self) -> List[str]:
+        """
+        Union of tickers held across portfolios loaded within the active window,
+        most recently loaded portfolio first (the order the stream cap keeps).
+        """
+        cutoff = time.monotonic() - self.stream_active_seconds
+        held = FinnhubClient._held_symbols
+        for portfolio_id in [pid for pid, (seen, _) in held.items() if seen < cutoff]:
+            del held[portfolio_id]
+        recent = sorted(held.values(), key=lambda entry: -entry[0])
+        return list(dict.fromkeys(ticker for _, tickers in recent for ticker in tickers))
+    
+    async def _sync_stream_symbols(self):
+        """Point the trade stream at the held-ticker union, unsubscribing tickers that left it."""
+        if FinnhubClient._stream is not None:
+            await FinnhubClient._stream.set_symbols(self.held_symbols())
+    
+    def get_live_price(self, ticker: str) -> Optional[float]:
+        """Return the last streamed trade price, or None if unavailable or too old."""
+        if FinnhubClient._stream is None:
+            return None
+        return FinnhubClient._stream.board.get(ticker.upper(), self.stream_max_age)
+    
+    async def get_prices(self, tickers: List[str]) -> Tuple[Dict[str, float], Dict[str, str]]:
+        """
+        Get current prices, reading the live price board first and quoting the rest.
+        Returns: (prices keyed by ticker, errors keyed by ticker)
+        """
+        unique_tickers = list(dict.fromkeys(t.strip().upper() for t in tickers if t and t.strip()))
+        
+        prices = {}
+        missing = []
+        for ticker in unique_tickers:
+            price = self.get_live_price(ticker)
+            if price:
+                prices[ticker] = price
+            else:
+                missing.append(ticker)
+        
+        quotes, errors = await self.get_quotes(missing)
+        for ticker, quote in quotes.items():
+            prices[ticker] = quote["c"]
+        
+        return prices, errors
+    
+    async def get_daily_closes(self, ticker: str, start: date, end: date) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get daily closing prices between start and end (inclusive).
+        Returns: (days as datetime64[D], closes as float64)
+        """
+        key = ticker.upper()
+        if not self.api_key:
+            return self._get_mock_closes(key, start, end)
+        
+        await self._update_candles(key, start, end, Priority.DEFAULT)
+        return self.candle_store.get_closes(key, start, end)
+    
+    async def update_candles(self, tickers: List[str], start: date, end: Optional[date] = None) -> int:
+        """
+        Top up stored daily candles for many tickers in the background.
+        Returns: number of new candles stored
+        """
+        if not self.api_key:
+            return 0
+        end = end or date.today()
+        unique_tickers = list(dict.fromkeys(t.strip().upper() for t in tickers if t and t.strip()))
+        written = await self._gather_bounded(
+            [self._update_candles(ticker, start, end, Priority.BACKGROUND) for ticker in unique_tickers]
+        )
+        return sum(n for n in written if isinstance(n, int))
+    
+    async def _update_candles(self, key: str, start: date, end: date, priority: Priority) -> int:
+        """
+        Fetch the days missing from the stored candles between start and end: before the first
+        stored day (backfill) and after the last. A window is marked checked for the as-of day
+        only once every fetch it needed got an answer, so failed or throttled calls are retried.
+        """
+        checked = FinnhubClient._candles_checked.get(key)
+        if checked is not None and checked[0] <= start and checked[1] == end:
+            return 0
+        
+        first, last = self.candle_store.first_date(key), self.candle_store.last_date(key)
+        if last is None:
+            windows = [(start, end, self.candle_store.append)]
+        else:
+            windows = []
+            if start < first:
+                windows.append((start, first - timedelta(days=1), self.candle_store.prepend))
+            if last < end:
+                windows.append((last + timedelta(days=1), end, self.candle_store.append))
+        
+        written = 0
+        answered = True
+        for window_start, window_end, store in windows:
+            candles = await self._fetch_candles(key, window_start, window_end, priority)
+            if candles is None:
+                answered = False
+            elif candles.get("s") == "ok":
+                written += store(key, candles)
+        if answered:
+            FinnhubClient._candles_checked[key] = (start, end)
+        return written
+    
+    async def _fetch_candles(self, key: str, start: date, end: date, priority: Priority) -> Optional[Dict[str, Any]]:
+        """Daily candles for start <= day <= end; None when the request failed ("no_data" is an answer)."""
+        return await self._make_request_async("stock/candle", {
+            "symbol": key,
+            "resolution": "D",
+            "from": int(datetime.combine(start, datetime.min.time(), tzinfo=timezone.utc).timestamp()),
+            "to": int(datetime.combine(end, datetime.max.time(), tzinfo=timezone.utc).timestamp())
+        }, priority)
+    
+    @classmethod
+    async def aclose(cls):
+        """Stop the trade stream and close the shared async connection pool."""
+        if cls._stream is not None:
+            await cls._stream.stop()
+            cls._stream = None
+        if cls._async_client is not None and not cls._async_client.is_closed:
+            await cls._async_client.aclose()
+        cls._async_client = None
+        cls._host_semaphores = {}
+    
+    # Symbols and classification from the versioned universe file (UNIVERSE_FILE), read on first use
+    UNIVERSE: Universe = UniverseAttribute(lambda universe: universe)
+    SECTOR_TICKERS: Dict[str, List[str]] = UniverseAttribute(Universe.sector_tickers)
+    
     def get_sector_stocks(self, sector: str, limit: int = 10) -> List[Dict[str, Any]]:
         """Get top stocks for a specific sector."""
         
-        # Sector mapping to common tickers
-        sector_tickers = {
-            "technology": ["AAPL", "MSFT", "GOOGL", "AMZN", "NVDA", "META", "TSLA", "ADBE", "CRM", "ORCL"],
-            "healthcare": ["JNJ", "UNH", "PFE", "ABT", "TMO", "DHR", "BMY", "AMGN", "GILD", "CVS"],
-            "finance": ["JPM", "BAC", "WFC", "C", "GS", "MS", "USB", "PNC", "TFC", "COF"],
-            "consumer": ["PG", "KO", "PEP", "WMT", "HD", "MCD", "NKE", "SBUX", "TGT", "LOW"],
-            "energy": ["XOM", "CVX", "COP", "EOG", "SLB", "MPC", "VLO", "PSX", "KMI", "OKE"],
-            "utilities": ["NEE", "SO", "DUK", "D", "AEP", "EXC", "XEL", "SRE", "PEG", "PCG"],
-            "materials": ["LIN", "APD", "SHW", "FCX", "NEM", "DOW", "DD", "PPG", "IFF", "ALB"],
-            "industrials": ["BA", "CAT", "GE", "HON", "UPS", "RTX", "LMT", "MMM", "FDX", "DE"],
-            "telecommunications": ["VZ", "T", "TMUS", "CMCSA", "DIS", "NFLX", "CHTR", "VZ", "S", "DISH"],
-            "real_estate": ["AMT", "PLD", "CCI", "EQIX", "PSA", "WELL", "SPG", "O", "VICI", "EXR"]
-        }
-        
-        tickers = sector_tickers.get(sector, [])[:limit]
+        tickers = self.SECTOR_TICKERS.get(sector, [])[:limit]
+        betas = self.get_stored_betas(tickers)
         stocks = []
         
         for ticker in tickers:
@@ -59,35 +388,362 @@ class FinnhubClient:
             if stock_data:
                 # Get company profile for more details
                 profile = self.get_company_profile(ticker)
-                
-                stocks.append({
-                    "ticker": ticker,
-                    "name": profile.get("name", ticker) if profile else ticker,
-                    "sector": sector.title(),
-                    "price": stock_data.get("c", 0),  # current price
-                    "change": stock_data.get("d", 0),  # change
-                    "change_percent": stock_data.get("dp", 0),  # change percent
-                    "beta": self._get_mock_beta(ticker),  # Mock beta for risk calculation
-                    "market_cap": profile.get("marketCapitalization", 0) if profile else 0
-                })
+                stocks.append(self._build_sector_stock(ticker, sector, stock_data, profile, betas.get(ticker)))
         
         return stocks
     
+    async def get_sector_stocks_async(
+        self,
+        sector: str,
+        limit: int = 10,
+        priority: Priority = Priority.INTERACTIVE
+    ) -> List[Dict[str, Any]]:
+        """Get top stocks for a specific sector, fetching all tickers concurrently."""
+        
+        tickers = self.SECTOR_TICKERS.get(sector, [])[:limit]
+        quotes, _ = await self.get_quotes(tickers, priority=priority)
+        
+        # Only look up profiles for tickers that returned a quote
+        priced = [ticker for ticker in tickers if ticker in quotes]
+        profiles = await self._gather_bounded(
+            [self.get_company_profile_async(ticker) for ticker in priced]
+        )
+        profile_by_ticker = {
+            ticker: profile for ticker, profile in zip(priced, profiles)
+            if not isinstance(profile, Exception)
+        }
+        betas = self.get_stored_betas(priced)
+        
+        return [
+            self._build_sector_stock(ticker, sector, quotes[ticker], profile_by_ticker.get(ticker), betas.get(ticker))
+            for ticker in priced
+        ]
+    
+    def _build_sector_stock(
+        self,
+        ticker: str,
+        sector: str,
+        stock_data: Dict[str, Any],
+        profile: Optional[Dict[str, Any]],
+        beta: Optional[float] = None,
+        listing: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """Combine a quote, company profile and universe listing into a sector stock record."""
+        listing = listing or self.UNIVERSE.by_ticker.get(ticker, {})
+        return {
+            "ticker": ticker,
+            "name": profile.get("name", ticker) if profile else listing.get("name", ticker),
+            "sector": sector.title(),
+            "industry": listing.get("industry", ""),
+            "price": stock_data.get("c", 0),  # current price
+            "change": stock_data.get("d", 0),  # change
+            "change_percent": stock_data.get("dp", 0),  # change percent
+            "beta": beta if beta is not None else self._get_mock_beta(ticker),  # Mock beta until history is stored
+            "market_cap": profile.get("marketCapitalization", 0) if profile else 0
+        }
+    
+    def get_stored_betas(
+        self,
+        tickers: List[str],
+        benchmark: str = "SPY",
+        lookback_days: int = 365,
+        min_observations: int = 60,
+        as_of: Optional[date] = None
+    ) -> Dict[str, float]:
+        """
+        Beta vs the benchmark from stored daily candles, for tickers with enough history.
+        Returns: betas keyed by ticker (tickers without stored history are omitted)
+        """
+        if not self.candle_store or not tickers:
+            return {}
+        end = as_of or date.today()
+        days, closes = self.candle_store.get_panel(list(tickers) + [benchmark], end - timedelta(days=lookback_days), end)
+        if len(days) <= min_observations:
+            return {}
+        
+        # Pairwise-complete beta for every column at once, skipping days either side is missing
+        returns = closes[1:] / closes[:-1] - 1
+        stock, market = returns[:, :-1], returns[:, -1:]
+        valid = np.isfinite(stock) & np.isfinite(market)
+        counts = valid.sum(axis=0)
+        stock = np.where(valid, stock, 0.0)
+        market = np.where(valid, market, 0.0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            stock_mean = stock.sum(axis=0) / counts
+            market_mean = market.sum(axis=0) / counts
+            covariance = (stock * market).sum(axis=0) / counts - stock_mean * market_mean
+            variance = (market * market).sum(axis=0) / counts - market_mean ** 2
+            betas = covariance / variance
+        
+        return {
+            ticker: round(float(betas[i]), 2)
+            for i, ticker in enumerate(tickers)
+            if counts[i] >= min_observations and np.isfinite(betas[i])
+        }
+    
+    async def get_quotes(
+        self,
+        tickers: List[str],
+        max_in_flight: Optional[int] = None,
+        priority: Priority = Priority.INTERACTIVE
+    ) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, str]]:
+        """
+        Fetch quotes for many tickers concurrently.
+        Returns: (quotes keyed by ticker, errors keyed by ticker)
+        """
+        
+        # Dedupe while preserving the caller's order
+        unique_tickers = list(dict.fromkeys(t.strip().upper() for t in tickers if t and t.strip()))
+        if not unique_tickers:
+            return {}, {}
+        
+        results = await self._gather_bounded(
+            [self.get_stock_quote_async(ticker, priority) for ticker in unique_tickers],
+            max_in_flight
+        )
+        
+        quotes = {}
+        errors = {}
+        for ticker, result in zip(unique_tickers, results):
+            if isinstance(result, Exception):
+                errors[ticker] = str(result) or type(result).__name__
+            elif not result:
+                errors[ticker] = "No quote data returned"
+            elif not result.get("c"):
+                # Finnhub answers unknown symbols with an all-zero quote
+                errors[ticker] = "Unknown symbol or no price available"
+            else:
+                quotes[ticker] = result
+        
+        return quotes, errors
+    
+    async def _gather_bounded(self, coroutines: List[Any], max_in_flight: Optional[int] = None) -> List[Any]:
+        """Run coroutines concurrently with at most max_in_flight running at once."""
+        semaphore = asyncio.Semaphore(max_in_flight or self.max_in_flight)
+        
+        async def run(coroutine):
+            async with semaphore:
+                return await coroutine
+        
+        return await asyncio.gather(*(run(c) for c in coroutines), return_exceptions=True)
+    
     def get_stock_quote(self, ticker: str) -> Optional[Dict[str, Any]]:
-        """Get current quote for a stock."""
+        """Get current quote for a stock, served from the quote cache when possible."""
+        key = ticker.upper()
+        cached, state = self.quote_cache.lookup(key)
+        if state == TTLCache.FRESH:
+            return cached
+        if state == TTLCache.STALE:
+            self._schedule_refresh(("quote", key), self._refresh_quote, self._refresh_quote_async)
+            return cached
+        
+        quote = self._fetch_quote(key)
+        self._store_quote(key, quote)
+        return quote
+    
+    def get_cached_quote(self, ticker: str) -> Optional[Dict[str, Any]]:
+        """Return the cached quote (fresh or stale) without calling upstream."""
+        cached, state = self.quote_cache.lookup(ticker.upper())
+        return cached if state != TTLCache.MISS else None
+    
+    def get_stored_profile(self, ticker: str) -> Optional[Dict[str, Any]]:
+        """Return the stored company profile (mock without a key) without calling upstream."""
+        if not self.api_key:
+            return self._get_mock_profile(ticker)
+        profile, _ = self.profile_store.get(ticker.upper())
+        return profile
+    
+    def get_company_profile(self, ticker: str) -> Optional[Dict[str, Any]]:
+        """Get company profile information, served from the profile store when possible."""
+        if not self.api_key:
+            # Mock data when no API key
+            return self._get_mock_profile(ticker)
+        
+        key = ticker.upper()
+        profile, expired = self.profile_store.get(key)
+        if profile is not None:
+            if expired:
+                self._schedule_refresh(("profile", key), self._refresh_profile, self._refresh_profile_async)
+            return profile
+        
+        profile = self._make_request(f"stock/profile2", {"symbol": key})
+        self._store_profile(key, profile)
+        return profile
+    
+    async def get_stock_quote_async(
+        self,
+        ticker: str,
+        priority: Priority = Priority.INTERACTIVE
+    ) -> Optional[Dict[str, Any]]:
+        """Get current quote for a stock without blocking the event loop."""
+        key = ticker.upper()
+        cached, state = self.quote_cache.lookup(key)
+        if state == TTLCache.FRESH:
+            return cached
+        if state == TTLCache.STALE:
+            self._schedule_refresh(("quote", key), self._refresh_quote, self._refresh_quote_async)
+            return cached
+        
+        quote = await self._fetch_quote_async(key, priority)
+        self._store_quote(key, quote)
+        return quote
+    
+    async def get_company_profile_async(self, ticker: str) -> Optional[Dict[str, Any]]:
+        """Get company profile information without blocking the event loop."""
+        if not self.api_key:
+            return self._get_mock_profile(ticker)
+        
+        key = ticker.upper()
+        profile, expired = self.profile_store.get(key)
+        if profile is not None:
+            if expired:
+                self._schedule_refresh(("profile", key), self._refresh_profile, self._refresh_profile_async)
+            return profile
+        
+        profile = await self._make_request_async("stock/profile2", {"symbol": key})
+        await self._store_profile_async(key, profile)
+        return profile
+    
+    async def warm_profiles(self, tickers: Optional[List[str]] = None) -> int:
+        """Fetch missing or expired profiles in the background. Returns how many were refreshed."""
+        if not self.api_key:
+            return 0
+        
+        if tickers is None:
+            tickers = [t for sector_tickers in self.SECTOR_TICKERS.values() for t in sector_tickers]
+        stale = self.profile_store.stale_tickers(list(dict.fromkeys(t.upper() for t in tickers)))
+        if not stale:
+            return 0
+        
+        results = await self._gather_bounded([
+            self._make_request_async("stock/profile2", {"symbol": t}, Priority.BACKGROUND) for t in stale
+        ])
+        fetched = [
+            (ticker, profile) for ticker, profile in zip(stale, results)
+            if not isinstance(profile, Exception) and profile
+        ]
+        await asyncio.to_thread(self.profile_store.put_many, fetched)
+        
+        print(f"✅ Warmed {len(fetched)}/{len(stale)} company profiles")
+        return len(fetched)
+    
+    def _fetch_quote(self, ticker: str, priority: Priority = Priority.INTERACTIVE) -> Optional[Dict[str, Any]]:
+        """Fetch a quote from upstream, bypassing the cache."""
         if self.api_key:
-            return self._make_request(f"quote", {"symbol": ticker})
+            return self._make_request(f"quote", {"symbol": ticker}, priority)
         else:
             # Mock data when no API key
             return self._get_mock_quote(ticker)
     
-    def get_company_profile(self, ticker: str) -> Optional[Dict[str, Any]]:
-        """Get company profile information."""
+    async def _fetch_quote_async(
+        self,
+        ticker: str,
+        priority: Priority = Priority.INTERACTIVE
+    ) -> Optional[Dict[str, Any]]:
+        """Fetch a quote from upstream over the async pool, bypassing the cache."""
         if self.api_key:
-            return self._make_request(f"stock/profile2", {"symbol": ticker})
+            return await self._make_request_async("quote", {"symbol": ticker}, priority)
         else:
-            # Mock data when no API key
-            return self._get_mock_profile(ticker)
+            return self._get_mock_quote(ticker)
+    
+    def _store_quote(self, ticker: str, quote: Optional[Dict[str, Any]]):
+        """Cache a quote if it carries a usable price and tell the quote listeners."""
+        if quote and quote.get("c"):
+            self.quote_cache.set(ticker, quote)
+            for listener in FinnhubClient._quote_listeners:
+                try:
+                    listener(ticker, quote)
+                except Exception as e:
+                    print(f"⚠️ Quote listener failed for {ticker}: {str(e)}")
+    
+    @classmethod
+    def add_quote_listener(cls, listener: Callable[[str, Dict[str, Any]], None]):
+        """Register a callback for every freshly cached quote (called on the fetching thread; keep it cheap)."""
+        if listener not in cls._quote_listeners:
+            cls._quote_listeners.append(listener)
+    
+    def _store_profile(self, ticker: str, profile: Optional[Dict[str, Any]]):
+        """Persist a profile if upstream returned one."""
+        if profile:
+            self.profile_store.put(ticker, profile)
+    
+    async def _store_profile_async(self, ticker: str, profile: Optional[Dict[str, Any]]):
+        """Persist a profile if upstream returned one, with the SQLite write off the event loop."""
+        if profile:
+            await asyncio.to_thread(self.profile_store.put, ticker, profile)
+    
+    def _schedule_refresh(self, key: Tuple[str, str], refresh_sync, refresh_async):
+        """Run a refresh in the background, at most once per key at a time."""
+        cls = FinnhubClient
+        with cls._refresh_lock:
+            if key in cls._refreshing:
+                return
+            cls._refreshing.add(key)
+        
+        ticker = key[1]
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        
+        if loop is not None:
+            task = loop.create_task(self._run_refresh_async(key, refresh_async(ticker)))
+            cls._refresh_tasks.add(task)
+            task.add_done_callback(cls._refresh_tasks.discard)
+        else:
+            if cls._refresh_executor is None:
+                cls._refresh_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="finnhub-refresh")
+            cls._refresh_executor.submit(self._run_refresh, key, refresh_sync, ticker)
+    
+    def _run_refresh(self, key: Tuple[str, str], refresh_sync, ticker: str):
+        """Background refresh for synchronous callers."""
+        try:
+            refresh_sync(ticker)
+        except Exception as e:
+            print(f"⚠️ Background {key[0]} refresh failed for {ticker}: {str(e)}")
+        finally:
+            with FinnhubClient._refresh_lock:
+                FinnhubClient._refreshing.discard(key)
+    
+    async def _run_refresh_async(self, key: Tuple[str, str], refresh):
+        """Background refresh for async callers."""
+        try:
+            await refresh
+        except Exception as e:
+            print(f"⚠️ Background {key[0]} refresh failed for {key[1]}: {str(e)}")
+        finally:
+            with FinnhubClient._refresh_lock:
+                FinnhubClient._refreshing.discard(key)
+    
+    def _refresh_quote(self, ticker: str):
+        """Refresh a cached quote from upstream."""
+        self._store_quote(ticker, self._fetch_quote(ticker, Priority.BACKGROUND))
+    
+    async def _refresh_quote_async(self, ticker: str):
+        """Refresh a cached quote from upstream over the async pool."""
+        self._store_quote(ticker, await self._fetch_quote_async(ticker, Priority.BACKGROUND))
+    
+    def _refresh_profile(self, ticker: str):
+        """Refresh a stored profile from upstream."""
+        self._store_profile(ticker, self._make_request("stock/profile2", {"symbol": ticker}, Priority.BACKGROUND))
+    
+    async def _refresh_profile_async(self, ticker: str):
+        """Refresh a stored profile from upstream over the async pool."""
+        await self._store_profile_async(
+            ticker, await self._make_request_async("stock/profile2", {"symbol": ticker}, Priority.BACKGROUND)
+        )
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """Return cache and transport metrics for monitoring."""
+        return {
+            "quote_cache": self.quote_cache.stats(),
+            "profile_store": self.profile_store.stats() if self.profile_store else None,
+            "candle_store": self.candle_store.stats() if self.candle_store else None,
+            "rate_limiter": self.scheduler.stats(),
+            "single_flight": self.single_flight.stats(),
+            "stream": FinnhubClient._stream.stats() if FinnhubClient._stream else None,
+            "background_refreshes_in_flight": len(FinnhubClient._refreshing)
+        }
     
     def _get_mock_quote(self, ticker: str) -> Dict[str, Any]:
         """Generate mock quote data for testing."""
@@ -126,17 +782,40 @@ class FinnhubClient:
             "XOM": {"name": "Exxon Mobil Corporation", "marketCapitalization": 480000}
         }
         
-        return companies.get(ticker, {"name": f"{ticker} Corp.", "marketCapitalization": 100000})
+        listing = self.UNIVERSE.by_ticker.get(ticker)
+        name = listing["name"] if listing else f"{ticker} Corp."
+        return companies.get(ticker, {"name": name, "marketCapitalization": 100000})
+    
+    def _get_mock_closes(self, ticker: str, start: date, end: date) -> Tuple[np.ndarray, np.ndarray]:
+        """Generate deterministic mock daily closes from a one-factor market model."""
+        epoch = np.datetime64("2010-01-04", "D")
+        days = np.arange(epoch, np.datetime64(end, "D") + 1, dtype="datetime64[D]")
+        days = days[np.is_busday(days)]
+        
+        # Seeded draws are prefix-stable, so any window of the series is the same on every call
+        market = np.random.default_rng(zlib.crc32(b"SPY")).normal(0.0003, 0.01, len(days))
+        if ticker == "SPY":
+            returns = market
+        else:
+            noise = np.random.default_rng(zlib.crc32(ticker.encode())).normal(0.0001, 0.012, len(days))
+            returns = self._get_mock_beta(ticker) * market + noise
+        
+        closes = 100 * np.cumprod(1 + returns)
+        window = (days >= np.datetime64(start, "D")) & (days <= np.datetime64(end, "D"))
+        return days[window], closes[window]
     
     def _get_mock_beta(self, ticker: str) -> float:
         """Generate mock beta values for risk assessment."""
         import random
+        # Seed per ticker so the same stock always gets the same beta (and the
+        # same request always filters to the same stocks)
+        rng = random.Random(ticker)
         # Tech stocks typically have higher beta
         if ticker in ["AAPL", "MSFT", "GOOGL", "AMZN", "NVDA", "META", "TSLA"]:
-            return round(random.uniform(1.1, 1.8), 2)
+            return round(rng.uniform(1.1, 1.8), 2)
         # Utilities and consumer staples have lower beta
         elif ticker in ["NEE", "PG", "KO", "JNJ"]:
-            return round(random.uniform(0.3, 0.9), 2)
+            return round(rng.uniform(0.3, 0.9), 2)
         # Others in between
         else:
-            return round(random.uniform(0.8, 1.3), 2) 
\ No newline at end of file
+            return round(rng.uniform(0.8, 1.3), 2) 
\ No newline at end of file
@@ -0,0 +1,228 @@
+import os
+import json
+import time
+import asyncio
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import websockets
+
+
+class PriceBoard:
+    """In-memory last-trade price board.
+    
+    The stream task is the only writer and each update is a single dict
+    assignment, so readers never need a lock: they always see either the old
+    or the new (price, timestamp) tuple.
+    """
+    
+    def __init__(self):
+        self._prices: Dict[str, Tuple[float, float]] = {}
+    
+    def update(self, ticker: str, price: float, timestamp: Optional[float] = None):
+        """Record the latest trade price for a ticker."""
+        self._prices[ticker] = (price, timestamp if timestamp is not None else time.time())
+    
+    def get(self, ticker: str, max_age: Optional[float] = None) -> Optional[float]:
+        """Return the last price, or None if unknown or older than max_age seconds."""
+        entry = self._prices.get(ticker)
+        if entry is None:
+            return None
+        price, timestamp = entry
+        if max_age is not None and time.time() - timestamp > max_age:
+            return None
+        return price
+    
+    def snapshot(self) -> Dict[str, float]:
+        """Return a copy of every last price."""
+        return {ticker: price for ticker, (price, _) in list(self._prices.items())}
+    
+    def __len__(self) -> int:
+        return len(self._prices)
+
+
+class FinnhubTradeStream:
+    """Finnhub trades WebSocket subscriber feeding a PriceBoard.
+    
+    The subscription set is capped at ``max_symbols`` (Finnhub limits symbols
+    per connection); ``set_symbols`` replaces it with a wanted set, keeping the
+    first ``max_symbols`` and reporting how many it could not cover.
+    """
+    
+    def __init__(
+        self,
+        url: str,
+        board: Optional[PriceBoard] = None,
+        max_symbols: int = 50,
+        reconnect_delay: float = 1.0
+    ):
+        self.url = url
+        self.board = board or PriceBoard()
+        self.max_symbols = max_symbols
+        self.reconnect_delay = reconnect_delay
+        
+        self._symbols: Set[str] = set()
+        self._ws = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        
+        self.connected = False
+        self.messages = 0
+        self.trades = 0
+        self.reconnects = 0
+        self.rejected_symbols = 0
+        self.uncovered_symbols = 0
+    
+    async def start(self):
+        """Start the background connection loop."""
+        if self._task is None or self._task.done():
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Stop streaming and close the connection."""
+        self._stopping = True
+        if self._ws is not None:
+            await self._ws.close()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+    
+    async def subscribe(self, tickers: Iterable[str]) -> List[str]:
+        """Add tickers to the subscription set. Returns the newly added tickers."""
+        added = []
+        for ticker in tickers:
+            ticker = ticker.upper()
+            if ticker in self._symbols:
+                continue
+            if len(self._symbols) >= self.max_symbols:
+                self.rejected_symbols += 1
+                continue
+            self._symbols.add(ticker)
+            added.append(ticker)
+        
+        await self._send("subscribe", added)
+        return added
+    
+    async def unsubscribe(self, tickers: Iterable[str]) -> List[str]:
+        """Remove tickers from the subscription set. Returns the removed tickers."""
+        removed = []
+        for ticker in tickers:
+            ticker = ticker.upper()
+            if ticker in self._symbols:
+                self._symbols.discard(ticker)
+                removed.append(ticker)
+        await self._send("unsubscribe", removed)
+        return removed
+    
+    async def set_symbols(self, tickers: Iterable[str]) -> Tuple[List[str], List[str]]:
+        """
+        Subscribe to exactly the wanted tickers, in priority order, up to max_symbols.
+        Returns: (added tickers, removed tickers)
+        """
+        wanted = list(dict.fromkeys(ticker.upper() for ticker in tickers))
+        covered = wanted[:self.max_symbols]
+        uncovered = len(wanted) - len(covered)
+        if uncovered != self.uncovered_symbols:
+            if uncovered:
+                print(
+                    f"⚠️ Trade stream covers {len(covered)} of {len(wanted)} held symbols "
+                    f"(FINNHUB_STREAM_MAX_SYMBOLS={self.max_symbols}); the rest are quoted"
+                )
+            else:
+                print(f"✅ Trade stream covers all {len(wanted)} held symbols")
+            self.uncovered_symbols = uncovered
+        
+        keep = set(covered)
+        removed = await self.unsubscribe([ticker for ticker in self._symbols if ticker not in keep])
+        added = await self.subscribe(covered)
+        return added, removed
+    
+    async def _send(self, action: str, tickers: List[str]):
+        """Send (un)subscribe messages on the open connection; the next connect resubscribes anyway."""
+        if not tickers or self._ws is None or not self.connected:
+            return
+        try:
+            for ticker in tickers:
+                await self._ws.send(json.dumps({"type": action, "symbol": ticker}))
+        except websockets.ConnectionClosed:
+            # Resubscribed on reconnect
+            pass
+    
+    async def _run(self):
+        """Keep a connection open, resubscribing after every reconnect."""
+        delay = self.reconnect_delay
+        while not self._stopping:
+            try:
+                async with websockets.connect(self.url, ping_interval=20) as ws:
+                    self._ws = ws
+                    self.connected = True
+                    delay = self.reconnect_delay
+                    print(f"✅ Finnhub trade stream connected ({len(self._symbols)} symbols)")
+                    
+                    for ticker in list(self._symbols):
+                        await ws.send(json.dumps({"type": "subscribe", "symbol": ticker}))
+                    
+                    async for raw in ws:
+                        self._handle_message(raw)
+            
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if not self._stopping:
+                    print(f"⚠️ Finnhub trade stream disconnected: {str(e)}")
+            finally:
+                self.connected = False
+                self._ws = None
+            
+            if not self._stopping:
+                self.reconnects += 1
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+    
+    def _handle_message(self, raw: Any):
+        """Apply trade messages to the price board."""
+        self.messages += 1
+        try:
+            message = json.loads(raw)
+        except ValueError:
+            return
+        
+        if message.get("type") != "trade":
+            return
+        
+        for trade in message.get("data") or []:
+            ticker = trade.get("s")
+            price = trade.get("p")
+            if not ticker or not price:
+                continue
+            timestamp = trade.get("t")
+            self.board.update(ticker, float(price), timestamp / 1000 if timestamp else None)
+            self.trades += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return stream counters for monitoring."""
+        return {
+            "connected": self.connected,
+            "subscribed_symbols": len(self._symbols),
+            "max_symbols": self.max_symbols,
+            "rejected_symbols": self.rejected_symbols,
+            "uncovered_symbols": self.uncovered_symbols,
+            "priced_symbols": len(self.board),
+            "messages": self.messages,
+            "trades": self.trades,
+            "reconnects": self.reconnects
+        }
+
+
+def stream_url(api_key: Optional[str]) -> Optional[str]:
+    """Resolve the trade stream URL from configuration."""
+    url = os.getenv("FINNHUB_WS_URL")
+    if url:
+        return url
+    if api_key:
+        return f"wss://ws.finnhub.io?token={api_key}"
+    return None
@@ -0,0 +1,184 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from .cache import TTLCache
+
+
+# USD per million (input, output) tokens, used to estimate what cache hits saved
+MODEL_PRICING: Dict[str, Tuple[float, float]] = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+}
+
+
+def prompt_fingerprint(model: str, system_prompt: str, user_prompt: str, temperature: float) -> str:
+    """Hash the inputs that determine a completion into a stable cache key."""
+    payload = json.dumps(
+        {
+            "model": model,
+            "system": system_prompt,
+            "user": user_prompt,
+            # Bucket temperature so 0.7 and 0.70001 share entries
+            "temperature": round(temperature, 1)
+        },
+        sort_keys=True
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """Completion cache keyed by prompt fingerprint.
+    
+    Responses live in a bounded in-memory LRU with a TTL. When a database path
+    is configured they are also written to SQLite, so a restarted process can
+    answer repeated prompts without calling the model again. Each entry keeps
+    the token usage of the original call so hits can be priced.
+    """
+    
+    def __init__(self, maxsize: int = 512, ttl: float = 3600.0, path: Optional[str] = None):
+        self.ttl = ttl
+        self.path = path
+        self._memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._puts = 0
+        
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.tokens_saved = 0
+        self.dollars_saved = 0.0
+        
+        if path:
+            try:
+                if path != ":memory:":
+                    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+                self._conn = sqlite3.connect(path, check_same_thread=False)
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS llm_responses ("
+                    "key TEXT PRIMARY KEY, "
+                    "model TEXT NOT NULL, "
+                    "content TEXT NOT NULL, "
+                    "prompt_tokens INTEGER NOT NULL, "
+                    "completion_tokens INTEGER NOT NULL, "
+                    "created_at REAL NOT NULL)"
+                )
+                self._conn.commit()
+                self._prune()
+            except sqlite3.Error as e:
+                print(f"⚠️ LLM cache database unavailable, caching in memory only: {str(e)}")
+                self._conn = None
+    
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached completion for a fingerprint, or None."""
+        entry = self._memory.get(key)
+        if entry is not None and time.time() - entry["created_at"] > self.ttl:
+            entry = None
+        
+        if entry is None:
+            entry = self._load(key)
+            if entry is not None:
+                self._memory.set(key, entry)
+                self.disk_hits += 1
+        
+        if entry is None:
+            self.misses += 1
+            return None
+        
+        self.hits += 1
+        self.tokens_saved += entry["prompt_tokens"] + entry["completion_tokens"]
+        self.dollars_saved += self.estimate_cost(entry["model"], entry["prompt_tokens"], entry["completion_tokens"])
+        return entry["content"]
+    
+    def put(self, key: str, model: str, content: str, prompt_tokens: int = 0, completion_tokens: int = 0):
+        """Store a completion and the token usage it cost."""
+        entry = {
+            "model": model,
+            "content": content,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "created_at": time.time()
+        }
+        self._memory.set(key, entry)
+        if self._conn is None:
+            return
+        
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO llm_responses "
+                    "(key, model, content, prompt_tokens, completion_tokens, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, model, content, prompt_tokens, completion_tokens, entry["created_at"])
+                )
+                self._conn.commit()
+                self._puts += 1
+            if self._puts % 50 == 0:
+                self._prune()
+        except sqlite3.Error as e:
+            print(f"⚠️ Failed to persist LLM response: {str(e)}")
+    
+    def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        """Read an unexpired entry from disk."""
+        if self._conn is None:
+            return None
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT model, content, prompt_tokens, completion_tokens, created_at "
+                    "FROM llm_responses WHERE key = ? AND created_at >= ?",
+                    (key, time.time() - self.ttl)
+                ).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None:
+            return None
+        model, content, prompt_tokens, completion_tokens, created_at = row
+        return {
+            "model": model,
+            "content": content,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "created_at": created_at
+        }
+    
+    def _prune(self):
+        """Drop expired rows and keep the table within the memory bound."""
+        try:
+            with self._lock:
+                self._conn.execute("DELETE FROM llm_responses WHERE created_at < ?", (time.time() - self.ttl,))
+                self._conn.execute(
+                    "DELETE FROM llm_responses WHERE key NOT IN "
+                    "(SELECT key FROM llm_responses ORDER BY created_at DESC LIMIT ?)",
+                    (self._memory.maxsize,)
+                )
+                self._conn.commit()
+        except sqlite3.Error as e:
+            print(f"⚠️ Failed to prune LLM cache: {str(e)}")
+    
+    @staticmethod
+    def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+        """Estimate the USD cost of a completion from its token usage."""
+        input_price, output_price = MODEL_PRICING.get(model, (0.0, 0.0))
+        return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return hit rate and savings for monitoring."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._memory),
+            "maxsize": self._memory.maxsize,
+            "ttl_seconds": self.ttl,
+            "persistent": self._conn is not None,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self._memory.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "tokens_saved": self.tokens_saved,
+            "dollars_saved": round(self.dollars_saved, 6)
+        }
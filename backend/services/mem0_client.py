@@ -1,4 +1,5 @@
 import os
+import asyncio
 from typing import List, Optional, Dict, Any
 from mem0 import Memory
 from datetime import datetime
@@ -92,7 +93,9 @@ class Mem0Client:
             # Create memory from the chat interaction
             memory_text = f"User asked: {message}\nAssistant responded: {response}"
             
-            self.client.add(
+            # The SDK call is blocking; keep it off the event loop so queued writes overlap
+            await asyncio.to_thread(
+                self.client.add,
                 messages=[{"role": "user", "content": memory_text}],
                 user_id=user_id,
                 metadata={
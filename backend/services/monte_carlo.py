@@ -0,0 +1,202 @@
+import asyncio
+from datetime import date
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+from models.portfolio import StockHolding
+from .cache import TTLCache
+from .risk import RiskEngine, composition_of
+
+
+PERCENTILES = (5, 25, 50, 75, 95)
+
+# At most this many points along each path; bands are reported at these years
+MAX_CHECKPOINTS = 5
+
+
+def cholesky_factor(covariance: np.ndarray) -> np.ndarray:
+    """Lower-triangular factor of a covariance matrix, tolerating singular (e.g. single-asset) matrices."""
+    try:
+        return np.linalg.cholesky(covariance)
+    except np.linalg.LinAlgError:
+        eigenvalues, eigenvectors = np.linalg.eigh(covariance)
+        return eigenvectors * np.sqrt(np.clip(eigenvalues, 0.0, None))
+
+
+def checkpoint_years(years: int) -> np.ndarray:
+    """Whole years at which the path is sampled, always ending at the horizon."""
+    if years <= MAX_CHECKPOINTS:
+        return np.arange(1, years + 1)
+    return np.unique(np.round(np.linspace(years / MAX_CHECKPOINTS, years, MAX_CHECKPOINTS)).astype(np.int64))
+
+
+def simulate_growth(
+    weights: np.ndarray,
+    mean: np.ndarray,
+    covariance: np.ndarray,
+    checkpoints: np.ndarray,
+    paths: int,
+    seed: int,
+    chunk_size: int = 8192
+) -> np.ndarray:
+    """
+    Simulate buy-and-hold growth of a portfolio with correlated log-normal asset returns.
+    
+    mean and covariance are annual arithmetic returns. Log returns are
+    Gaussian and independent across time, so the increment between two
+    checkpoints k years apart is drawn exactly as N(k * drift, k * covariance);
+    no intermediate steps are needed. Shocks are drawn in antithetic pairs
+    (each draw is also used negated), chunk by chunk into reused buffers to
+    bound memory, from one seeded generator so results are reproducible.
+    
+    Returns: (paths x checkpoints) portfolio value as a multiple of the starting value
+    """
+    n_assets, n_steps = len(weights), len(checkpoints)
+    factor_t = cholesky_factor(covariance).T.astype(np.float32)
+    gaps = np.diff(np.concatenate([[0], checkpoints])).astype(np.float32)
+    scale = np.sqrt(gaps)[:, None]
+    step_drift = gaps[:, None] * (mean - np.diag(covariance) / 2).astype(np.float32)
+    weights = weights.astype(np.float32)
+    
+    rng = np.random.Generator(np.random.SFC64(seed))
+    chunk_size += chunk_size % 2
+    shocks = np.empty((chunk_size // 2 * n_steps, n_assets), dtype=np.float32)
+    log_growth = np.empty((chunk_size, n_steps, n_assets), dtype=np.float32)
+    growth = np.empty((paths, n_steps), dtype=np.float32)
+    
+    for start in range(0, paths, chunk_size):
+        n = min(chunk_size, paths - start)
+        half = (n + 1) // 2
+        draws = shocks[:half * n_steps]
+        rng.standard_normal(out=draws, dtype=np.float32)
+        
+        # Correlate across assets and scale by gap length; the second half mirrors the first
+        block = log_growth[:n]
+        np.multiply((draws @ factor_t).reshape(half, n_steps, n_assets), scale, out=block[:half])
+        np.negative(block[:n - half], out=block[half:])
+        block += step_drift
+        
+        # Cumulative log return at each checkpoint, then value of each holding
+        for k in range(1, n_steps):
+            block[:, k] += block[:, k - 1]
+        np.exp(block, out=block)
+        growth[start:start + n] = (block.reshape(-1, n_assets) @ weights).reshape(n, n_steps)
+    return growth
+
+
+def summarize_growth(
+    growth: np.ndarray,
+    checkpoints: np.ndarray,
+    initial_value: float,
+    target_return: float,
+    years: int
+) -> Dict[str, Any]:
+    """Goal probability, outcome statistics and percentile bands from simulated growth."""
+    final = growth[:, -1]
+    target_multiple = (1 + target_return / 100) ** years
+    
+    # One partition gives every band (nearest-rank percentiles; interpolation is noise at this many paths)
+    ranks = [min(len(growth) - 1, int(p / 100 * len(growth))) for p in PERCENTILES]
+    bands = np.partition(growth, ranks, axis=0)[ranks].astype(np.float64) * initial_value
+    median_final = bands[PERCENTILES.index(50), -1] / initial_value
+    
+    return {
+        "probability": round(float(np.mean(final >= target_multiple)) * 100, 2),
+        "probability_of_loss": round(float(np.mean(final < 1)) * 100, 2),
+        "target_value": round(initial_value * target_multiple, 2),
+        "median_final_value": round(float(median_final) * initial_value, 2),
+        "mean_final_value": round(float(final.mean(dtype=np.float64)) * initial_value, 2),
+        "median_annual_return": round(float(median_final ** (1 / years) - 1) * 100, 4),
+        "years": checkpoints.tolist(),
+        "percentiles": {f"p{p}": np.round(band, 2).tolist() for p, band in zip(PERCENTILES, bands)}
+    }
+
+
+class GoalSimulator:
+    """Monte Carlo estimate of whether a portfolio reaches its target return.
+    
+    Uses the risk engine's covariance of the holdings and CAPM expected
+    returns from their betas (historical mean returns over a one-year window
+    are too noisy to project). Results are cached per (composition, as-of
+    date, goal, paths, seed).
+    """
+    
+    def __init__(
+        self,
+        risk_engine: RiskEngine,
+        paths: int = 100_000,
+        seed: int = 42,
+        chunk_size: int = 8192,
+        risk_free_rate: float = 0.04,
+        market_premium: float = 0.055
+    ):
+        self.risk_engine = risk_engine
+        self.paths = paths
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.risk_free_rate = risk_free_rate
+        self.market_premium = market_premium
+        self.cache = TTLCache(maxsize=512, ttl=24 * 60 * 60)
+    
+    async def simulate_holdings(
+        self,
+        holdings: Sequence[StockHolding],
+        target_return: float,
+        years: int
+    ) -> Optional[Dict[str, Any]]:
+        """Simulate a portfolio's holdings against its goal."""
+        return await self.simulate(composition_of(holdings), target_return, years)
+    
+    async def simulate(
+        self,
+        composition: Dict[str, int],
+        target_return: float,
+        years: int,
+        paths: Optional[int] = None,
+        seed: Optional[int] = None,
+        as_of: Optional[date] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Simulate a ticker -> quantity map against a goal.
+        Returns: simulation summary, or None if there is not enough price history
+        """
+        paths = paths or self.paths
+        seed = self.seed if seed is None else seed
+        as_of = as_of or date.today()
+        
+        key = (tuple(sorted(composition.items())), as_of.isoformat(), float(target_return), years, paths, seed)
+        cached, state = self.cache.lookup(key)
+        if state == TTLCache.FRESH:
+            return cached
+        
+        report = await self.risk_engine.analyze_composition(composition, as_of)
+        if report is None:
+            return None
+        model = report["model"]
+        
+        # CAPM expected return per holding
+        mean = self.risk_free_rate + model["betas"] * self.market_premium
+        checkpoints = checkpoint_years(years)
+        
+        # CPU-bound; keep it off the event loop
+        growth = await asyncio.to_thread(
+            simulate_growth, model["weights"], mean, model["covariance"], checkpoints, paths, seed, self.chunk_size
+        )
+        result = summarize_growth(growth, checkpoints, model["value"], target_return, years)
+        result.update({
+            "target_return": target_return,
+            "horizon_years": years,
+            "initial_value": round(model["value"], 2),
+            "expected_annual_return": round(float(model["weights"] @ mean) * 100, 4),
+            "annual_volatility": round(float(np.sqrt(model["weights"] @ model["covariance"] @ model["weights"])) * 100, 4),
+            "paths": paths,
+            "seed": seed,
+            "as_of": report["as_of"]
+        })
+        self.cache.set(key, result)
+        return result
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return cache counters for monitoring."""
+        return self.cache.stats()
@@ -1,27 +1,69 @@
 import os
-from typing import List, Optional
-from openai import OpenAI
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Dict, AsyncIterator
+from openai import OpenAI, AsyncOpenAI
 from dotenv import load_dotenv
 from models.request import StockPickRequest
 from models.response import StockRecommendation
+from .llm_cache import LLMResponseCache, prompt_fingerprint
 
 load_dotenv()
 
 
+CHAT_SYSTEM_PROMPT = """You are an expert financial advisor and portfolio analyst. You provide personalized investment advice based on the user's portfolio data and market knowledge. 
+
+Key guidelines:
+- Be conversational but professional
+- Use specific data from their portfolio when relevant
+- Provide actionable insights and recommendations
+- Explain complex concepts in simple terms
+- Always consider their risk profile and investment goals
+- Use emojis sparingly but appropriately
+- Keep responses concise but informative (2-4 sentences typically)"""
+
+
 class OpenAIAgent:
     """OpenAI agent for providing personalized investment reasoning."""
     
+    # Process-wide response cache shared by every agent instance
+    _response_cache: Optional[LLMResponseCache] = None
+    
     def __init__(self):
         self.api_key = os.getenv("OPENAI_API_KEY")
         self.client = None
+        self.async_client = None
+        self.batch_justifications = os.getenv("OPENAI_BATCH_JUSTIFICATIONS", "true").lower() == "true"
+        
+        # Identical reasoning prompts (same sectors, risk profile and goal) reuse earlier completions
+        self.response_cache = None
+        if os.getenv("OPENAI_CACHE_ENABLED", "true").lower() == "true":
+            if OpenAIAgent._response_cache is None:
+                OpenAIAgent._response_cache = LLMResponseCache(
+                    maxsize=int(os.getenv("OPENAI_CACHE_SIZE", "512")),
+                    ttl=float(os.getenv("OPENAI_CACHE_TTL", "3600")),
+                    path=os.getenv("OPENAI_CACHE_DB") or None
+                )
+            self.response_cache = OpenAIAgent._response_cache
+        
+        # Point at any OpenAI-compatible server, e.g. the local stand-in for load tests
+        self.base_url = os.getenv("OPENAI_BASE_URL") or None
+        client_options = {
+            "api_key": self.api_key,
+            "base_url": self.base_url,
+            "timeout": float(os.getenv("OPENAI_TIMEOUT", "60")),
+            "max_retries": int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+        }
         
         if self.api_key and self.api_key != "your_openai_api_key_here":
             try:
-                self.client = OpenAI(api_key=self.api_key)
-                print("✅ OpenAI API connected")
+                self.client = OpenAI(**client_options)
+                self.async_client = AsyncOpenAI(**client_options)
+                print(f"✅ OpenAI API connected{f' ({self.base_url})' if self.base_url else ''}")
             except Exception as e:
                 print(f"⚠️ OpenAI initialization failed: {str(e)}")
                 self.client = None
+                self.async_client = None
         else:
             print("📝 No OpenAI API key found - using basic reasoning")
     
@@ -44,25 +86,17 @@ class OpenAIAgent:
             # Create prompt for OpenAI
             prompt = self._create_reasoning_prompt(request, portfolio_summary, total_allocated, remaining_cash)
             
-            # Get response from OpenAI
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a professional financial advisor providing personalized investment reasoning. Be concise, professional, and focus on the user's specific goals and preferences."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
+            # Get response from OpenAI (or the response cache)
+            content = self._complete(
+                system_prompt="You are a professional financial advisor providing personalized investment reasoning. Be concise, professional, and focus on the user's specific goals and preferences.",
+                user_prompt=prompt,
                 max_tokens=500,
-                temperature=0.7
+                temperature=0.7,
+                cache_key=self._request_cache_key(request, recommendations)
             )
             
-            return response.choices[0].message.content.strip()
-            
+            return content.strip()
+        
         except Exception as e:
             print(f"❌ OpenAI reasoning failed: {str(e)}")
             return self._generate_basic_reasoning(request, recommendations, total_allocated)
@@ -78,17 +112,163 @@ class OpenAIAgent:
             return recommendations
         
         try:
+            justifications = {}
+            if self.batch_justifications:
+                # One structured request for every ticker
+                justifications = self._get_batched_justifications(request, recommendations) or {}
+            
+            # Fall back to concurrent per-ticker requests for anything the batch missed
+            missing = [rec for rec in recommendations if rec.ticker not in justifications]
+            if missing:
+                with ThreadPoolExecutor(max_workers=min(len(missing), 8)) as executor:
+                    results = executor.map(lambda rec: self._get_enhanced_justification(request, rec), missing)
+                    for rec, justification in zip(missing, results):
+                        if justification:
+                            justifications[rec.ticker] = justification
+            
             for rec in recommendations:
-                enhanced_justification = self._get_enhanced_justification(request, rec)
-                if enhanced_justification:
-                    rec.justification = enhanced_justification
+                if justifications.get(rec.ticker):
+                    rec.justification = justifications[rec.ticker]
             
             return recommendations
-            
+        
         except Exception as e:
             print(f"❌ OpenAI justification enhancement failed: {str(e)}")
             return recommendations
     
+    def _get_batched_justifications(
+        self,
+        request: StockPickRequest,
+        recommendations: List[StockRecommendation]
+    ) -> Optional[Dict[str, str]]:
+        """Get justifications for every recommendation in a single JSON-mode request."""
+        
+        try:
+            stock_lines = "\n".join(
+                f"- {rec.ticker} ({rec.name}), sector {rec.sector}: {rec.quantity} shares @ ${rec.price:.2f}"
+                for rec in recommendations
+            )
+            prompt = f"""
+Provide a brief investment justification (1-2 sentences) for including each of these stocks in a portfolio:
+
+{stock_lines}
+
+- Investor's risk profile: {request.risk_profile}
+- Investor's goal: {request.goal.target_return}% return over {request.goal.duration_years} years
+- Additional context: {request.note or 'Standard investment goals'}
+
+Focus on why each stock fits the investor's specific profile and goals.
+Respond with a JSON object mapping each ticker symbol to its justification string.
+"""
+            
+            content = self._complete(
+                system_prompt="You are a financial analyst providing concise stock investment justifications. Always answer with a single JSON object keyed by ticker.",
+                user_prompt=prompt,
+                max_tokens=min(150 * len(recommendations), 2000),
+                temperature=0.6,
+                cache_key=self._request_cache_key(request, recommendations),
+                response_format={"type": "json_object"},
+                validate=lambda text: isinstance(json.loads(text), dict)
+            )
+            
+            parsed = json.loads(content)
+            if not isinstance(parsed, dict):
+                return None
+            
+            tickers = {rec.ticker.upper(): rec.ticker for rec in recommendations}
+            return {
+                tickers[key.upper()]: value.strip()
+                for key, value in parsed.items()
+                if key.upper() in tickers and isinstance(value, str) and value.strip()
+            }
+        
+        except Exception as e:
+            print(f"⚠️ Batched justification request failed, falling back to per-ticker: {str(e)}")
+            return None
+    
+    def _complete(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        max_tokens: int,
+        temperature: float,
+        model: str = "gpt-4o-mini",
+        validate: Optional[Callable[[str], bool]] = None,
+        cache_key: Optional[str] = None,
+        **kwargs
+    ) -> str:
+        """
+        Run a chat completion, answering from the response cache when the prompt was seen before.
+        
+        Prompts quoting live prices pass ``cache_key``, a price-free description of the request,
+        which is fingerprinted in place of the user prompt so moving quotes don't defeat the cache.
+        """
+        
+        key = prompt_fingerprint(model, system_prompt, user_prompt if cache_key is None else cache_key, temperature)
+        if self.response_cache is not None:
+            cached = self.response_cache.get(key)
+            if cached is not None:
+                return cached
+        
+        response = self.client.chat.completions.create(
+            model=model,
+            messages=[
+                {
+                    "role": "system",
+                    "content": system_prompt
+                },
+                {
+                    "role": "user",
+                    "content": user_prompt
+                }
+            ],
+            max_tokens=max_tokens,
+            temperature=temperature,
+            **kwargs
+        )
+        content = response.choices[0].message.content or ""
+        
+        # Only cache answers the caller could use
+        usable = bool(content.strip())
+        if usable and validate is not None:
+            try:
+                usable = validate(content)
+            except ValueError:
+                usable = False
+        
+        if usable and self.response_cache is not None:
+            usage = getattr(response, "usage", None)
+            self.response_cache.put(
+                key,
+                model,
+                content,
+                prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+                completion_tokens=getattr(usage, "completion_tokens", 0) or 0
+            )
+        
+        return content
+    
+    @staticmethod
+    def _request_cache_key(request: StockPickRequest, recommendations: List[StockRecommendation]) -> str:
+        """The normalized request and picked holdings, without the prices that move between requests."""
+        return json.dumps(
+            {
+                "budget": round(request.budget, 2),
+                "sectors": request.sectors,
+                "risk_profile": request.risk_profile.value,
+                "goal": [request.goal.target_return, request.goal.duration_years],
+                "note": request.note or "",
+                "holdings": [[rec.ticker, rec.sector, rec.quantity] for rec in recommendations]
+            },
+            sort_keys=True
+        )
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """Return response cache metrics."""
+        return {
+            "response_cache": self.response_cache.stats() if self.response_cache else {"enabled": False}
+        }
+    
     def _prepare_portfolio_summary(self, recommendations: List[StockRecommendation]) -> str:
         """Prepare a summary of the portfolio for reasoning."""
         
@@ -152,24 +332,16 @@ Provide a brief investment justification (1-2 sentences) for including {rec.tick
 Focus on why this stock fits the investor's specific profile and goals.
 """
             
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a financial analyst providing concise stock investment justifications."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
+            content = self._complete(
+                system_prompt="You are a financial analyst providing concise stock investment justifications.",
+                user_prompt=prompt,
                 max_tokens=150,
-                temperature=0.6
+                temperature=0.6,
+                cache_key=self._request_cache_key(request, [rec])
             )
             
-            return response.choices[0].message.content.strip()
-            
+            return content.strip()
+        
         except Exception as e:
             print(f"❌ Failed to enhance justification for {rec.ticker}: {str(e)}")
             return None
@@ -204,45 +376,72 @@ Focus on why this stock fits the investor's specific profile and goals.
     async def chat_with_portfolio(self, message: str, portfolio_context: dict, user_id: str) -> str:
         """Chat with portfolio using AI analysis."""
         
-        if not self.client:
+        if not self.async_client:
             return self._generate_basic_chat_response(message, portfolio_context)
         
         try:
-            # Create prompt for portfolio chat
-            prompt = self._create_chat_prompt(message, portfolio_context)
-            
-            # Get response from OpenAI
-            response = self.client.chat.completions.create(
+            # Get response from OpenAI without blocking the event loop
+            response = await self.async_client.chat.completions.create(
                 model="gpt-4o-mini",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": """You are an expert financial advisor and portfolio analyst. You provide personalized investment advice based on the user's portfolio data and market knowledge. 
-
-Key guidelines:
-- Be conversational but professional
-- Use specific data from their portfolio when relevant
-- Provide actionable insights and recommendations
-- Explain complex concepts in simple terms
-- Always consider their risk profile and investment goals
-- Use emojis sparingly but appropriately
-- Keep responses concise but informative (2-4 sentences typically)"""
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
+                messages=self._create_chat_messages(message, portfolio_context),
                 max_tokens=400,
                 temperature=0.7
             )
             
             return response.choices[0].message.content.strip()
-            
+        
         except Exception as e:
             print(f"❌ OpenAI portfolio chat failed: {str(e)}")
             return self._generate_basic_chat_response(message, portfolio_context)
     
+    async def stream_chat_with_portfolio(
+        self,
+        message: str,
+        portfolio_context: dict,
+        user_id: str
+    ) -> AsyncIterator[str]:
+        """Chat with portfolio, yielding response text as it is generated."""
+        
+        if not self.async_client:
+            yield self._generate_basic_chat_response(message, portfolio_context)
+            return
+        
+        streamed_any = False
+        try:
+            stream = await self.async_client.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=self._create_chat_messages(message, portfolio_context),
+                max_tokens=400,
+                temperature=0.7,
+                stream=True
+            )
+            
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    streamed_any = True
+                    yield delta
+        
+        except Exception as e:
+            print(f"❌ OpenAI portfolio chat stream failed: {str(e)}")
+            if not streamed_any:
+                yield self._generate_basic_chat_response(message, portfolio_context)
+    
+    def _create_chat_messages(self, message: str, portfolio_context: dict) -> List[Dict[str, str]]:
+        """Create the chat completion messages for portfolio chat."""
+        return [
+            {
+                "role": "system",
+                "content": CHAT_SYSTEM_PROMPT
+            },
+            {
+                "role": "user",
+                "content": self._create_chat_prompt(message, portfolio_context)
+            }
+        ]
+    
     def _create_chat_prompt(self, message: str, portfolio_context: dict) -> str:
         """Create a prompt for portfolio chat."""
         
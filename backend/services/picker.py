@@ -1,26 +1,97 @@
-from typing import List, Dict, Any, Tuple
+import os
+import asyncio
+from typing import List, Dict, Any, Optional, Tuple
 from models.request import StockPickRequest
 from models.response import StockRecommendation
+from .allocator import Allocator, get_allocator
 from .finnhub_client import FinnhubClient
+from .universe_index import UniverseIndex
 
 
 class StockPicker:
     """Core logic for picking stocks based on budget, risk, and goals."""
     
-    def __init__(self):
+    # Candidates fetched per sector before filtering when the universe index is not serving
+    candidates_per_sector = 5
+    
+    # Process-wide universe index shared by every picker instance
+    _universe_index: Optional[UniverseIndex] = None
+    
+    def __init__(self, allocator: Optional[Allocator] = None):
         self.finnhub = FinnhubClient()
+        # Turns ranked candidates into share counts ("optimized" or "greedy")
+        self.allocator = allocator or get_allocator(os.getenv("STOCK_ALLOCATOR", "optimized"))
+        
+        # Precomputed rankings; picks fall back to fetching until it is built
+        if StockPicker._universe_index is None and os.getenv("UNIVERSE_INDEX_ENABLED", "true").lower() == "true":
+            StockPicker._universe_index = UniverseIndex(
+                self.finnhub,
+                refresh_interval=float(os.getenv("UNIVERSE_REFRESH_SECONDS", "300")),
+                quote_share=float(os.getenv("UNIVERSE_QUOTE_SHARE", "0.5")),
+                max_quote_age=float(os.environ["UNIVERSE_MAX_QUOTE_AGE"]) if os.getenv("UNIVERSE_MAX_QUOTE_AGE") else None,
+                leaders_per_sector=self.candidates_per_sector
+            )
+        self.index = StockPicker._universe_index
+    
+    def _use_index(self, request: StockPickRequest) -> bool:
+        """Whether the universe index is fresh and has enough quoted names in every requested sector."""
+        return self.index is not None and self.index.covers(request.sectors, self.allocator.picks_per_sector)
     
     def pick_stocks(self, request: StockPickRequest) -> Tuple[List[StockRecommendation], float, float]:
         """
         Main method to pick stocks based on request parameters.
         Returns: (recommendations, total_allocated, remaining_cash)
         """
+        if self._use_index(request):
+            return self.pick_from_index(request)
         
         # Step 1: Fetch stocks for each sector
+        all_stocks = self.fetch_universe(request.sectors)
+        
+        # Steps 2-5: Filter, sort and allocate
+        return self.pick_from_universe(request, all_stocks)
+    
+    def fetch_universe(self, sectors: List[str]) -> List[Dict[str, Any]]:
+        """Fetch the candidate stocks for the requested sectors."""
         all_stocks = []
-        for sector in request.sectors:
-            sector_stocks = self.finnhub.get_sector_stocks(sector, limit=5)
+        for sector in sectors:
+            sector_stocks = self.finnhub.get_sector_stocks(sector, limit=self.candidates_per_sector)
             all_stocks.extend(sector_stocks)
+        return all_stocks
+    
+    async def pick_stocks_async(self, request: StockPickRequest) -> Tuple[List[StockRecommendation], float, float]:
+        """
+        Async variant of pick_stocks that fetches all sectors concurrently.
+        Returns: (recommendations, total_allocated, remaining_cash)
+        """
+        if self._use_index(request):
+            return self.pick_from_index(request)
+        all_stocks = await self.fetch_universe_async(request.sectors)
+        return self.pick_from_universe(request, all_stocks)
+    
+    async def fetch_candidates_async(self, request: StockPickRequest) -> List[Dict[str, Any]]:
+        """Ranked candidates from the universe index when it can serve the request, otherwise the fetched universe."""
+        if self._use_index(request):
+            return self.index.ranked(request.sectors, request.risk_profile, self.allocator.picks_per_sector)
+        return await self.fetch_universe_async(request.sectors)
+    
+    async def fetch_universe_async(self, sectors: List[str]) -> List[Dict[str, Any]]:
+        """Fetch the candidate stocks for all requested sectors concurrently."""
+        sector_results = await asyncio.gather(*(
+            self.finnhub.get_sector_stocks_async(sector, limit=self.candidates_per_sector)
+            for sector in sectors
+        ))
+        return [stock for sector_stocks in sector_results for stock in sector_stocks]
+    
+    def pick_from_universe(
+        self,
+        request: StockPickRequest,
+        all_stocks: List[Dict[str, Any]]
+    ) -> Tuple[List[StockRecommendation], float, float]:
+        """
+        Pick stocks from an already fetched candidate universe without any upstream calls.
+        Returns: (recommendations, total_allocated, remaining_cash)
+        """
         
         # Step 2: Filter by risk profile
         filtered_stocks = self._filter_by_risk(all_stocks, request.risk_profile)
@@ -28,6 +99,25 @@ class StockPicker:
         # Step 3: Sort by various criteria (market cap, price stability, etc.)
         sorted_stocks = self._sort_stocks(filtered_stocks, request.risk_profile)
         
+        # Steps 4-5: Allocate budget across selected stocks and total it
+        return self._allocate_request(request, sorted_stocks)
+    
+    def pick_from_index(self, request: StockPickRequest) -> Tuple[List[StockRecommendation], float, float]:
+        """
+        Pick stocks from the universe index: each sector's ranking for the risk profile is
+        precomputed, so only the top candidates are read before allocating.
+        Returns: (recommendations, total_allocated, remaining_cash)
+        """
+        ranked = self.index.ranked(request.sectors, request.risk_profile, self.allocator.picks_per_sector)
+        return self._allocate_request(request, ranked)
+    
+    def _allocate_request(
+        self,
+        request: StockPickRequest,
+        sorted_stocks: List[Dict[str, Any]]
+    ) -> Tuple[List[StockRecommendation], float, float]:
+        """Allocate the request's budget over ranked stocks. Returns: (recommendations, total_allocated, remaining_cash)"""
+        
         # Step 4: Allocate budget across selected stocks
         recommendations = self._allocate_budget(sorted_stocks, request.budget, request.sectors)
         
@@ -64,68 +154,20 @@ class StockPicker:
             return sorted(stocks, key=lambda x: -x.get("change_percent", 0))
     
     def _allocate_budget(self, stocks: List[Dict[str, Any]], budget: float, sectors: List[str]) -> List[StockRecommendation]:
-        """Allocate budget across selected stocks."""
-        
-        if not stocks:
-            return []
+        """Allocate budget across selected stocks using the configured allocator."""
         
         recommendations = []
-        remaining_budget = budget
-        
-        # Allocate budget per sector first
-        budget_per_sector = budget / len(sectors)
-        
-        # Group stocks by sector
-        stocks_by_sector = {}
-        for stock in stocks:
-            sector = stock["sector"].lower()
-            if sector not in stocks_by_sector:
-                stocks_by_sector[sector] = []
-            stocks_by_sector[sector].append(stock)
-        
-        # Allocate within each sector
-        for sector in sectors:
-            sector_stocks = stocks_by_sector.get(sector, [])
-            if not sector_stocks:
-                continue
-            
-            sector_budget = min(budget_per_sector, remaining_budget)
-            
-            # Select top 2-3 stocks per sector
-            selected_stocks = sector_stocks[:min(3, len(sector_stocks))]
-            stock_budget = sector_budget / len(selected_stocks)
-            
-            for stock in selected_stocks:
-                if remaining_budget <= 0:
-                    break
-                
-                price = stock["price"]
-                if price <= 0:
-                    continue
-                
-                # Calculate quantity (minimum 1 share)
-                max_quantity = int(min(stock_budget, remaining_budget) / price)
-                quantity = max(1, max_quantity) if max_quantity > 0 else 0
-                
-                if quantity > 0 and (quantity * price) <= remaining_budget:
-                    # Determine risk match
-                    risk_match = self._get_risk_match(stock)
-                    
-                    # Generate justification
-                    justification = self._generate_justification(stock, quantity, price)
-                    
-                    recommendation = StockRecommendation(
-                        ticker=stock["ticker"],
-                        name=stock["name"],
-                        sector=stock["sector"],
-                        price=price,
-                        quantity=quantity,
-                        risk_match=risk_match,
-                        justification=justification
-                    )
-                    
-                    recommendations.append(recommendation)
-                    remaining_budget -= (quantity * price)
+        for stock, quantity in self.allocator.allocate(stocks, budget, sectors):
+            price = stock["price"]
+            recommendations.append(StockRecommendation(
+                ticker=stock["ticker"],
+                name=stock["name"],
+                sector=stock["sector"],
+                price=price,
+                quantity=quantity,
+                risk_match=self._get_risk_match(stock),
+                justification=self._generate_justification(stock, quantity, price)
+            ))
         
         return recommendations
     
@@ -1,5 +1,7 @@
-from typing import List, Optional, Dict, Any, Tuple
+from typing import List, Optional, Dict, Any, Tuple, AsyncIterator
 from datetime import datetime
+import os
+import uuid
 import asyncio
 
 from models.portfolio import (
@@ -13,6 +15,11 @@ from .openai_agent import OpenAIAgent
 from .finnhub_client import FinnhubClient
 from .appwrite_client import AppwriteClient
 from .mem0_client import Mem0Client
+from .request_context import memoize, request_context
+from .write_behind import WriteBehindQueue
+from .valuation import value_holdings, value_portfolios
+from .risk import RiskEngine
+from .monte_carlo import GoalSimulator
 
 
 class PortfolioService:
@@ -22,8 +29,25 @@ class PortfolioService:
         self.stock_picker = StockPicker()
         self.openai_agent = OpenAIAgent()
         self.finnhub = FinnhubClient()
+        self.risk_engine = RiskEngine(
+            self.finnhub,
+            benchmark=os.getenv("RISK_BENCHMARK", "SPY"),
+            lookback_days=int(os.getenv("RISK_LOOKBACK_DAYS", "365"))
+        )
+        self.goal_simulator = GoalSimulator(
+            self.risk_engine,
+            paths=int(os.getenv("MONTE_CARLO_PATHS", "100000")),
+            seed=int(os.getenv("MONTE_CARLO_SEED", "42"))
+        )
         self.appwrite = AppwriteClient()
         self.mem0 = Mem0Client()
+        
+        # Chat messages and memories are written in the background after the reply is sent
+        self.write_queue = WriteBehindQueue(
+            capacity=int(os.getenv("WRITE_BEHIND_CAPACITY", "1000")),
+            batch_size=int(os.getenv("WRITE_BEHIND_BATCH_SIZE", "20")),
+            max_retries=int(os.getenv("WRITE_BEHIND_MAX_RETRIES", "3"))
+        )
     
     async def create_auto_portfolio(self, request: AutoPortfolioRequest) -> Optional[Portfolio]:
         """Create portfolio automatically from user preferences"""
@@ -34,7 +58,7 @@ class PortfolioService:
             stock_request = self._preferences_to_stock_request(request.preferences)
             
             # Get stock recommendations
-            recommendations, total_allocated, remaining_cash = self.stock_picker.pick_stocks(stock_request)
+            recommendations, total_allocated, remaining_cash = await self.stock_picker.pick_stocks_async(stock_request)
             
             # Convert recommendations to holdings
             holdings = self._recommendations_to_holdings(recommendations)
@@ -65,6 +89,7 @@ class PortfolioService:
             portfolio_id = await self.appwrite.create_portfolio(portfolio)
             if portfolio_id:
                 portfolio.id = portfolio_id
+                await self._track_held_symbols([portfolio])
                 
                 # Add to memory
                 await self.mem0.add_portfolio_memory(request.user_id, portfolio)
@@ -74,7 +99,7 @@ class PortfolioService:
             else:
                 print("❌ Failed to save portfolio to database")
                 return None
-                
+        
         except Exception as e:
             print(f"❌ Failed to create auto portfolio: {str(e)}")
             return None
@@ -84,28 +109,31 @@ class PortfolioService:
         try:
             portfolios = await self.appwrite.get_user_portfolios(user_id)
             
-            # Update current values for all portfolios
-            for portfolio in portfolios:
-                await self._update_portfolio_values(portfolio)
+            # Price every ticker held across the portfolios once, then update them all
+            await self._update_many_portfolio_values(portfolios)
             
             return portfolios
-            
+        
         except Exception as e:
             print(f"❌ Failed to get user portfolios: {str(e)}")
             return []
     
     async def get_portfolio(self, portfolio_id: str) -> Optional[Portfolio]:
-        """Get portfolio by ID with updated values"""
+        """Get portfolio by ID with updated values (loaded and priced once per request scope)"""
         try:
-            portfolio = await self.appwrite.get_portfolio(portfolio_id)
-            if portfolio:
-                await self._update_portfolio_values(portfolio)
-            return portfolio
-            
+            return await memoize(("portfolio", portfolio_id), lambda: self._load_priced_portfolio(portfolio_id))
+        
         except Exception as e:
             print(f"❌ Failed to get portfolio: {str(e)}")
             return None
     
+    async def _load_priced_portfolio(self, portfolio_id: str) -> Optional[Portfolio]:
+        """Load a portfolio from the database and reprice its holdings"""
+        portfolio = await self.appwrite.get_portfolio(portfolio_id)
+        if portfolio:
+            await self._update_portfolio_values(portfolio)
+        return portfolio
+    
     async def update_portfolio(self, portfolio_id: str, portfolio: Portfolio) -> bool:
         """Update portfolio in database"""
         try:
@@ -113,57 +141,63 @@ class PortfolioService:
             success = await self.appwrite.update_portfolio(portfolio_id, portfolio)
             
             if success:
+                await self.finnhub.track_portfolios({portfolio_id: [holding.ticker for holding in portfolio.holdings]})
+                
                 # Update memory
                 updates = f"Portfolio {portfolio.name} updated with {len(portfolio.holdings)} holdings"
                 await self.mem0.update_portfolio_memory(portfolio.user_id, portfolio_id, updates)
             
             return success
-            
+        
         except Exception as e:
             print(f"❌ Failed to update portfolio: {str(e)}")
             return False
     
     async def analyze_portfolio(self, portfolio_id: str) -> Optional[PortfolioAnalysis]:
         """Analyze portfolio performance and provide insights"""
-        try:
+        async with request_context():
             portfolio = await self.get_portfolio(portfolio_id)
             if not portfolio:
                 return None
-            
-            # Calculate sector allocation
-            sector_allocation = {}
+            return await self.analyze_loaded_portfolio(portfolio)
+    
+    async def analyze_loaded_portfolio(self, portfolio: Portfolio) -> Optional[PortfolioAnalysis]:
+        """Analyze a portfolio that has already been loaded and priced"""
+        try:
+            # Calculate sector allocation (percent of value) in one vectorized pass
             total_value = portfolio.current_value or 0
+            sector_allocation = value_portfolios([portfolio]).sector_allocation(0)
             
-            for holding in portfolio.holdings:
-                sector = holding.sector
-                value = holding.total_value or 0
-                if sector in sector_allocation:
-                    sector_allocation[sector] += value
-                else:
-                    sector_allocation[sector] = value
+            # Calculate risk metrics (historical statistics when there is enough price history)
+            risk_report = await self.risk_engine.analyze(portfolio.holdings)
+            risk_metrics = self._calculate_risk_metrics(portfolio, risk_report)
             
-            # Convert to percentages
-            if total_value > 0:
-                sector_allocation = {k: (v / total_value) * 100 for k, v in sector_allocation.items()}
-            
-            # Calculate risk metrics
-            risk_metrics = self._calculate_risk_metrics(portfolio)
+            # Chance of reaching the target return over the time horizon
+            goal_simulation = await self.goal_simulator.simulate_holdings(
+                portfolio.holdings,
+                portfolio.preferences.target_return,
+                portfolio.preferences.time_horizon_years
+            )
             
             # Generate recommendations
             recommendations = await self._generate_portfolio_recommendations(portfolio)
             
             return PortfolioAnalysis(
-                portfolio_id=portfolio_id,
+                portfolio_id=portfolio.id,
                 total_value=total_value,
                 total_invested=portfolio.total_invested,
                 gain_loss=portfolio.total_gain_loss or 0,
                 gain_loss_percent=portfolio.total_gain_loss_percent or 0,
                 sector_allocation=sector_allocation,
                 risk_metrics=risk_metrics,
+                holding_risk=risk_report["holdings"] if risk_report else None,
+                correlation_matrix=risk_report["correlation_matrix"] if risk_report else None,
+                covariance_matrix=risk_report["covariance_matrix"] if risk_report else None,
+                goal_simulation=goal_simulation,
                 recommendations=recommendations,
                 last_updated=datetime.utcnow()
             )
-            
+        
         except Exception as e:
             print(f"❌ Failed to analyze portfolio: {str(e)}")
             return None
@@ -172,21 +206,13 @@ class PortfolioService:
         """Chat with portfolio using AI and memory"""
         try:
             # Get portfolio context
-            portfolio = await self.appwrite.get_portfolio(request.portfolio_id)
-            if not portfolio:
+            prepared = await self._prepare_chat(request)
+            if not prepared:
                 return ChatResponse(
                     message="Portfolio not found. Please check the portfolio ID.",
                     suggestions=["View my portfolios", "Create new portfolio"]
                 )
-            
-            # Update portfolio values
-            await self._update_portfolio_values(portfolio)
-            
-            # Get portfolio analysis for context
-            analysis = await self.analyze_portfolio(request.portfolio_id)
-            
-            # Prepare context for AI agent
-            portfolio_context = self._prepare_portfolio_context(portfolio, analysis)
+            portfolio, analysis, portfolio_context = prepared
             
             # Get AI response using OpenAI agent
             ai_response = await self.openai_agent.chat_with_portfolio(
@@ -198,39 +224,15 @@ class PortfolioService:
             # Generate contextual suggestions
             suggestions = self._generate_chat_suggestions(request.message, portfolio)
             
-            # Save messages
-            user_message = ChatMessage(
-                portfolio_id=request.portfolio_id,
-                user_id=request.user_id,
-                role="user",
-                content=request.message,
-                timestamp=datetime.utcnow()
-            )
-            await self.appwrite.save_chat_message(user_message)
-            
-            ai_message = ChatMessage(
-                portfolio_id=request.portfolio_id,
-                user_id=request.user_id,
-                role="assistant",
-                content=ai_response,
-                timestamp=datetime.utcnow()
-            )
-            await self.appwrite.save_chat_message(ai_message)
-            
-            # Add memory to Mem0
-            await self.mem0.add_chat_memory(
-                user_id=request.user_id,
-                portfolio_id=request.portfolio_id,
-                message=request.message,
-                response=ai_response
-            )
+            # Save messages and memory in the background
+            self._persist_chat(request, ai_response)
             
             return ChatResponse(
                 message=ai_response,
                 suggestions=suggestions,
                 portfolio_analysis=analysis
             )
-            
+        
         except Exception as e:
             print(f"❌ Failed to process chat: {str(e)}")
             return ChatResponse(
@@ -238,6 +240,108 @@ class PortfolioService:
                 suggestions=["Try asking about portfolio performance", "Show my holdings", "Get investment recommendations"]
             )
     
+    async def stream_chat_with_portfolio(self, request: ChatRequest) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Chat with portfolio, yielding events as the reply is generated.
+        Yields {"event": "token", "data": {...}} per chunk, then a final "done" or "error" event.
+        """
+        try:
+            prepared = await self._prepare_chat(request)
+            if not prepared:
+                yield {
+                    "event": "error",
+                    "data": {
+                        "message": "Portfolio not found. Please check the portfolio ID.",
+                        "suggestions": ["View my portfolios", "Create new portfolio"]
+                    }
+                }
+                return
+            portfolio, analysis, portfolio_context = prepared
+            
+            chunks = []
+            async for chunk in self.openai_agent.stream_chat_with_portfolio(
+                message=request.message,
+                portfolio_context=portfolio_context,
+                user_id=request.user_id
+            ):
+                chunks.append(chunk)
+                yield {"event": "token", "data": {"content": chunk}}
+            
+            # Persist once the full reply exists
+            ai_response = "".join(chunks).strip()
+            self._persist_chat(request, ai_response)
+            
+            yield {
+                "event": "done",
+                "data": {
+                    "message": ai_response,
+                    "suggestions": self._generate_chat_suggestions(request.message, portfolio),
+                    "portfolio_analysis": analysis.model_dump(mode="json") if analysis else None
+                }
+            }
+        
+        except Exception as e:
+            print(f"❌ Failed to stream chat: {str(e)}")
+            yield {
+                "event": "error",
+                "data": {
+                    "message": "I'm sorry, I encountered an error while analyzing your portfolio. Please try again.",
+                    "suggestions": ["Try asking about portfolio performance", "Show my holdings", "Get investment recommendations"]
+                }
+            }
+    
+    async def _prepare_chat(
+        self,
+        request: ChatRequest
+    ) -> Optional[Tuple[Portfolio, Optional[PortfolioAnalysis], Dict[str, Any]]]:
+        """Load, price and analyze the portfolio for a chat turn. Returns None if not found."""
+        async with request_context():
+            # Loaded and priced once, then shared with the analysis
+            portfolio = await self.get_portfolio(request.portfolio_id)
+            if not portfolio:
+                return None
+            
+            # Get portfolio analysis for context
+            analysis = await self.analyze_loaded_portfolio(portfolio)
+        
+        # Prepare context for AI agent
+        portfolio_context = self._prepare_portfolio_context(portfolio, analysis)
+        
+        return portfolio, analysis, portfolio_context
+    
+    def _persist_chat(self, request: ChatRequest, ai_response: str):
+        """Queue both sides of a chat turn and its memory for background writing"""
+        # Document ids are fixed here so a retried write cannot store a message twice
+        user_message = ChatMessage(
+            id=str(uuid.uuid4()),
+            portfolio_id=request.portfolio_id,
+            user_id=request.user_id,
+            role="user",
+            content=request.message,
+            timestamp=datetime.utcnow()
+        )
+        self.write_queue.enqueue("save_chat_message", self.appwrite.save_chat_message, user_message)
+        
+        ai_message = ChatMessage(
+            id=str(uuid.uuid4()),
+            portfolio_id=request.portfolio_id,
+            user_id=request.user_id,
+            role="assistant",
+            content=ai_response,
+            timestamp=datetime.utcnow()
+        )
+        self.write_queue.enqueue("save_chat_message", self.appwrite.save_chat_message, ai_message)
+        
+        # Add memory to Mem0
+        self.write_queue.enqueue(
+            "add_chat_memory",
+            self.mem0.add_chat_memory,
+            user_id=request.user_id,
+            portfolio_id=request.portfolio_id,
+            message=request.message,
+            response=ai_response
+        )
+    
     async def get_chat_history(self, portfolio_id: str, limit: int = 50) -> List[ChatMessage]:
         """Get chat history for a portfolio"""
         try:
@@ -291,36 +395,48 @@ class PortfolioService:
     async def _update_current_prices(self, holdings: List[StockHolding]):
         """Update current prices for all holdings"""
         try:
-            for holding in holdings:
-                quote = self.finnhub.get_stock_quote(holding.ticker)
-                if quote and quote.get("c"):
-                    holding.current_price = quote["c"]
-                    holding.total_value = holding.current_price * holding.quantity
-                    
-                    cost_basis = holding.average_price * holding.quantity
-                    holding.gain_loss = holding.total_value - cost_basis
-                    if cost_basis > 0:
-                        holding.gain_loss_percent = (holding.gain_loss / cost_basis) * 100
-                        
+            prices = await self._get_holding_prices(holdings)
+            value_holdings(holdings, prices).write_holdings()
+        
         except Exception as e:
             print(f"⚠️ Failed to update some prices: {str(e)}")
     
+    async def _get_holding_prices(self, holdings: List[StockHolding]) -> Dict[str, float]:
+        """Quote every unique ticker among the holdings"""
+        prices, errors = await self.finnhub.get_prices([h.ticker for h in holdings])
+        if errors:
+            print(f"⚠️ Missing quotes for: {', '.join(sorted(errors))}")
+        return prices
+    
     async def _update_portfolio_values(self, portfolio: Portfolio):
         """Update portfolio current values"""
+        await self._update_many_portfolio_values([portfolio])
+    
+    async def _update_many_portfolio_values(self, portfolios: List[Portfolio]):
+        """Update several portfolios, quoting each unique ticker once for all of them"""
         try:
-            await self._update_current_prices(portfolio.holdings)
-            
-            # Recalculate portfolio totals
-            portfolio.current_value = sum(h.total_value or 0 for h in portfolio.holdings)
-            portfolio.total_gain_loss = sum(h.gain_loss or 0 for h in portfolio.holdings)
-            
-            if portfolio.total_invested > 0:
-                portfolio.total_gain_loss_percent = (portfolio.total_gain_loss / portfolio.total_invested) * 100
-                
+            await self._track_held_symbols(portfolios)
+            holdings = [holding for portfolio in portfolios for holding in portfolio.holdings]
+            try:
+                prices = await self._get_holding_prices(holdings)
+            except Exception as e:
+                print(f"⚠️ Failed to update some prices: {str(e)}")
+                prices = {}
+            
+            # Value every holding and portfolio in one vectorized pass
+            value_portfolios(portfolios, prices).write_portfolios(portfolios)
+        
         except Exception as e:
             print(f"⚠️ Failed to update portfolio values: {str(e)}")
     
-    def _calculate_risk_metrics(self, portfolio: Portfolio) -> Dict[str, float]:
+    async def _track_held_symbols(self, portfolios: List[Portfolio]):
+        """Keep the trade stream subscribed to what these portfolios hold"""
+        await self.finnhub.track_portfolios({
+            portfolio.id: [holding.ticker for holding in portfolio.holdings]
+            for portfolio in portfolios if portfolio.id
+        })
+    
+    def _calculate_risk_metrics(self, portfolio: Portfolio, risk_report: Optional[Dict[str, Any]] = None) -> Dict[str, float]:
         """Calculate portfolio risk metrics"""
         try:
             # Simple risk metrics based on sector diversification and volatility
@@ -331,13 +447,21 @@ class PortfolioService:
             risk_scores = {"low": 30, "moderate": 60, "high": 90}
             risk_score = risk_scores.get(portfolio.preferences.risk_profile, 60)
             
-            return {
+            metrics = {
                 "diversification_score": diversification_score,
                 "risk_score": risk_score,
                 "sector_count": len(sectors),
                 "holding_count": len(portfolio.holdings)
             }
             
+            # Historical beta, volatility, VaR/CVaR and drawdown from daily candles
+            if risk_report:
+                metrics.update(risk_report["metrics"])
+                if "var_95" in metrics and portfolio.current_value:
+                    metrics["var_95_amount"] = round(metrics["var_95"] / 100 * portfolio.current_value, 2)
+            
+            return metrics
+        
         except Exception as e:
             print(f"⚠️ Failed to calculate risk metrics: {str(e)}")
             return {}
@@ -363,7 +487,7 @@ class PortfolioService:
                 recommendations.append("You have significant cash remaining - consider investing more for better returns")
             
             return recommendations[:3]  # Limit to 3 recommendations
-            
+        
         except Exception as e:
             print(f"⚠️ Failed to generate recommendations: {str(e)}")
             return ["Review your portfolio regularly and consider rebalancing"]
@@ -436,5 +560,7 @@ class PortfolioService:
                 "risk_metrics": analysis.risk_metrics,
                 "recommendations": analysis.recommendations
             }
+            if analysis.goal_simulation:
+                context["analysis"]["goal_probability"] = analysis.goal_simulation.probability
         
         return context 
\ No newline at end of file
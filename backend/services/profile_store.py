@@ -0,0 +1,113 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+
+DEFAULT_PROFILE_DB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "profiles.db")
+
+
+class ProfileStore:
+    """SQLite-backed company profile store with an in-memory read path.
+    
+    Every row is loaded into memory when the store opens, so lookups never
+    touch disk. Writes go to both memory and SQLite so profiles survive
+    restarts. Expired profiles are still returned and flagged so callers can
+    refresh them off the hot path.
+    """
+    
+    def __init__(self, path: Optional[str] = None, ttl: Optional[float] = None):
+        self.path = path or os.getenv("FINNHUB_PROFILE_DB", DEFAULT_PROFILE_DB)
+        self.ttl = ttl if ttl is not None else float(os.getenv("FINNHUB_PROFILE_TTL", str(24 * 60 * 60)))
+        self._profiles: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        
+        self.hits = 0
+        self.expired_hits = 0
+        self.misses = 0
+        
+        try:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS profiles ("
+                "ticker TEXT PRIMARY KEY, "
+                "profile TEXT NOT NULL, "
+                "fetched_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+            self._load()
+        except sqlite3.Error as e:
+            print(f"⚠️ Profile store unavailable, keeping profiles in memory only: {str(e)}")
+            self._conn = None
+    
+    def _load(self):
+        """Load every stored profile into memory."""
+        rows = self._conn.execute("SELECT ticker, profile, fetched_at FROM profiles").fetchall()
+        for ticker, profile, fetched_at in rows:
+            try:
+                self._profiles[ticker] = (fetched_at, json.loads(profile))
+            except ValueError:
+                continue
+        if rows:
+            print(f"✅ Loaded {len(self._profiles)} company profiles from {self.path}")
+    
+    def get(self, ticker: str) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """Return (profile, expired). Profile is None when the ticker is unknown."""
+        entry = self._profiles.get(ticker)
+        if entry is None:
+            self.misses += 1
+            return None, False
+        
+        fetched_at, profile = entry
+        expired = time.time() - fetched_at > self.ttl
+        if expired:
+            self.expired_hits += 1
+        else:
+            self.hits += 1
+        return profile, expired
+    
+    def put(self, ticker: str, profile: Dict[str, Any]):
+        """Store a profile in memory and on disk."""
+        self.put_many([(ticker, profile)])
+    
+    def put_many(self, profiles: List[Tuple[str, Dict[str, Any]]]):
+        """Store profiles in memory and on disk in one transaction (blocking; call off the event loop)."""
+        fetched_at = time.time()
+        for ticker, profile in profiles:
+            self._profiles[ticker] = (fetched_at, profile)
+        if self._conn is None or not profiles:
+            return
+        
+        try:
+            with self._lock:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO profiles (ticker, profile, fetched_at) VALUES (?, ?, ?)",
+                    [(ticker, json.dumps(profile), fetched_at) for ticker, profile in profiles]
+                )
+                self._conn.commit()
+        except sqlite3.Error as e:
+            print(f"⚠️ Failed to persist {len(profiles)} profiles: {str(e)}")
+    
+    def stale_tickers(self, tickers: List[str]) -> List[str]:
+        """Return the tickers that are missing or past their TTL."""
+        now = time.time()
+        return [
+            ticker for ticker in tickers
+            if ticker not in self._profiles or now - self._profiles[ticker][0] > self.ttl
+        ]
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return store counters for monitoring."""
+        return {
+            "size": len(self._profiles),
+            "ttl_seconds": self.ttl,
+            "persistent": self._conn is not None,
+            "hits": self.hits,
+            "expired_hits": self.expired_hits,
+            "misses": self.misses
+        }
@@ -0,0 +1,146 @@
+import time
+import asyncio
+import threading
+from enum import IntEnum
+from typing import Any, Dict, Optional, Tuple
+
+
+class Priority(IntEnum):
+    """Request priority classes; lower values are served first."""
+    INTERACTIVE = 0
+    DEFAULT = 1
+    BACKGROUND = 2
+
+
+class RequestScheduler:
+    """Process-wide token-bucket scheduler for upstream API calls.
+    
+    Callers queue for a token instead of being dropped. While higher-priority
+    callers are waiting, lower-priority callers yield to them. When upstream
+    answers with HTTP 429 the bucket pauses (honouring Retry-After) and halves
+    its rate, then recovers additively as calls succeed.
+    """
+    
+    def __init__(self, rate_per_minute: float = 60, burst: int = 10, min_rate_per_minute: float = 6):
+        self.base_rate = rate_per_minute / 60.0
+        self.min_rate = min_rate_per_minute / 60.0
+        self.rate = self.base_rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._last_refill = time.monotonic()
+        self._blocked_until = 0.0
+        self._backoff = 1.0
+        self._lock = threading.Lock()
+        
+        self._waiting = {priority: 0 for priority in Priority}
+        self.granted = 0
+        self.queued = 0
+        self.throttled = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+    
+    def _refill(self, now: float):
+        """Add tokens for the time elapsed since the last refill."""
+        elapsed = now - self._last_refill
+        if elapsed > 0:
+            self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+            self._last_refill = now
+    
+    def _try_acquire(self, priority: Priority) -> Tuple[bool, float]:
+        """Take a token if allowed. Returns (granted, seconds to sleep before retrying)."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._blocked_until:
+                return False, self._blocked_until - now
+            
+            self._refill(now)
+            if any(self._waiting[p] for p in Priority if p < priority):
+                # Leave the next token for a more urgent caller
+                return False, max(0.05, (1 - self._tokens) / self.rate)
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True, 0.0
+            return False, (1 - self._tokens) / self.rate
+    
+    def _enter(self, priority: Priority):
+        """Register a waiting caller."""
+        with self._lock:
+            self._waiting[priority] += 1
+    
+    def _leave(self, priority: Priority, waited: float, granted: bool):
+        """Unregister a waiting caller and record how long it waited."""
+        with self._lock:
+            self._waiting[priority] -= 1
+            if not granted:
+                return
+            self.granted += 1
+            if waited > 0:
+                self.queued += 1
+                self.total_wait += waited
+                self.max_wait = max(self.max_wait, waited)
+    
+    def acquire(self, priority: Priority = Priority.DEFAULT) -> float:
+        """Block until a token is available. Returns the time spent waiting."""
+        start = time.monotonic()
+        granted = False
+        self._enter(priority)
+        try:
+            while True:
+                granted, delay = self._try_acquire(priority)
+                if granted:
+                    break
+                time.sleep(delay)
+        finally:
+            waited = time.monotonic() - start
+            self._leave(priority, waited if waited > 0.001 else 0.0, granted)
+        return waited
+    
+    async def acquire_async(self, priority: Priority = Priority.DEFAULT) -> float:
+        """Wait without blocking the event loop until a token is available."""
+        start = time.monotonic()
+        granted = False
+        self._enter(priority)
+        try:
+            while True:
+                granted, delay = self._try_acquire(priority)
+                if granted:
+                    break
+                await asyncio.sleep(delay)
+        finally:
+            waited = time.monotonic() - start
+            self._leave(priority, waited if waited > 0.001 else 0.0, granted)
+        return waited
+    
+    def record_throttle(self, retry_after: Optional[float] = None) -> float:
+        """Back off after an HTTP 429. Returns the pause applied in seconds."""
+        with self._lock:
+            self.throttled += 1
+            pause = retry_after if retry_after is not None else self._backoff
+            self._backoff = min(self._backoff * 2, 60.0)
+            self._blocked_until = max(self._blocked_until, time.monotonic() + pause)
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._tokens = 0.0
+            return pause
+    
+    def record_success(self):
+        """Recover the rate gradually after successful calls."""
+        with self._lock:
+            self._backoff = 1.0
+            if self.rate < self.base_rate:
+                self.rate = min(self.base_rate, self.rate + self.base_rate * 0.05)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return queue and wait metrics for monitoring."""
+        with self._lock:
+            return {
+                "rate_per_minute": round(self.rate * 60, 2),
+                "base_rate_per_minute": round(self.base_rate * 60, 2),
+                "burst": self.burst,
+                "queue_depth": {priority.name.lower(): count for priority, count in self._waiting.items()},
+                "granted": self.granted,
+                "queued": self.queued,
+                "throttled_responses": self.throttled,
+                "avg_wait_seconds": round(self.total_wait / self.queued, 4) if self.queued else 0.0,
+                "max_wait_seconds": round(self.max_wait, 4),
+                "paused_for_seconds": round(max(0.0, self._blocked_until - time.monotonic()), 2)
+            }
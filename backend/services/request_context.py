@@ -0,0 +1,62 @@
+import asyncio
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, Optional
+
+
+_current: ContextVar[Optional["RequestContext"]] = ContextVar("request_context", default=None)
+
+
+class RequestContext:
+    """Per-request memo of expensive lookups.
+    
+    Inside a request scope the first caller for a key runs the loader and
+    every later (or concurrent) caller for that key gets the same result, so a
+    portfolio is loaded and priced at most once per request no matter how
+    many helpers ask for it. Outside a scope loaders simply run.
+    """
+    
+    def __init__(self):
+        self._results: Dict[Hashable, asyncio.Task] = {}
+        self.loads = 0
+        self.reuses = 0
+    
+    async def memoize(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the loader's result for key, running it once per request."""
+        task = self._results.get(key)
+        if task is None:
+            task = asyncio.ensure_future(loader())
+            self._results[key] = task
+            self.loads += 1
+        else:
+            self.reuses += 1
+        return await asyncio.shield(task)
+    
+    @staticmethod
+    def current() -> Optional["RequestContext"]:
+        """Return the active request context, if any."""
+        return _current.get()
+
+
+@asynccontextmanager
+async def request_context() -> AsyncIterator[RequestContext]:
+    """Open a request scope, or join the one already open."""
+    context = _current.get()
+    if context is not None:
+        yield context
+        return
+    
+    context = RequestContext()
+    token = _current.set(context)
+    try:
+        yield context
+    finally:
+        _current.reset(token)
+
+
+async def memoize(key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+    """Memoize within the current request scope; run the loader directly outside one."""
+    context = _current.get()
+    if context is None:
+        return await loader()
+    return await context.memoize(key, loader)
@@ -0,0 +1,203 @@
+import asyncio
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from models.portfolio import StockHolding
+from .cache import TTLCache
+
+
+TRADING_DAYS = 252
+
+
+def composition_of(holdings: Sequence[StockHolding]) -> Dict[str, int]:
+    """Total quantity per ticker across holdings."""
+    composition: Dict[str, int] = {}
+    for holding in holdings:
+        ticker = holding.ticker.upper()
+        composition[ticker] = composition.get(ticker, 0) + holding.quantity
+    return composition
+
+
+def compute_risk(
+    tickers: Sequence[str],
+    returns: np.ndarray,
+    market: np.ndarray,
+    weights: np.ndarray,
+    confidence: float = 0.95
+) -> Dict[str, Any]:
+    """
+    Risk statistics for aligned daily simple returns.
+    
+    returns is (days x holdings), market is (days,) benchmark returns and
+    weights are portfolio value weights summing to 1.
+    """
+    days = returns.shape[0]
+    
+    # Beta of every holding against the benchmark in one matrix product
+    centered = returns - returns.mean(axis=0)
+    market_centered = market - market.mean()
+    market_variance = market_centered @ market_centered
+    betas = centered.T @ market_centered / market_variance if market_variance > 0 else np.zeros(len(tickers))
+    
+    covariance = centered.T @ centered / (days - 1)
+    volatility = np.sqrt(np.diag(covariance))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        correlation = np.nan_to_num(covariance / np.outer(volatility, volatility))
+    np.fill_diagonal(correlation, 1.0)
+    
+    portfolio_returns = returns @ weights
+    portfolio_volatility = np.sqrt(weights @ covariance @ weights)
+    
+    # Historical VaR/CVaR: the loss at the tail quantile and the mean loss beyond it
+    cutoff = np.quantile(portfolio_returns, 1 - confidence)
+    tail = portfolio_returns[portfolio_returns <= cutoff]
+    var = -cutoff
+    cvar = -tail.mean() if tail.size else var
+    
+    growth = np.cumprod(1 + portfolio_returns)
+    drawdowns = 1 - growth / np.maximum.accumulate(growth)
+    
+    annualize = np.sqrt(TRADING_DAYS)
+    return {
+        "portfolio_beta": float(weights @ betas),
+        "annualized_volatility": float(portfolio_volatility * annualize * 100),
+        "var": float(var * 100),
+        "cvar": float(cvar * 100),
+        "max_drawdown": float(drawdowns.max() * 100),
+        "observations": days,
+        "betas": betas,
+        "volatility": volatility * annualize * 100,
+        "covariance": covariance * TRADING_DAYS,
+        "correlation": correlation
+    }
+
+
+class RiskEngine:
+    """Historical risk metrics for a set of holdings.
+    
+    Pulls daily closes for every holding and the benchmark, aligns them on
+    common trading days and computes beta, volatility, covariance and
+    correlation, historical VaR/CVaR and max drawdown with NumPy. Results
+    are cached per (composition, as-of date), so a portfolio is analysed at
+    most once per day until its holdings change; "not enough history" is
+    recomputed on the next request.
+    """
+    
+    def __init__(
+        self,
+        finnhub,
+        benchmark: str = "SPY",
+        lookback_days: int = 365,
+        confidence: float = 0.95,
+        min_observations: int = 30
+    ):
+        self.finnhub = finnhub
+        self.benchmark = benchmark
+        self.lookback_days = lookback_days
+        self.confidence = confidence
+        self.min_observations = min_observations
+        self.cache = TTLCache(maxsize=1024, ttl=24 * 60 * 60)
+    
+    async def analyze(
+        self,
+        holdings: Sequence[StockHolding],
+        as_of: Optional[date] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Return risk metrics for the holdings, or None if there is not enough history."""
+        return await self.analyze_composition(composition_of(holdings), as_of)
+    
+    async def analyze_composition(
+        self,
+        composition: Dict[str, int],
+        as_of: Optional[date] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Return risk metrics for a ticker -> quantity map, or None if there is not enough history."""
+        as_of = as_of or date.today()
+        if not composition:
+            return None
+        
+        key = (tuple(sorted(composition.items())), as_of.isoformat())
+        cached, state = self.cache.lookup(key)
+        if state == TTLCache.FRESH:
+            return cached
+        
+        report = await self._compute(composition, as_of)
+        # Short history is not cached: the candle store may fill in later the same day
+        if report is not None:
+            self.cache.set(key, report)
+        return report
+    
+    async def _compute(self, composition: Dict[str, int], as_of: date) -> Optional[Dict[str, Any]]:
+        """Fetch aligned history and compute the report."""
+        tickers = list(composition)
+        aligned = await self._aligned_closes(tickers + [self.benchmark], as_of)
+        if aligned is None:
+            return None
+        closes, observed = aligned
+        
+        daily = closes[1:] / closes[:-1] - 1
+        returns, market = daily[:, :-1], daily[:, -1]
+        
+        # Weight by value at the as-of close so the result depends only on composition and date
+        quantities = np.array([composition[t] for t in tickers], dtype=np.float64)
+        values = quantities * closes[-1, :-1]
+        weights = values / values.sum()
+        
+        stats = compute_risk(tickers, returns, market, weights, self.confidence)
+        confidence_label = int(round(self.confidence * 100))
+        return {
+            "as_of": str(observed[-1]),
+            "benchmark": self.benchmark,
+            "metrics": {
+                "portfolio_beta": round(stats["portfolio_beta"], 4),
+                "annualized_volatility": round(stats["annualized_volatility"], 4),
+                f"var_{confidence_label}": round(stats["var"], 4),
+                f"cvar_{confidence_label}": round(stats["cvar"], 4),
+                "max_drawdown": round(stats["max_drawdown"], 4),
+                "observations": float(stats["observations"])
+            },
+            "holdings": {
+                ticker: {
+                    "weight": round(float(weights[i]) * 100, 4),
+                    "beta": round(float(stats["betas"][i]), 4),
+                    "annualized_volatility": round(float(stats["volatility"][i]), 4)
+                }
+                for i, ticker in enumerate(tickers)
+            },
+            "covariance_matrix": self._matrix(tickers, stats["covariance"]),
+            "correlation_matrix": self._matrix(tickers, stats["correlation"]),
+            # Unrounded inputs for simulations built on this estimate
+            "model": {
+                "tickers": tickers,
+                "value": float(values.sum()),
+                "weights": weights,
+                "betas": stats["betas"],
+                "covariance": stats["covariance"]
+            }
+        }
+    
+    async def _aligned_closes(self, tickers: List[str], as_of: date) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Fetch closes concurrently and keep only the days every series has. Returns (closes, days)."""
+        start = as_of - timedelta(days=self.lookback_days)
+        series = await asyncio.gather(*(self.finnhub.get_daily_closes(t, start, as_of) for t in tickers))
+        
+        common = series[0][0]
+        for days, _ in series[1:]:
+            common = np.intersect1d(common, days, assume_unique=True)
+        if len(common) <= self.min_observations:
+            return None
+        
+        columns = [closes[np.isin(days, common, assume_unique=True)] for days, closes in series]
+        return np.column_stack(columns), common
+    
+    @staticmethod
+    def _matrix(tickers: Sequence[str], values: np.ndarray) -> Dict[str, Dict[str, float]]:
+        """Label a square matrix by ticker."""
+        rounded = np.round(values, 6).tolist()
+        return {row: dict(zip(tickers, rounded[i])) for i, row in enumerate(tickers)}
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return cache counters for monitoring."""
+        return self.cache.stats()
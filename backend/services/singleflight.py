@@ -0,0 +1,80 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class _Call:
+    """An in-flight synchronous call that followers wait on."""
+    
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+
+
+class SingleFlight:
+    """Coalesce concurrent identical calls into one upstream request.
+    
+    The first caller for a key runs the work; callers arriving while it is
+    still in flight wait for and share its result instead of issuing their
+    own request.
+    """
+    
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+        self._lock = threading.Lock()
+        
+        self.executed = 0
+        self.saved = 0
+    
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Run fn once for all concurrent callers sharing key."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self.executed += 1
+            else:
+                self.saved += 1
+        
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+    
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Await fn() once for all concurrent callers sharing key."""
+        task = self._tasks.get(key)
+        if task is None or task.done():
+            task = asyncio.ensure_future(fn())
+            self._tasks[key] = task
+            task.add_done_callback(lambda t: self._tasks.pop(key, None) if self._tasks.get(key) is t else None)
+            self.executed += 1
+        else:
+            self.saved += 1
+        
+        # Shield so one caller being cancelled does not cancel everyone else
+        return await asyncio.shield(task)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return coalescing counters for monitoring."""
+        return {
+            "in_flight": len(self._calls) + len(self._tasks),
+            "upstream_calls": self.executed,
+            "calls_saved": self.saved
+        }
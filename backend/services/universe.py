@@ -0,0 +1,114 @@
+import os
+import re
+import csv
+import hashlib
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from models.request import VALID_SECTORS
+
+
+# Checked-in universe; bump the version suffix when the constituents change
+DEFAULT_UNIVERSE_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "universe_v1.csv")
+
+COLUMNS = ("ticker", "name", "sector", "industry", "index")
+
+
+class Universe:
+    """Tradable symbols with sector and industry classification, in file order.
+    
+    Within a sector the file lists the largest names first; the picker's
+    fallback path only looks at each sector's leading rows.
+    """
+    
+    def __init__(self, rows: List[Dict[str, str]], version: str, source: Optional[str] = None):
+        self.rows = rows
+        self.version = version
+        self.source = source
+        self.tickers = [row["ticker"] for row in rows]
+        self.by_ticker = {row["ticker"]: row for row in rows}
+    
+    def __len__(self) -> int:
+        return len(self.rows)
+    
+    def sector_tickers(self) -> Dict[str, List[str]]:
+        """Tickers per sector in file order, with every supported sector present."""
+        sectors: Dict[str, List[str]] = {sector: [] for sector in VALID_SECTORS}
+        for row in self.rows:
+            sectors[row["sector"]].append(row["ticker"])
+        return sectors
+    
+    def stats(self) -> Dict[str, Any]:
+        return {"version": self.version, "source": self.source, "symbols": len(self.rows)}
+
+
+def load_universe(path: Optional[str] = None) -> Universe:
+    """
+    Load and validate a universe CSV (columns: ticker, name, sector, industry, index).
+    Tickers are upper-cased and must be unique; sectors must be supported.
+    The version is the file's _v<N> suffix plus a content hash, so edits show up in metrics.
+    """
+    path = path or os.getenv("UNIVERSE_FILE") or DEFAULT_UNIVERSE_FILE
+    with open(path, "rb") as f:
+        content = f.read()
+    
+    reader = csv.DictReader(content.decode("utf-8").splitlines())
+    fieldnames = reader.fieldnames or []
+    missing = [column for column in COLUMNS if column not in fieldnames]
+    if missing:
+        raise ValueError(f"Universe file {path} is missing columns: {', '.join(missing)}")
+    
+    rows, seen = [], set()
+    for record in reader:
+        line = reader.line_num
+        if None in record or any(record[column] is None for column in fieldnames):
+            raise ValueError(f"{path}:{line}: expected {len(fieldnames)} fields")
+        ticker = record["ticker"].strip().upper()
+        sector = record["sector"].strip().lower()
+        if not ticker:
+            raise ValueError(f"{path}:{line}: empty ticker")
+        if ticker in seen:
+            raise ValueError(f"{path}:{line}: duplicate ticker {ticker}")
+        if sector not in VALID_SECTORS:
+            raise ValueError(f"{path}:{line}: unknown sector {sector!r} for {ticker}")
+        seen.add(ticker)
+        rows.append({
+            "ticker": ticker,
+            "name": record["name"].strip() or ticker,
+            "sector": sector,
+            "industry": record["industry"].strip(),
+            "index": record["index"].strip()
+        })
+    
+    match = re.search(r"_v(\d+)$", os.path.splitext(os.path.basename(path))[0])
+    version = f"v{match.group(1) if match else 0}-{hashlib.sha256(content).hexdigest()[:8]}"
+    return Universe(rows, version, path)
+
+
+_universe: Optional[Universe] = None
+_universe_lock = threading.Lock()
+
+
+def get_universe() -> Universe:
+    """The process-wide universe, loaded on first use. App startup calls this so a bad file fails there."""
+    global _universe
+    with _universe_lock:
+        if _universe is None:
+            _universe = load_universe()
+        return _universe
+
+
+class UniverseAttribute:
+    """Read-only class attribute derived from the process-wide universe when first read, not at import."""
+    
+    def __init__(self, derive: Callable[[Universe], Any]):
+        self.derive = derive
+        self._source: Optional[Universe] = None
+        self._value: Any = None
+    
+    def __get__(self, obj: Any, owner: type) -> Any:
+        universe = get_universe()
+        if self._source is not universe:
+            self._value = self.derive(universe)
+            self._source = universe
+        return self._value
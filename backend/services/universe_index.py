@@ -0,0 +1,455 @@
+import time
+import asyncio
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .finnhub_client import FinnhubClient
+from .rate_limiter import Priority
+from .universe import Universe
+
+
+RISK_PROFILES = ("low", "moderate", "high")
+
+# Profiles whose ranking depends on the daily change, i.e. on quotes; "low" ranks on market cap and beta only
+QUOTE_RANKED_PROFILES = ("moderate", "high")
+
+# A quote and the wall-clock time it was taken
+TimedQuote = Tuple[Dict[str, Any], float]
+
+_NO_QUOTE = {"c": 0, "d": 0, "dp": 0}
+
+
+def rank_rows(
+    rows: np.ndarray,
+    price: np.ndarray,
+    beta: np.ndarray,
+    market_cap: np.ndarray,
+    change_percent: np.ndarray,
+    risk_profile: str
+) -> np.ndarray:
+    """
+    Priced rows passing a risk profile's beta filter, best first.
+    Mirrors StockPicker._filter_by_risk and _sort_stocks; lexsort is stable, so ties keep universe order.
+    """
+    b, cap, change = beta[rows], market_cap[rows], change_percent[rows]
+    if risk_profile == "low":
+        keep, keys = b < 1.0, (b, -cap)
+    elif risk_profile == "moderate":
+        keep, keys = (b >= 0.8) & (b <= 1.3), (-np.abs(change), -cap)
+    else:
+        keep, keys = np.ones(len(rows), dtype=bool), (-change,)
+    # Symbols not quoted yet stay out of every ranking
+    keep &= price[rows] > 0
+    return rows[keep][np.lexsort([key[keep] for key in keys])]
+
+
+class _Snapshot:
+    """Immutable view of the universe: one row per (sector, ticker) plus rankings per (sector, risk profile)."""
+    
+    __slots__ = (
+        "sectors", "tickers", "names", "industries", "sector_codes", "price", "change", "change_percent",
+        "beta", "market_cap", "quoted_at", "rows_by_ticker", "sector_rows", "rankings", "built_at", "version"
+    )
+    
+    def __init__(
+        self,
+        records: List[Dict[str, Any]],
+        sectors: Sequence[str],
+        version: int,
+        quoted_at: Optional[Sequence[float]] = None
+    ):
+        self.sectors = tuple(sectors)
+        code_by_sector = {sector: code for code, sector in enumerate(self.sectors)}
+        self.tickers = np.array([record["ticker"] for record in records], dtype=object)
+        self.names = np.array([record["name"] for record in records], dtype=object)
+        self.industries = np.array([record.get("industry", "") for record in records], dtype=object)
+        self.sector_codes = np.array([code_by_sector[record["sector"].lower()] for record in records], dtype=np.int16)
+        self.price = np.array([record["price"] for record in records], dtype=np.float64)
+        self.change = np.array([record["change"] for record in records], dtype=np.float64)
+        self.change_percent = np.array([record["change_percent"] for record in records], dtype=np.float64)
+        self.beta = np.array([record["beta"] for record in records], dtype=np.float64)
+        self.market_cap = np.array([record["market_cap"] for record in records], dtype=np.float64)
+        # When each row's quote was taken; records without times count as quoted now
+        if quoted_at is None:
+            self.quoted_at = np.where(self.price > 0, time.time(), 0.0)
+        else:
+            self.quoted_at = np.array(quoted_at, dtype=np.float64)
+        
+        self.rows_by_ticker: Dict[str, List[int]] = {}
+        for row, ticker in enumerate(self.tickers):
+            self.rows_by_ticker.setdefault(ticker, []).append(row)
+        self.sector_rows = [np.flatnonzero(self.sector_codes == code) for code in range(len(self.sectors))]
+        self.rankings = {
+            (sector, profile): self.rank(code, profile)
+            for code, sector in enumerate(self.sectors) for profile in RISK_PROFILES
+        }
+        self.built_at = time.time()
+        self.version = version
+    
+    def rank(self, code: int, risk_profile: str) -> np.ndarray:
+        return rank_rows(
+            self.sector_rows[code], self.price, self.beta, self.market_cap, self.change_percent, risk_profile
+        )
+    
+    def priced(self, sector: str) -> int:
+        """Number of quoted rows in a sector (the "high" ranking keeps every one of them)."""
+        ranking = self.rankings.get((sector, "high"))
+        return len(ranking) if ranking is not None else 0
+    
+    def with_quotes(self, quotes: Dict[str, TimedQuote]) -> Optional["_Snapshot"]:
+        """Copy with new quote columns for the given tickers, re-ranking only the sectors they touch. None if nothing changed."""
+        price, change, change_percent = self.price.copy(), self.change.copy(), self.change_percent.copy()
+        quoted_at = self.quoted_at.copy()
+        dirty: Dict[int, Sequence[str]] = {}
+        retimed = False
+        for ticker, (quote, taken_at) in quotes.items():
+            for row in self.rows_by_ticker.get(ticker, ()):
+                values = (quote.get("c", 0), quote.get("d", 0), quote.get("dp", 0))
+                if quoted_at[row] != taken_at:
+                    quoted_at[row] = taken_at
+                    retimed = True
+                if (price[row], change[row], change_percent[row]) == values:
+                    continue
+                code = int(self.sector_codes[row])
+                # A row gaining or losing its price enters or leaves every ranking, not just the quote-ranked ones
+                if (price[row] > 0) != (values[0] > 0) or dirty.get(code) == RISK_PROFILES:
+                    dirty[code] = RISK_PROFILES
+                else:
+                    dirty[code] = QUOTE_RANKED_PROFILES
+                price[row], change[row], change_percent[row] = values
+        if not dirty and not retimed:
+            return None
+        
+        updated = object.__new__(_Snapshot)
+        for name in _Snapshot.__slots__:
+            setattr(updated, name, getattr(self, name))
+        updated.price, updated.change, updated.change_percent = price, change, change_percent
+        updated.quoted_at = quoted_at
+        updated.rankings = dict(self.rankings)
+        for code, profiles in dirty.items():
+            for profile in profiles:
+                updated.rankings[(self.sectors[code], profile)] = updated.rank(code, profile)
+        updated.version = self.version + 1
+        return updated
+    
+    def without_quotes_before(self, cutoff: float) -> Optional["_Snapshot"]:
+        """Copy with quotes taken before cutoff cleared, dropping those rows from the rankings. None if none are that old."""
+        expired = np.flatnonzero((self.price > 0) & (self.quoted_at < cutoff))
+        if not len(expired):
+            return None
+        return self.with_quotes({self.tickers[row]: (_NO_QUOTE, 0.0) for row in expired})
+    
+    def quote(self, ticker: str) -> Optional[TimedQuote]:
+        """Last known quote columns for a ticker and when they were taken, or None if it has no quote."""
+        rows = self.rows_by_ticker.get(ticker)
+        if not rows or self.price[rows[0]] <= 0:
+            return None
+        row = rows[0]
+        quote = {"c": float(self.price[row]), "d": float(self.change[row]), "dp": float(self.change_percent[row])}
+        return quote, float(self.quoted_at[row])
+    
+    def record(self, row: int) -> Dict[str, Any]:
+        """Row as the stock record the fetch path builds (FinnhubClient._build_sector_stock)."""
+        return {
+            "ticker": self.tickers[row],
+            "name": self.names[row],
+            "sector": self.sectors[self.sector_codes[row]].title(),
+            "industry": self.industries[row],
+            "price": float(self.price[row]),
+            "change": float(self.change[row]),
+            "change_percent": float(self.change_percent[row]),
+            "beta": float(self.beta[row]),
+            "market_cap": float(self.market_cap[row])
+        }
+
+
+class UniverseIndex:
+    """Precomputed stock universe with per-(sector, risk profile) rankings.
+    
+    The table holds every symbol of the universe file as columns, and each
+    sector's filtered, sorted ranking for each risk profile as row indices,
+    so a pick reads the top k rows instead of fetching, filtering and
+    sorting. Every quote carries the time it was taken; symbols without a
+    quote, or whose quote is older than ``max_quote_age``, are kept out of
+    the rankings until they are quoted again.
+    
+    Rebuilds never wait on a quote per symbol: they read the last quote the
+    index saw (falling back to the quote cache), stored profiles and
+    stored betas, and only the first build quotes each sector's
+    ``leaders_per_sector`` leading names so picks can be served right away.
+    A background loop rebuilds every ``refresh_interval`` seconds and in
+    between quotes the universe in small batches at background rate-limit
+    priority, taking the sectors in turn so each sector's largest names come
+    first. Batches take ``quote_share`` of the Finnhub scheduler's burst and
+    current rate, leaving the rest for interactive calls. Every quote the
+    Finnhub client caches is recorded and applied incrementally on the next
+    read: only the changed rows are rewritten and only their sectors
+    re-ranked. Snapshots are immutable and
+    swapped atomically, so readers never see a half-updated table. An index
+    older than ``max_age`` is not served.
+    """
+    
+    def __init__(
+        self,
+        finnhub: FinnhubClient,
+        universe: Optional[Universe] = None,
+        refresh_interval: float = 300.0,
+        quote_share: float = 0.5,
+        leaders_per_sector: int = 5,
+        max_quote_age: Optional[float] = None,
+        max_age: Optional[float] = None
+    ):
+        self.finnhub = finnhub
+        self.universe = universe or FinnhubClient.UNIVERSE
+        self.refresh_interval = refresh_interval
+        if not 0 < quote_share < 1:
+            raise ValueError(f"quote_share must be between 0 and 1, got {quote_share}")
+        self.quote_share = quote_share
+        self.leaders_per_sector = leaders_per_sector
+        self.max_age = max_age if max_age is not None else 3 * refresh_interval
+        
+        # Quote order: every sector's first name, then every sector's second name, and so on
+        sector_tickers = list(self.universe.sector_tickers().values())
+        depth = max((len(tickers) for tickers in sector_tickers), default=0)
+        self._quote_order = [
+            tickers[position] for position in range(depth) for tickers in sector_tickers if position < len(tickers)
+        ]
+        self._quote_cursor = 0
+        # Long enough for two background passes over the universe
+        self.max_quote_age = max_quote_age if max_quote_age is not None else 2 * self.refresh_period
+        
+        self._snapshot: Optional[_Snapshot] = None
+        self._pending: Dict[str, TimedQuote] = {}
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        
+        self.full_rebuilds = 0
+        self.failed_rebuilds = 0
+        self.incremental_updates = 0
+        self.quote_batches = 0
+        self.expired_quotes = 0
+        self.last_rebuild_ms = 0.0
+        
+        FinnhubClient.add_quote_listener(self._on_quote)
+    
+    @property
+    def quote_batch_size(self) -> int:
+        """Symbols per background batch: quote_share of the scheduler's burst."""
+        return max(1, int(self.finnhub.scheduler.burst * self.quote_share))
+    
+    @property
+    def quote_interval(self) -> float:
+        """Seconds between batches so background quotes use quote_share of the current (possibly backed-off) rate."""
+        return self.quote_batch_size / (self.finnhub.scheduler.rate * self.quote_share)
+    
+    @property
+    def refresh_period(self) -> float:
+        """Seconds to quote every symbol once at the scheduler's base rate."""
+        return len(self._quote_order) / (self.finnhub.scheduler.base_rate * self.quote_share)
+    
+    @property
+    def ready(self) -> bool:
+        """Whether the index is built and recent enough to serve picks."""
+        snapshot = self._snapshot
+        return snapshot is not None and time.time() - snapshot.built_at <= self.max_age
+    
+    def covers(self, sectors: Sequence[str], k: int) -> bool:
+        """Whether the index is ready and every requested sector has at least k quoted names to pick from."""
+        if not self.ready:
+            return False
+        snapshot = self._current()
+        return all(snapshot.priced(sector) >= k for sector in sectors)
+    
+    def start(self):
+        """Start the background refresh loop on the running event loop (no-op if already running)."""
+        if self._task is not None and not self._task.done():
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run())
+    
+    async def stop(self):
+        """Stop the background refresh loop."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except (asyncio.CancelledError, Exception):
+            pass
+        self._task = None
+    
+    async def _run(self):
+        """Rebuild now and every refresh_interval seconds; quote one batch every quote_interval seconds."""
+        last_rebuild = None
+        while True:
+            if last_rebuild is None or time.monotonic() - last_rebuild >= self.refresh_interval:
+                try:
+                    await self.rebuild()
+                    last_rebuild = time.monotonic()
+                except Exception as e:
+                    self.failed_rebuilds += 1
+                    print(f"⚠️ Universe index rebuild failed: {str(e)}")
+            try:
+                await self.refresh_quotes()
+            except Exception as e:
+                print(f"⚠️ Universe quote refresh failed: {str(e)}")
+            await asyncio.sleep(self.quote_interval)
+    
+    async def rebuild(self) -> int:
+        """Rebuild the whole table from cached quotes and stored profiles and betas. Returns the number of rows."""
+        started = time.perf_counter()
+        sector_tickers = self.universe.sector_tickers()
+        
+        if self._snapshot is None:
+            leaders = [ticker for tickers in sector_tickers.values() for ticker in tickers[:self.leaders_per_sector]]
+            await self.finnhub.get_quotes(leaders, priority=Priority.BACKGROUND)
+            # The leaders open the quote order, so the background batches start after them
+            self._quote_cursor = len(leaders) % max(len(self._quote_order), 1)
+        
+        # A full pass over a large universe outlasts the quote cache, so keep each row's last known quote
+        # and when it was taken; quotes recorded while building are newer and are replayed afterwards
+        previous = self._current()
+        now = time.time()
+        betas = self.finnhub.get_stored_betas(self.universe.tickers)
+        records, quoted_at = [], []
+        for sector, tickers in sector_tickers.items():
+            for ticker in tickers:
+                last = previous.quote(ticker) if previous else None
+                if last is None:
+                    cached = self.finnhub.get_cached_quote(ticker)
+                    age = self.finnhub.quote_cache.age(ticker) if cached else None
+                    last = (cached, now - age) if age is not None else ({}, 0.0)
+                records.append(self.finnhub._build_sector_stock(
+                    ticker, sector, last[0], self.finnhub.get_stored_profile(ticker),
+                    betas.get(ticker), self.universe.by_ticker[ticker]
+                ))
+                quoted_at.append(last[1])
+        
+        with self._lock:
+            version = self._snapshot.version + 1 if self._snapshot else 1
+            self._snapshot = _Snapshot(records, list(sector_tickers), version, quoted_at)
+        self._current()
+        
+        self.full_rebuilds += 1
+        self.last_rebuild_ms = (time.perf_counter() - started) * 1000
+        priced = int((self._snapshot.price > 0).sum())
+        print(f"✅ Universe index built: {len(records)} stocks ({priced} quoted) across {len(sector_tickers)} sectors")
+        return len(records)
+    
+    async def refresh_quotes(self) -> int:
+        """Quote the next batch of the universe; the quotes reach the index through the listener. Returns the batch size."""
+        if not self._quote_order:
+            return 0
+        size = min(self.quote_batch_size, len(self._quote_order))
+        batch = [self._quote_order[(self._quote_cursor + i) % len(self._quote_order)] for i in range(size)]
+        self._quote_cursor = (self._quote_cursor + size) % len(self._quote_order)
+        await self.finnhub.get_quotes(batch, priority=Priority.BACKGROUND)
+        self.quote_batches += 1
+        return size
+    
+    def _on_quote(self, ticker: str, quote: Dict[str, Any]):
+        """Quote listener: remember the latest quote per ticker until the next read."""
+        with self._lock:
+            if self._snapshot is not None and ticker in self._snapshot.rows_by_ticker:
+                self._pending[ticker] = (quote, time.time())
+    
+    def _apply_pending(self):
+        """Fold recorded quotes into a new snapshot."""
+        with self._lock:
+            if not self._pending or self._snapshot is None:
+                return
+            pending, self._pending = self._pending, {}
+            updated = self._snapshot.with_quotes(pending)
+            if updated is not None:
+                self._snapshot = updated
+                self.incremental_updates += 1
+    
+    def _expire_quotes(self):
+        """Drop quotes older than max_quote_age from the snapshot."""
+        with self._lock:
+            if self._snapshot is None:
+                return
+            cutoff = time.time() - self.max_quote_age
+            updated = self._snapshot.without_quotes_before(cutoff)
+            if updated is not None:
+                self.expired_quotes += int((self._snapshot.price > 0).sum() - (updated.price > 0).sum())
+                self._snapshot = updated
+    
+    def _current(self) -> Optional[_Snapshot]:
+        """Snapshot with recorded quotes applied and expired quotes dropped."""
+        if self._pending:
+            self._apply_pending()
+        self._expire_quotes()
+        return self._snapshot
+    
+    def ranked(self, sectors: Sequence[str], risk_profile: Any, k: int) -> List[Dict[str, Any]]:
+        """
+        Top k candidates per sector for a risk profile, best first, as stock records.
+        Returns: records for the requested sectors in request order
+        """
+        snapshot = self._current()
+        if snapshot is None:
+            return []
+        
+        profile = getattr(risk_profile, "value", risk_profile)
+        empty = np.empty(0, dtype=np.intp)
+        return [
+            snapshot.record(row)
+            for sector in dict.fromkeys(sectors)
+            for row in snapshot.rankings.get((sector, profile), empty)[:k]
+        ]
+    
+    def screen(
+        self,
+        risk_profile: Any = "high",
+        sector: Optional[str] = None,
+        industry: Optional[str] = None,
+        min_market_cap: float = 0,
+        limit: int = 25
+    ) -> List[Dict[str, Any]]:
+        """
+        Quoted stocks in the picker's order for a risk profile, optionally narrowed to a sector,
+        an industry and a minimum market cap. A sector reads its precomputed ranking; otherwise
+        every quoted row is ranked.
+        Returns: up to limit stock records, best first
+        """
+        snapshot = self._current()
+        if snapshot is None:
+            return []
+        
+        profile = getattr(risk_profile, "value", risk_profile)
+        if sector is not None:
+            rows = snapshot.rankings.get((sector, profile), np.empty(0, dtype=np.intp))
+        else:
+            rows = rank_rows(
+                np.arange(len(snapshot.tickers)), snapshot.price, snapshot.beta,
+                snapshot.market_cap, snapshot.change_percent, profile
+            )
+        keep = snapshot.market_cap[rows] >= min_market_cap
+        if industry:
+            keep &= snapshot.industries[rows] == industry
+        return [snapshot.record(row) for row in rows[keep][:limit]]
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return build and update counters for monitoring."""
+        snapshot = self._snapshot
+        return {
+            "ready": self.ready,
+            "universe": self.universe.version,
+            "rows": len(snapshot.tickers) if snapshot else 0,
+            "quoted_rows": int((snapshot.price > 0).sum()) if snapshot else 0,
+            "version": snapshot.version if snapshot else 0,
+            "age_seconds": round(time.time() - snapshot.built_at, 1) if snapshot else None,
+            "pending_quotes": len(self._pending),
+            "full_rebuilds": self.full_rebuilds,
+            "failed_rebuilds": self.failed_rebuilds,
+            "incremental_updates": self.incremental_updates,
+            "quote_batches": self.quote_batches,
+            "expired_quotes": self.expired_quotes,
+            "max_quote_age_seconds": round(self.max_quote_age, 1),
+            "quote_batch_size": self.quote_batch_size,
+            "quote_interval_seconds": round(self.quote_interval, 2),
+            "refresh_period_seconds": round(self.refresh_period, 1),
+            "last_rebuild_ms": round(self.last_rebuild_ms, 2)
+        }
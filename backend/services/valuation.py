@@ -0,0 +1,153 @@
+import math
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from pydantic import BaseModel
+
+from models.portfolio import Portfolio, StockHolding
+
+
+class HoldingsFrame:
+    """Columnar view of the holdings of one or many portfolios.
+    
+    Every holding becomes one row across parallel float64/int arrays, with
+    ``owners`` recording which portfolio (group) it belongs to and
+    ``sector_codes`` indexing into ``sectors``. Holdings without a price are
+    NaN so valuation can fall back to their last stored values.
+    """
+    
+    def __init__(self, holding_groups: Sequence[Sequence[StockHolding]], total_invested: Optional[Sequence[float]] = None):
+        self.groups = holding_groups
+        self.n_groups = len(holding_groups)
+        
+        rows = [holding for group in holding_groups for holding in group]
+        n = len(rows)
+        self.tickers: List[str] = [holding.ticker.upper() for holding in rows]
+        self.owners = np.repeat(np.arange(self.n_groups), [len(group) for group in holding_groups])
+        self.quantity = np.fromiter((h.quantity for h in rows), dtype=np.float64, count=n)
+        self.average_price = np.fromiter((h.average_price for h in rows), dtype=np.float64, count=n)
+        self.current_price = np.fromiter(
+            (h.current_price if h.current_price is not None else np.nan for h in rows), dtype=np.float64, count=n
+        )
+        self.stored_value = np.fromiter((h.total_value or 0.0 for h in rows), dtype=np.float64, count=n)
+        self.stored_gain = np.fromiter((h.gain_loss or 0.0 for h in rows), dtype=np.float64, count=n)
+        
+        sector_index: Dict[str, int] = {}
+        self.sector_codes = np.fromiter(
+            (sector_index.setdefault(h.sector, len(sector_index)) for h in rows), dtype=np.int64, count=n
+        )
+        self.sectors = list(sector_index)
+        
+        self.total_invested = (
+            np.asarray(total_invested, dtype=np.float64) if total_invested is not None
+            else np.full(self.n_groups, np.nan)
+        )
+    
+    @classmethod
+    def from_portfolios(cls, portfolios: Sequence[Portfolio]) -> "HoldingsFrame":
+        """Build a frame with one group per portfolio."""
+        return cls([portfolio.holdings for portfolio in portfolios], [portfolio.total_invested for portfolio in portfolios])
+    
+    def apply_prices(self, prices: Dict[str, float]):
+        """Set current prices from a ticker -> price map, keeping existing prices for unknown tickers."""
+        if not prices or not self.tickers:
+            return
+        unique, inverse = np.unique(np.asarray(self.tickers, dtype=object), return_inverse=True)
+        looked_up = np.fromiter((prices.get(ticker) or np.nan for ticker in unique), dtype=np.float64, count=len(unique))
+        new_price = looked_up[inverse]
+        self.current_price = np.where(np.isnan(new_price), self.current_price, new_price)
+
+
+class Valuation:
+    """Per-holding and per-portfolio results of one vectorized valuation pass."""
+    
+    def __init__(self, frame: HoldingsFrame):
+        self.frame = frame
+        priced = ~np.isnan(frame.current_price)
+        cost_basis = frame.quantity * frame.average_price
+        
+        # Unpriced holdings keep their last stored value and gain, as before
+        self.priced = priced
+        self.holding_value = np.where(priced, frame.quantity * frame.current_price, frame.stored_value)
+        self.holding_gain = np.where(priced, self.holding_value - cost_basis, frame.stored_gain)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.holding_gain_percent = np.where(cost_basis > 0, self.holding_gain / cost_basis * 100, np.nan)
+        
+        n, k = frame.n_groups, len(frame.sectors)
+        self.total_value = np.bincount(frame.owners, weights=self.holding_value, minlength=n)
+        self.total_gain = np.bincount(frame.owners, weights=self.holding_gain, minlength=n)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.total_gain_percent = np.where(
+                frame.total_invested > 0, self.total_gain / frame.total_invested * 100, np.nan
+            )
+        
+        # (portfolio, sector) value and holding-count matrices in one bincount each
+        cells = frame.owners * k + frame.sector_codes
+        self.sector_values = np.bincount(cells, weights=self.holding_value, minlength=n * k).reshape(n, k)
+        self.sector_counts = np.bincount(cells, minlength=n * k).reshape(n, k)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.sector_percent = np.where(
+                self.total_value[:, None] > 0, self.sector_values / self.total_value[:, None] * 100, self.sector_values
+            )
+    
+    def sector_allocation(self, group: int) -> Dict[str, float]:
+        """Sector -> % of value for one portfolio (raw values if it is worth nothing)."""
+        present = np.nonzero(self.sector_counts[group])[0]
+        return {self.frame.sectors[code]: float(self.sector_percent[group, code]) for code in present}
+    
+    def write_holdings(self):
+        """Copy per-holding results back onto the priced StockHolding models."""
+        rows = [holding for group in self.frame.groups for holding in group]
+        price = self.frame.current_price.tolist()
+        value = self.holding_value.tolist()
+        gain = self.holding_gain.tolist()
+        gain_percent = self.holding_gain_percent.tolist()
+        for i in np.nonzero(self.priced)[0].tolist():
+            updates = {"current_price": price[i], "total_value": value[i], "gain_loss": gain[i]}
+            if not math.isnan(gain_percent[i]):
+                updates["gain_loss_percent"] = gain_percent[i]
+            _assign(rows[i], updates)
+    
+    def write_portfolios(self, portfolios: Sequence[Portfolio]):
+        """Copy holding results and portfolio totals back onto the Portfolio models."""
+        self.write_holdings()
+        total_value = self.total_value.tolist()
+        total_gain = self.total_gain.tolist()
+        total_gain_percent = self.total_gain_percent.tolist()
+        for i, portfolio in enumerate(portfolios):
+            updates = {"current_value": total_value[i], "total_gain_loss": total_gain[i]}
+            if not math.isnan(total_gain_percent[i]):
+                updates["total_gain_loss_percent"] = total_gain_percent[i]
+            _assign(portfolio, updates)
+
+
+def _assign(model: BaseModel, updates: Dict[str, float]):
+    """Set already-computed float fields in one step.
+    
+    Pydantic's __setattr__ costs about 2.7 us per field here: with setattr the
+    10,000-portfolio benchmark spends 1.5 s in the engine instead of 0.4 s, and
+    at 100 portfolios the engine is slower than the per-holding loop it
+    replaced. These models don't validate on assignment, so setattr would only
+    store the value and mark the field set; do both directly. Models that opt
+    into validate_assignment go through setattr.
+    """
+    if model.model_config.get("validate_assignment"):
+        for field, value in updates.items():
+            setattr(model, field, value)
+        return
+    vars(model).update(updates)
+    model.model_fields_set.update(updates)
+
+
+def value_portfolios(portfolios: Sequence[Portfolio], prices: Optional[Dict[str, float]] = None) -> Valuation:
+    """Reprice and value many portfolios in one pass."""
+    frame = HoldingsFrame.from_portfolios(portfolios)
+    frame.apply_prices(prices or {})
+    return Valuation(frame)
+
+
+def value_holdings(holdings: Sequence[StockHolding], prices: Optional[Dict[str, float]] = None) -> Valuation:
+    """Reprice and value a single list of holdings."""
+    frame = HoldingsFrame([holdings])
+    frame.apply_prices(prices or {})
+    return Valuation(frame)
@@ -0,0 +1,171 @@
+import time
+import random
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+
+class _Job:
+    """One deferred write."""
+    
+    __slots__ = ("name", "fn", "args", "kwargs", "enqueued_at")
+    
+    def __init__(self, name: str, fn: Callable[..., Awaitable[Any]], args: Tuple, kwargs: Dict[str, Any]):
+        self.name = name
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.enqueued_at = time.monotonic()
+
+
+class WriteBehindQueue:
+    """Bounded background queue for writes the caller does not need to wait on.
+    
+    Jobs are drained in batches and each batch runs concurrently. A job that
+    raises or returns a falsy result is retried with exponential backoff and
+    jitter. When the queue is full new jobs are dropped (and counted) rather
+    than blocking the request path. ``stop`` flushes whatever is queued before
+    the process exits.
+    """
+    
+    def __init__(
+        self,
+        capacity: int = 1000,
+        batch_size: int = 20,
+        max_retries: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 10.0,
+        linger: float = 0.05
+    ):
+        self.capacity = capacity
+        self.batch_size = max(1, batch_size)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.linger = linger
+        
+        self._queue: Optional[asyncio.Queue] = None
+        # Enqueue times of queued jobs, oldest first, kept in step with the FIFO queue
+        self._pending: deque = deque()
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        
+        self.enqueued = 0
+        self.completed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.retries = 0
+        self.batches = 0
+        self.max_lag = 0.0
+    
+    def start(self):
+        """Start the worker on the running event loop (no-op if already running)."""
+        loop = asyncio.get_running_loop()
+        if self._task is not None and not self._task.done() and self._loop is loop:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.capacity)
+        self._pending.clear()
+        self._task = loop.create_task(self._run())
+    
+    def enqueue(self, name: str, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> bool:
+        """Queue fn(*args, **kwargs) to run in the background. Returns False if dropped."""
+        self.start()
+        job = _Job(name, fn, args, kwargs)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            print(f"⚠️ Write-behind queue full, dropped {name}")
+            return False
+        self._pending.append(job.enqueued_at)
+        self.enqueued += 1
+        return True
+    
+    async def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued job has finished. Returns False on timeout."""
+        if self._queue is None:
+            return True
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+    
+    async def stop(self, timeout: float = 10.0):
+        """Flush queued writes, then stop the worker."""
+        if self._task is None:
+            return
+        pending = self._queue.qsize()
+        if not await self.flush(timeout):
+            print(f"⚠️ Write-behind flush timed out with {self._queue.qsize()} writes pending")
+        elif pending:
+            print(f"✅ Flushed {pending} pending writes")
+        self._task.cancel()
+        try:
+            await self._task
+        except (asyncio.CancelledError, Exception):
+            pass
+        self._task = None
+    
+    async def _run(self):
+        """Drain the queue in batches forever."""
+        while True:
+            batch = [await self._queue.get()]
+            
+            # Give closely spaced writes (e.g. both sides of a chat turn) a moment to join the batch
+            if self.linger > 0 and self._queue.qsize() < self.batch_size - 1:
+                await asyncio.sleep(self.linger)
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            for _ in batch:
+                self._pending.popleft()
+            
+            self.batches += 1
+            try:
+                await asyncio.gather(*(self._run_job(job) for job in batch))
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+    
+    async def _run_job(self, job: _Job):
+        """Run one job, retrying failures with exponential backoff."""
+        self.max_lag = max(self.max_lag, time.monotonic() - job.enqueued_at)
+        for attempt in range(self.max_retries + 1):
+            try:
+                if await job.fn(*job.args, **job.kwargs):
+                    self.completed += 1
+                    return
+                error = "returned no result"
+            except Exception as e:
+                error = str(e)
+            
+            if attempt < self.max_retries:
+                self.retries += 1
+                delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+                await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+        
+        self.failed += 1
+        print(f"❌ Background write {job.name} failed after {self.max_retries + 1} attempts: {error}")
+    
+    def _oldest_age(self) -> float:
+        """Seconds the oldest queued job has been waiting."""
+        if not self._pending:
+            return 0.0
+        return time.monotonic() - self._pending[0]
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return queue depth, lag and outcome counters for monitoring."""
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "depth": self._queue.qsize() if self._queue is not None else 0,
+            "capacity": self.capacity,
+            "lag_seconds": round(self._oldest_age(), 4),
+            "max_lag_seconds": round(self.max_lag, 4),
+            "enqueued": self.enqueued,
+            "completed": self.completed,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "retries": self.retries,
+            "batches": self.batches
+        }
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Finnhub trades WebSocket.
+
+Replays recorded trade messages to every connected client, filtered to the
+symbols each client subscribed to, with timestamps rewritten to "now" so the
+price board treats them as live.
+
+Usage:
+  python -m standins.finnhub_ws                      # ws://localhost:8765
+  python -m standins.finnhub_ws --port 9000 --speed 10
+  FINNHUB_STREAM_ENABLED=true FINNHUB_WS_URL=ws://localhost:8765 python app.py --server
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+from typing import Any, Dict, List, Set
+
+import websockets
+
+
+DEFAULT_TICKS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "finnhub_trades.jsonl")
+
+
+def load_ticks(path: str) -> List[Dict[str, Any]]:
+    """Load recorded Finnhub trade messages, one JSON object per line."""
+    ticks = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                ticks.append(json.loads(line))
+    return ticks
+
+
+class TradeReplayServer:
+    """Replays recorded trades to subscribed WebSocket clients."""
+    
+    def __init__(self, ticks: List[Dict[str, Any]], speed: float = 1.0, loop_forever: bool = True):
+        self.ticks = ticks
+        self.speed = speed
+        self.loop_forever = loop_forever
+    
+    async def handler(self, websocket):
+        """Serve one client: track subscriptions and stream matching trades."""
+        subscriptions: Set[str] = set()
+        replay = asyncio.create_task(self._replay(websocket, subscriptions))
+        try:
+            async for raw in websocket:
+                try:
+                    message = json.loads(raw)
+                except ValueError:
+                    continue
+                symbol = (message.get("symbol") or "").upper()
+                if message.get("type") == "subscribe" and symbol:
+                    subscriptions.add(symbol)
+                elif message.get("type") == "unsubscribe":
+                    subscriptions.discard(symbol)
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            replay.cancel()
+    
+    async def _replay(self, websocket, subscriptions: Set[str]):
+        """Send recorded trades with their original spacing, scaled by speed."""
+        while True:
+            previous = None
+            for tick in self.ticks:
+                trades = tick.get("data") or []
+                if trades and previous is not None:
+                    gap = (trades[0]["t"] - previous) / 1000 / self.speed
+                    if gap > 0:
+                        await asyncio.sleep(gap)
+                if trades:
+                    previous = trades[0]["t"]
+                
+                now_ms = int(time.time() * 1000)
+                matching = [dict(t, t=now_ms) for t in trades if t.get("s") in subscriptions]
+                if matching:
+                    await websocket.send(json.dumps({"data": matching, "type": "trade"}))
+                else:
+                    await asyncio.sleep(0)
+            
+            if not self.loop_forever:
+                return
+
+
+async def serve(host: str, port: int, ticks_path: str, speed: float):
+    """Run the replay server until interrupted."""
+    ticks = load_ticks(ticks_path)
+    server = TradeReplayServer(ticks, speed=speed)
+    async with websockets.serve(server.handler, host, port):
+        print(f"📡 Replaying {len(ticks)} recorded trade messages on ws://{host}:{port} (speed x{speed})")
+        await asyncio.Future()
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Finnhub trades WebSocket stand-in")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--ticks", default=DEFAULT_TICKS, help="JSONL file of recorded trade messages")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed multiplier")
+    args = parser.parse_args(argv)
+    
+    try:
+        asyncio.run(serve(args.host, args.port, args.ticks, args.speed))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
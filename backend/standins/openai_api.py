@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the OpenAI chat completions API.
+
+Speaks enough of /v1/chat/completions (including stream=true) for the
+OpenAI SDK to talk to it, with configurable time-to-first-token latency,
+token generation rate and injected errors, so load tests exercise realistic
+LLM latency without spending tokens. Replies are generated from the prompt
+and are deterministic for a given seed.
+
+Usage:
+  python -m standins.openai_api                                  # http://localhost:8766/v1
+  python -m standins.openai_api --latency lognormal:-0.7,0.4 --tokens-per-second 60
+  python -m standins.openai_api --error-rate 0.05 --error-status 429,500 --seed 7
+  OPENAI_API_KEY=standin OPENAI_BASE_URL=http://localhost:8766/v1 python app.py --server
+"""
+
+import re
+import sys
+import json
+import time
+import uuid
+import random
+import asyncio
+import argparse
+from typing import Any, Dict, List, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+SENTENCES = [
+    "This allocation balances growth potential with the stated risk profile.",
+    "Diversifying across the selected sectors limits exposure to any single market shock.",
+    "The position sizes keep the portfolio close to the budget while leaving a small cash buffer.",
+    "Over the chosen horizon, steady compounding makes the target return reasonable.",
+    "Revisit the mix periodically and rebalance if one sector drifts too far from its weight.",
+    "Large, established companies anchor the portfolio while growth names add upside.",
+]
+
+
+class LatencyModel:
+    """Samples time-to-first-token delays from a configured distribution.
+    
+    Specs look like "fixed:0.2", "uniform:0.1,0.5", "normal:0.3,0.05",
+    "lognormal:-1.2,0.5" (parameters of the underlying normal) or
+    "exponential:0.3" (mean). All values are in seconds.
+    """
+    
+    def __init__(self, spec: str, rng: random.Random):
+        self.spec = spec
+        self.rng = rng
+        kind, _, params = spec.partition(":")
+        self.kind = kind.strip().lower()
+        self.params = [float(p) for p in params.split(",") if p.strip()]
+        if self.kind not in ("fixed", "uniform", "normal", "lognormal", "exponential"):
+            raise ValueError(f"Unknown latency distribution: {spec}")
+    
+    def sample(self) -> float:
+        """Return a non-negative delay in seconds."""
+        p = self.params
+        if self.kind == "fixed":
+            delay = p[0] if p else 0.0
+        elif self.kind == "uniform":
+            delay = self.rng.uniform(p[0], p[1])
+        elif self.kind == "normal":
+            delay = self.rng.gauss(p[0], p[1])
+        elif self.kind == "lognormal":
+            delay = self.rng.lognormvariate(p[0], p[1])
+        else:
+            delay = self.rng.expovariate(1 / p[0]) if p and p[0] > 0 else 0.0
+        return max(0.0, delay)
+
+
+class CompletionStandIn:
+    """Generates chat completions with simulated latency and failures."""
+    
+    def __init__(
+        self,
+        latency: str = "fixed:0.2",
+        tokens_per_second: float = 80.0,
+        error_rate: float = 0.0,
+        error_statuses: Optional[List[int]] = None,
+        seed: Optional[int] = None
+    ):
+        self.rng = random.Random(seed)
+        self.latency = LatencyModel(latency, self.rng)
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.error_statuses = error_statuses or [500]
+        
+        self.requests = 0
+        self.streamed = 0
+        self.errors = 0
+        self.completion_tokens = 0
+    
+    def _pick_error(self) -> Optional[int]:
+        """Decide whether this request fails, and with which status."""
+        if self.error_rate > 0 and self.rng.random() < self.error_rate:
+            return self.rng.choice(self.error_statuses)
+        return None
+    
+    def _reply(self, body: Dict[str, Any]) -> str:
+        """Build a reply from the prompt: JSON per ticker in JSON mode, prose otherwise."""
+        messages = body.get("messages") or []
+        prompt = "\n".join(str(m.get("content", "")) for m in messages)
+        max_tokens = int(body.get("max_tokens") or 256)
+        
+        # Same prompt, same reply
+        rng = random.Random(prompt)
+        if (body.get("response_format") or {}).get("type") == "json_object":
+            tickers = re.findall(r"^- ([A-Z][A-Z.]{0,5}) \(", prompt, re.MULTILINE)
+            return json.dumps({ticker: rng.choice(SENTENCES) for ticker in dict.fromkeys(tickers)})
+        
+        words: List[str] = []
+        target = min(max_tokens, rng.randint(40, 90))
+        while len(words) < target:
+            words.extend(rng.choice(SENTENCES).split())
+        return " ".join(words[:target])
+    
+    @staticmethod
+    def _count_tokens(text: str) -> int:
+        """Rough token count (about four characters per token)."""
+        return max(1, len(text) // 4)
+    
+    def _error_response(self, status: int) -> JSONResponse:
+        """An OpenAI-shaped error body."""
+        self.errors += 1
+        headers = {"retry-after": "1"} if status == 429 else None
+        return JSONResponse(
+            status_code=status,
+            content={"error": {"message": f"Injected error ({status})", "type": "standin_error", "code": status}},
+            headers=headers
+        )
+    
+    async def complete(self, body: Dict[str, Any]):
+        """Handle one /v1/chat/completions request."""
+        self.requests += 1
+        status = self._pick_error()
+        await asyncio.sleep(self.latency.sample())
+        if status is not None:
+            return self._error_response(status)
+        
+        model = body.get("model", "gpt-4o-mini")
+        content = self._reply(body)
+        prompt_tokens = self._count_tokens(json.dumps(body.get("messages") or []))
+        chunks = re.findall(r"\S+\s*", content)
+        self.completion_tokens += len(chunks)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+        
+        if body.get("stream"):
+            self.streamed += 1
+            return StreamingResponse(
+                self._stream(completion_id, created, model, chunks),
+                media_type="text/event-stream"
+            )
+        
+        # Non-streaming replies still take as long as generating every token
+        if self.tokens_per_second > 0:
+            await asyncio.sleep(len(chunks) / self.tokens_per_second)
+        return JSONResponse({
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": len(chunks),
+                "total_tokens": prompt_tokens + len(chunks)
+            }
+        })
+    
+    async def _stream(self, completion_id: str, created: int, model: str, chunks: List[str]):
+        """Emit one SSE chunk per token at the configured rate."""
+        
+        def event(delta: Dict[str, Any], finish_reason: Optional[str] = None) -> str:
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+            }
+            return f"data: {json.dumps(payload)}\n\n"
+        
+        interval = 1 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+        yield event({"role": "assistant", "content": ""})
+        for chunk in chunks:
+            if interval:
+                await asyncio.sleep(interval)
+            yield event({"content": chunk})
+        yield event({}, "stop")
+        yield "data: [DONE]\n\n"
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return request counters."""
+        return {
+            "latency": self.latency.spec,
+            "tokens_per_second": self.tokens_per_second,
+            "error_rate": self.error_rate,
+            "requests": self.requests,
+            "streamed": self.streamed,
+            "errors": self.errors,
+            "completion_tokens": self.completion_tokens
+        }
+
+
+def create_app(standin: CompletionStandIn) -> FastAPI:
+    """Build the stand-in HTTP app."""
+    app = FastAPI(title="OpenAI stand-in")
+    
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        return await standin.complete(await request.json())
+    
+    @app.get("/v1/models")
+    async def list_models():
+        return {"object": "list", "data": [{"id": "gpt-4o-mini", "object": "model", "owned_by": "standin"}]}
+    
+    @app.get("/stats")
+    async def stats():
+        return standin.stats()
+    
+    return app
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="OpenAI chat completions stand-in")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency", default="fixed:0.2", help="Time to first token, e.g. uniform:0.1,0.5 or lognormal:-1.2,0.5")
+    parser.add_argument("--tokens-per-second", type=float, default=80.0, help="Generation rate (0 for instant)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail")
+    parser.add_argument("--error-status", default="500", help="Comma-separated HTTP statuses to inject")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for latency and error sampling")
+    args = parser.parse_args(argv)
+    
+    standin = CompletionStandIn(
+        latency=args.latency,
+        tokens_per_second=args.tokens_per_second,
+        error_rate=args.error_rate,
+        error_statuses=[int(s) for s in args.error_status.split(",") if s.strip()],
+        seed=args.seed
+    )
+    print(f"🤖 OpenAI stand-in on http://{args.host}:{args.port}/v1 "
+          f"(latency {args.latency}, {args.tokens_per_second:g} tok/s, error rate {args.error_rate:g})")
+    uvicorn.run(create_app(standin), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,49 @@
+import os
+import sys
+
+import pytest
+
+# Tests import the backend packages (services, models) the way app.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeClock:
+    """Stand-in for the time module with a manually advanced clock."""
+    
+    def __init__(self, start: float = 1_000_000.0):
+        self.now = start
+    
+    def monotonic(self) -> float:
+        return self.now
+    
+    def time(self) -> float:
+        return self.now
+    
+    def perf_counter(self) -> float:
+        return self.now
+    
+    def sleep(self, seconds: float):
+        self.now += seconds
+    
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def finnhub(monkeypatch):
+    """A FinnhubClient on mock data with empty process-wide caches and listeners."""
+    from services.finnhub_client import FinnhubClient
+    from services.rate_limiter import RequestScheduler
+    
+    monkeypatch.delenv("FINNHUB_API_KEY", raising=False)
+    monkeypatch.setattr(FinnhubClient, "_quote_listeners", [])
+    client = FinnhubClient()
+    client.quote_cache.clear()
+    client.scheduler = RequestScheduler(rate_per_minute=60, burst=10)
+    yield client
+    client.quote_cache.clear()
@@ -0,0 +1,93 @@
+import itertools
+import math
+import random
+
+import pytest
+
+from services.allocator import Allocator, GreedyAllocator, OptimizedAllocator, allocate_whole_shares, get_allocator
+
+
+def objective(quantities, prices, targets, budget, penalty):
+    spent = sum(q * p for q, p in zip(quantities, prices))
+    return budget - spent + penalty * sum(abs(q * p - t) for q, p, t in zip(quantities, prices, targets))
+
+
+def brute_force(prices, targets, budget, penalty):
+    """Best objective over every whole-share combination within budget."""
+    ranges = [range(math.floor(budget / price) + 1) for price in prices]
+    return min(
+        objective(quantities, prices, targets, budget, penalty)
+        for quantities in itertools.product(*ranges)
+        if sum(q * p for q, p in zip(quantities, prices)) <= budget
+    )
+
+
+def small_cases(count, seed=5):
+    rng = random.Random(seed)
+    for _ in range(count):
+        n = rng.randint(1, 4)
+        prices = [round(rng.uniform(5, 400), 2) for _ in range(n)]
+        budget = round(rng.uniform(100, 1200), 2)
+        weights = [rng.random() + 0.1 for _ in range(n)]
+        targets = [budget * w / sum(weights) for w in weights]
+        yield prices, targets, budget
+
+
+@pytest.mark.parametrize("penalty", [0.25, 0.5, 0.9])
+def test_branch_and_bound_matches_brute_force(penalty):
+    tolerance = 1e-4
+    for prices, targets, budget in small_cases(60):
+        quantities = allocate_whole_shares(prices, targets, budget, penalty, tolerance=tolerance)
+        assert sum(q * p for q, p in zip(quantities, prices)) <= budget + 1e-9
+        best = brute_force(prices, targets, budget, penalty)
+        assert objective(quantities, prices, targets, budget, penalty) <= best + tolerance * budget + 1e-9
+
+
+def test_expensive_stock_still_gets_a_share():
+    # Flooring each stock to its 500 target would leave the 900 stock empty and most of the budget in cash
+    quantities = allocate_whole_shares([900.0, 50.0], [500.0, 500.0], 1000.0)
+    assert quantities == [1, 2]
+
+
+def test_no_stocks_or_no_budget():
+    assert allocate_whole_shares([], [], 1000.0) == []
+    assert allocate_whole_shares([500.0], [50.0], 100.0) == [0]
+
+
+def stock(ticker, sector, price, beta=1.0):
+    return {"ticker": ticker, "sector": sector, "price": price, "beta": beta}
+
+
+def test_greedy_splits_equally_per_sector_and_stock():
+    stocks = [
+        stock("A", "Technology", 100.0), stock("B", "Technology", 30.0),
+        stock("C", "Technology", 10.0), stock("D", "Technology", 10.0), stock("E", "Energy", 60.0)
+    ]
+    allocation = GreedyAllocator().allocate(stocks, 1200.0, ["technology", "energy"])
+    # 600 per sector; technology's top three get 200 each and D is not picked
+    assert [(s["ticker"], q) for s, q in allocation] == [("A", 2), ("B", 6), ("C", 20), ("E", 10)]
+
+
+def test_optimized_spends_more_of_the_budget_than_greedy():
+    stocks = [
+        stock("A", "Technology", 450.0, 1.5), stock("B", "Technology", 130.0, 1.1), stock("E", "Energy", 95.0, 0.8)
+    ]
+    budget = 1000.0
+    greedy = GreedyAllocator().allocate(stocks, budget, ["technology", "energy"])
+    optimized = OptimizedAllocator().allocate(stocks, budget, ["technology", "energy"])
+    
+    def spent(allocation):
+        return sum(s["price"] * q for s, q in allocation)
+    
+    assert spent(optimized) <= budget
+    assert budget - spent(optimized) < budget - spent(greedy)
+    assert budget - spent(optimized) < min(s["price"] for s in stocks)
+
+
+def test_allocators_are_built_by_name():
+    assert isinstance(get_allocator("greedy"), GreedyAllocator)
+    assert isinstance(get_allocator("optimized"), OptimizedAllocator)
+    with pytest.raises(ValueError):
+        get_allocator("random")
+    with pytest.raises(TypeError):
+        Allocator()
@@ -0,0 +1,133 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from models.request import BacktestRequest, RebalanceFrequency
+from services.allocator import GreedyAllocator, OptimizedAllocator
+from services.backtest import Backtester
+from services.finnhub_client import FinnhubClient
+
+
+END = date(2025, 12, 31)
+
+
+@pytest.fixture
+def backtester(finnhub):
+    return Backtester(finnhub)
+
+
+def test_universe_covers_every_symbol_in_the_requested_sectors(finnhub):
+    energy, utilities = FinnhubClient.SECTOR_TICKERS["energy"], FinnhubClient.SECTOR_TICKERS["utilities"]
+    tickers, codes = Backtester(finnhub).universe(["energy", "utilities"])
+    assert tickers == energy + utilities
+    assert codes.tolist() == [0] * len(energy) + [1] * len(utilities)
+    
+    capped, _ = Backtester(finnhub, candidates_per_sector=2).universe(["energy"])
+    assert capped == FinnhubClient.SECTOR_TICKERS["energy"][:2]
+
+
+def test_rolling_betas_match_a_direct_regression(backtester):
+    backtester.beta_window, backtester.min_beta_observations = 20, 10
+    rng = np.random.default_rng(0)
+    market = rng.normal(0, 0.01, 60)
+    returns = np.column_stack([1.4 * market + rng.normal(0, 0.004, 60), 0.6 * market + rng.normal(0, 0.004, 60)])
+    betas = backtester.rolling_betas(returns, market)
+    
+    assert np.isnan(betas[:9]).all()
+    for day in (9, 30, 59):
+        window = slice(max(0, day - 19), day + 1)
+        for column in range(2):
+            expected = np.polyfit(market[window], returns[window, column], 1)[0]
+            assert betas[day, column] == pytest.approx(round(expected, 2), abs=0.011)
+
+
+def test_check_days_are_the_first_trading_day_of_each_period(backtester):
+    days = np.array(["2025-01-30", "2025-01-31", "2025-02-03", "2025-02-04", "2025-03-03"], dtype="datetime64[D]")
+    assert backtester.check_days(days, RebalanceFrequency.DAILY).tolist() == [True] * 5
+    assert backtester.check_days(days, RebalanceFrequency.MONTHLY).tolist() == [True, False, True, False, True]
+    assert backtester.check_days(days, RebalanceFrequency.QUARTERLY).tolist() == [True, False, False, False, False]
+    assert backtester.check_days(days, RebalanceFrequency.NEVER).tolist() == [True, False, False, False, False]
+
+
+def test_select_takes_the_top_three_per_sector_by_the_pickers_order(backtester):
+    # One day, five stocks in sector 0 and one in sector 1
+    betas = np.array([[0.9, 1.2, 1.0, 0.5, 1.1, 1.0]])
+    caps = np.array([[10.0, 50.0, 40.0, 30.0, 20.0, 5.0]])
+    change = np.array([[1.0, -4.0, 2.0, 0.5, 3.0, -1.0]])
+    eligible = np.array([[True, True, True, True, False, True]])
+    codes = np.array([0, 0, 0, 0, 0, 1])
+    
+    def picked(profile):
+        selection = backtester.select(profile, betas, caps, change, eligible, codes, 2)
+        return np.nonzero(selection[0])[0].tolist()
+    
+    # low: beta under 1, largest caps first
+    assert picked("low") == [0, 3]
+    # moderate: beta 0.8-1.3, biggest absolute move first
+    assert picked("moderate") == [0, 1, 2, 5]
+    # high: every eligible stock, best daily change first
+    assert picked("high") == [0, 2, 3, 5]
+
+
+def test_allocate_splits_equity_equally_per_sector_and_pick(backtester):
+    selection = np.array([[True, True, True], [True, False, True]])
+    prices = np.array([[10.0, 20.0, 50.0], [20.0, 20.0, 50.0]])
+    shares, cash = backtester._allocate_greedy(np.array([0, 1]), selection, prices, np.array([0, 0, 1]), 2, 1000.0)
+    
+    assert shares[0].tolist() == [25.0, 12.0, 10.0]
+    assert cash[0] == pytest.approx(10.0)
+    # Day two: the holdings are worth 1240 plus 10 cash, re-split over the remaining picks
+    assert shares[1].tolist() == [31.0, 0.0, 12.0]
+    assert cash[1] == pytest.approx(1250.0 - 620.0 - 600.0)
+
+
+def test_allocate_through_the_greedy_allocator_matches_the_vectorized_path(finnhub):
+    backtester = Backtester(finnhub, allocator=GreedyAllocator())
+    ranks = np.array([[0, 1, 0], [0, 3, 0]])
+    prices = np.array([[10.0, 20.0, 50.0], [20.0, 20.0, 50.0]])
+    betas = np.ones_like(prices)
+    codes = np.array([0, 0, 1])
+    
+    shares, cash = backtester._allocate(np.array([0, 1]), ranks, prices, betas, codes, ["energy", "utilities"], 1000.0)
+    expected_shares, expected_cash = backtester._allocate_greedy(np.array([0, 1]), ranks < 3, prices, codes, 2, 1000.0)
+    assert shares.tolist() == expected_shares.tolist()
+    assert cash == pytest.approx(expected_cash)
+
+
+def test_backtester_replays_the_allocator_live_picks_use(finnhub, monkeypatch):
+    monkeypatch.setenv("STOCK_ALLOCATOR", "greedy")
+    assert isinstance(Backtester(finnhub).allocator, GreedyAllocator)
+    monkeypatch.delenv("STOCK_ALLOCATOR")
+    assert isinstance(Backtester(finnhub).allocator, OptimizedAllocator)
+    
+    request = BacktestRequest(
+        budget=2_000, sectors=["technology", "energy"], risk_profile="high",
+        goal={"target_return": 8, "duration_years": 2}, years=2, rebalance="quarterly"
+    )
+    greedy = Backtester(finnhub, candidates_per_sector=5, allocator=GreedyAllocator()).run(request, end=END)
+    optimized = Backtester(finnhub, candidates_per_sector=5, allocator=OptimizedAllocator()).run(request, end=END)
+    assert greedy.rebalances == optimized.rebalances
+    # Joint whole-share search leaves less of a small budget in cash than flooring each pick
+    assert optimized.final_cash < greedy.final_cash
+
+
+def test_run_is_deterministic_on_mock_history(finnhub):
+    backtester = Backtester(finnhub, candidates_per_sector=5)
+    request = BacktestRequest(
+        budget=10_000, sectors=["technology", "energy"], risk_profile="high",
+        goal={"target_return": 8, "duration_years": 2}, years=3, rebalance="monthly"
+    )
+    result = backtester.run(request, end=END)
+    again = backtester.run(request, end=END)
+    
+    assert result.equity_curve == again.equity_curve
+    assert len(result.dates) == len(result.equity_curve) == len(result.benchmark_curve)
+    assert result.end_date == "2025-12-31"
+    assert result.initial_value == pytest.approx(10_000, rel=0.01)
+    assert 1 <= result.rebalances <= 37
+    assert set(result.final_holdings) <= set(backtester.universe(request.sectors)[0])
+    assert result.final_cash >= 0
+    
+    never = backtester.run(request.model_copy(update={"rebalance": RebalanceFrequency.NEVER}), end=END)
+    assert never.rebalances == 1
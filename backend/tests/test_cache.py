@@ -0,0 +1,81 @@
+from services import cache
+from services.cache import TTLCache
+
+
+def test_fresh_then_stale_then_expired(monkeypatch, clock):
+    monkeypatch.setattr(cache, "time", clock)
+    entries = TTLCache(maxsize=4, ttl=10, stale_ttl=5)
+    entries.set("AAPL", 190.0)
+    
+    assert entries.lookup("AAPL") == (190.0, TTLCache.FRESH)
+    clock.advance(10)
+    assert entries.lookup("AAPL") == (190.0, TTLCache.FRESH)
+    
+    # Past the TTL but inside the stale window the value is still served, marked stale
+    clock.advance(3)
+    assert entries.lookup("AAPL") == (190.0, TTLCache.STALE)
+    assert entries.get("AAPL") is None
+    
+    # Past both windows the entry is dropped
+    clock.advance(3)
+    assert entries.lookup("AAPL") == (None, TTLCache.MISS)
+    assert len(entries) == 0
+    assert entries.stats()["hits"] == 2
+    assert entries.stats()["stale_hits"] == 2
+    assert entries.stats()["misses"] == 1
+
+
+def test_without_stale_window_entries_expire_at_ttl(monkeypatch, clock):
+    monkeypatch.setattr(cache, "time", clock)
+    entries = TTLCache(ttl=1)
+    entries.set("key", "value")
+    clock.advance(1.5)
+    assert entries.lookup("key") == (None, TTLCache.MISS)
+
+
+def test_set_restarts_the_ttl(monkeypatch, clock):
+    monkeypatch.setattr(cache, "time", clock)
+    entries = TTLCache(ttl=10, stale_ttl=5)
+    entries.set("key", 1)
+    clock.advance(12)
+    entries.set("key", 2)
+    assert entries.lookup("key") == (2, TTLCache.FRESH)
+
+
+def test_least_recently_used_entry_is_evicted(monkeypatch, clock):
+    monkeypatch.setattr(cache, "time", clock)
+    entries = TTLCache(maxsize=2, ttl=60)
+    entries.set("a", 1)
+    entries.set("b", 2)
+    entries.lookup("a")
+    entries.set("c", 3)
+    
+    assert entries.lookup("b") == (None, TTLCache.MISS)
+    assert entries.lookup("a") == (1, TTLCache.FRESH)
+    assert entries.lookup("c") == (3, TTLCache.FRESH)
+    assert entries.evictions == 1
+
+
+def test_age_does_not_count_as_a_lookup(monkeypatch, clock):
+    monkeypatch.setattr(cache, "time", clock)
+    entries = TTLCache(ttl=60)
+    assert entries.age("a") is None
+    entries.set("a", 1)
+    clock.advance(7)
+    assert entries.age("a") == 7
+    assert entries.stats()["hits"] + entries.stats()["misses"] == 0
+
+
+def test_stale_quote_is_served_and_refreshed_in_background(monkeypatch, clock, finnhub):
+    monkeypatch.setattr(cache, "time", clock)
+    finnhub.quote_cache.ttl, finnhub.quote_cache.stale_ttl = 15, 60
+    finnhub._store_quote("AAPL", {"c": 190.0, "d": 1.0, "dp": 0.5})
+    refreshes = []
+    monkeypatch.setattr(finnhub, "_schedule_refresh", lambda key, *_: refreshes.append(key))
+    
+    assert finnhub.get_stock_quote("AAPL")["c"] == 190.0
+    assert refreshes == []
+    
+    clock.advance(30)
+    assert finnhub.get_stock_quote("AAPL")["c"] == 190.0
+    assert refreshes == [("quote", "AAPL")]
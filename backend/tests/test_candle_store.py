@@ -0,0 +1,153 @@
+import asyncio
+from datetime import date, datetime, timezone
+
+import numpy as np
+
+from services.candle_store import CandleStore
+from services.finnhub_client import FinnhubClient
+from services.rate_limiter import Priority
+
+
+def candles(days, closes):
+    """A Finnhub candle response for the given ISO days."""
+    stamps = [int(datetime.fromisoformat(day).replace(tzinfo=timezone.utc).timestamp()) for day in days]
+    return {
+        "s": "ok", "t": stamps, "c": closes, "o": closes, "h": [c + 1 for c in closes],
+        "l": [c - 1 for c in closes], "v": [1000] * len(closes)
+    }
+
+
+def test_append_writes_only_days_after_the_last_stored(tmp_path):
+    store = CandleStore(str(tmp_path))
+    assert store.append("aapl", candles(["2025-01-02", "2025-01-03", "2025-01-03"], [10.0, 11.0, 99.0])) == 2
+    assert store.append("AAPL", candles(["2025-01-03", "2025-01-06"], [11.5, 12.0])) == 1
+    
+    days, closes = store.get_closes("AAPL", date(2025, 1, 1), date(2025, 1, 31))
+    assert days.astype(str).tolist() == ["2025-01-02", "2025-01-03", "2025-01-06"]
+    assert closes.tolist() == [10.0, 11.0, 12.0]
+    assert store.first_date("AAPL") == date(2025, 1, 2)
+    assert store.last_date("AAPL") == date(2025, 1, 6)
+    
+    _, fields = store.get_range("AAPL", date(2025, 1, 3), date(2025, 1, 3))
+    assert fields["high"].tolist() == [12.0]
+    assert fields["volume"].tolist() == [1000.0]
+
+
+def test_prepend_backfills_before_the_first_stored_day(tmp_path):
+    store = CandleStore(str(tmp_path))
+    store.append("AAPL", candles(["2025-01-06", "2025-01-07"], [12.0, 13.0]))
+    held_days, held_closes = store.get_closes("AAPL", date(2025, 1, 1), date(2025, 1, 31))
+    
+    assert store.prepend("AAPL", candles(["2025-01-02", "2025-01-03", "2025-01-06"], [10.0, 11.0, 50.0])) == 2
+    days, closes = store.get_closes("AAPL", date(2025, 1, 1), date(2025, 1, 31))
+    assert days.astype(str).tolist() == ["2025-01-02", "2025-01-03", "2025-01-06", "2025-01-07"]
+    assert closes.tolist() == [10.0, 11.0, 12.0, 13.0]
+    assert store.first_date("AAPL") == date(2025, 1, 2)
+    
+    # Views handed out before the backfill still read the old rows
+    assert held_closes.tolist() == [12.0, 13.0]
+    
+    # A fresh store sees the rewritten files, and appends continue after them
+    reopened = CandleStore(str(tmp_path))
+    assert reopened.append("AAPL", candles(["2025-01-08"], [14.0])) == 1
+    _, closes = reopened.get_closes("AAPL", date(2025, 1, 1), date(2025, 1, 31))
+    assert closes.tolist() == [10.0, 11.0, 12.0, 13.0, 14.0]
+
+
+def test_prepend_into_an_empty_ticker_appends(tmp_path):
+    store = CandleStore(str(tmp_path))
+    assert store.prepend("XOM", candles(["2025-01-02"], [100.0])) == 1
+    assert store.last_date("XOM") == date(2025, 1, 2)
+
+
+def test_interrupted_append_is_repaired_on_the_next_write(tmp_path):
+    store = CandleStore(str(tmp_path))
+    store.append("AAPL", candles(["2025-01-02"], [10.0]))
+    # A crash after writing a close but before the day index leaves a dangling row
+    with open(tmp_path / "AAPL" / "close.bin", "ab") as f:
+        f.write(np.array([99.0]).tobytes())
+    
+    reopened = CandleStore(str(tmp_path))
+    assert reopened.append("AAPL", candles(["2025-01-03"], [11.0])) == 1
+    assert reopened.get_closes("AAPL", date(2025, 1, 1), date(2025, 1, 31))[1].tolist() == [10.0, 11.0]
+
+
+def test_panel_aligns_tickers_on_the_union_of_days(tmp_path):
+    store = CandleStore(str(tmp_path))
+    store.append("AAPL", candles(["2025-01-02", "2025-01-03", "2025-01-06"], [10.0, 11.0, 12.0]))
+    store.append("XOM", candles(["2025-01-02", "2025-01-06"], [100.0, 102.0]))
+    
+    days, panel = store.get_panel(["AAPL", "XOM", "NONE"], date(2025, 1, 1), date(2025, 1, 31))
+    assert days.astype(str).tolist() == ["2025-01-02", "2025-01-03", "2025-01-06"]
+    assert panel[:, 0].tolist() == [10.0, 11.0, 12.0]
+    assert panel[0, 1] == 100.0 and np.isnan(panel[1, 1]) and panel[2, 1] == 102.0
+    assert np.isnan(panel[:, 2]).all()
+    assert store.tickers() == ["AAPL", "XOM"]
+
+
+class StubResponses:
+    """Answers candle fetches from a list of canned responses, recording each window."""
+    
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.windows = []
+    
+    async def __call__(self, key, start, end, priority):
+        self.windows.append((start, end))
+        response = self.responses.pop(0)
+        return response(start, end) if callable(response) else response
+
+
+def business_days(start, end):
+    days = np.arange(np.datetime64(start), np.datetime64(end) + 1)
+    return [str(day) for day in days[np.is_busday(days)]]
+
+
+def range_candles(start, end):
+    days = business_days(start, end)
+    return candles(days, [float(i) for i in range(len(days))])
+
+
+def candle_client(monkeypatch, tmp_path, responses):
+    monkeypatch.delenv("FINNHUB_API_KEY", raising=False)
+    monkeypatch.setattr(FinnhubClient, "_candles_checked", {})
+    client = FinnhubClient()
+    client.api_key = "test"
+    client.candle_store = CandleStore(str(tmp_path))
+    client._fetch_candles = StubResponses(responses)
+    return client
+
+
+def test_update_backfills_before_and_tops_up_after_stored_days(monkeypatch, tmp_path):
+    client = candle_client(monkeypatch, tmp_path, [range_candles] * 3)
+    store = client.candle_store
+    store.append("AAA", range_candles(date(2024, 3, 1), date(2024, 3, 29)))
+    
+    start, end = date(2024, 1, 1), date(2024, 4, 30)
+    written = asyncio.run(client._update_candles("AAA", start, end, Priority.BACKGROUND))
+    assert client._fetch_candles.windows == [(start, date(2024, 2, 29)), (date(2024, 3, 30), end)]
+    assert written == len(business_days(start, end)) - len(business_days(date(2024, 3, 1), date(2024, 3, 29)))
+    assert (store.first_date("AAA"), store.last_date("AAA")) == (date(2024, 1, 1), date(2024, 4, 30))
+    
+    # The same window is not fetched again for the same as-of day
+    assert asyncio.run(client._update_candles("AAA", start, end, Priority.BACKGROUND)) == 0
+    assert len(client._fetch_candles.windows) == 2
+
+
+def test_failed_fetches_are_retried(monkeypatch, tmp_path):
+    client = candle_client(monkeypatch, tmp_path, [None, range_candles])
+    start, end = date(2024, 1, 1), date(2024, 1, 5)
+    
+    assert asyncio.run(client._update_candles("ZZZ", start, end, Priority.BACKGROUND)) == 0
+    assert "ZZZ" not in client._candles_checked
+    assert asyncio.run(client._update_candles("ZZZ", start, end, Priority.BACKGROUND)) == 5
+    assert client._candles_checked["ZZZ"] == (start, end)
+
+
+def test_no_data_counts_as_an_answer(monkeypatch, tmp_path):
+    client = candle_client(monkeypatch, tmp_path, [{"s": "no_data"}])
+    start, end = date(2024, 1, 1), date(2024, 1, 5)
+    
+    assert asyncio.run(client._update_candles("ZZZ", start, end, Priority.BACKGROUND)) == 0
+    assert asyncio.run(client._update_candles("ZZZ", start, end, Priority.BACKGROUND)) == 0
+    assert len(client._fetch_candles.windows) == 1
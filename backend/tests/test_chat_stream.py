@@ -0,0 +1,103 @@
+import asyncio
+import json
+
+import pytest
+
+from models.portfolio import ChatRequest, Portfolio, PortfolioPreferences
+from services.portfolio_service import PortfolioService
+
+
+REQUEST = ChatRequest(portfolio_id="p1", user_id="u1", message="How is my portfolio doing?")
+
+
+@pytest.fixture
+def service(monkeypatch):
+    """A PortfolioService with a canned portfolio and streamed reply that records what gets persisted."""
+    service = PortfolioService()
+    service.saved = []
+    preferences = PortfolioPreferences(
+        budget=10_000, risk_profile="moderate", investment_goal="growth",
+        target_return=8, time_horizon_years=5, preferred_sectors=["technology"]
+    )
+    portfolio = Portfolio(id="p1", user_id="u1", name="Test", preferences=preferences, holdings=[], total_invested=0)
+    
+    async def prepare_chat(request):
+        return portfolio, None, {"portfolio_name": portfolio.name}
+    
+    async def stream_reply(message, portfolio_context, user_id):
+        for chunk in ("Your portfolio", " is up", " 4% this year."):
+            # Nothing is written while the reply is still streaming
+            assert service.saved == []
+            yield chunk
+    
+    async def save_chat_message(message):
+        service.saved.append(("message", message.role, message.content))
+        return message.id
+    
+    async def add_chat_memory(**kwargs):
+        service.saved.append(("memory", kwargs["message"], kwargs["response"]))
+        return True
+    
+    monkeypatch.setattr(service, "_prepare_chat", prepare_chat)
+    monkeypatch.setattr(service.openai_agent, "stream_chat_with_portfolio", stream_reply)
+    monkeypatch.setattr(service.appwrite, "save_chat_message", save_chat_message)
+    monkeypatch.setattr(service.mem0, "add_chat_memory", add_chat_memory)
+    return service
+
+
+def test_tokens_stream_before_done_and_the_reply_is_persisted_after(service):
+    async def main():
+        events = [event async for event in service.stream_chat_with_portfolio(REQUEST)]
+        await service.write_queue.stop(timeout=5)
+        return events
+    
+    events = asyncio.run(main())
+    
+    assert [event["event"] for event in events] == ["token", "token", "token", "done"]
+    assert "".join(event["data"]["content"] for event in events[:-1]) == "Your portfolio is up 4% this year."
+    assert events[-1]["data"]["message"] == "Your portfolio is up 4% this year."
+    assert sorted(service.saved) == [
+        ("memory", REQUEST.message, "Your portfolio is up 4% this year."),
+        ("message", "assistant", "Your portfolio is up 4% this year."),
+        ("message", "user", REQUEST.message)
+    ]
+
+
+def test_missing_portfolio_yields_a_single_error_event(service, monkeypatch):
+    async def not_found(request):
+        return None
+    
+    monkeypatch.setattr(service, "_prepare_chat", not_found)
+    
+    async def main():
+        return [event async for event in service.stream_chat_with_portfolio(REQUEST)]
+    
+    events = asyncio.run(main())
+    assert [event["event"] for event in events] == ["error"]
+    assert service.saved == []
+
+
+def test_the_endpoint_frames_each_event_as_server_sent_events(monkeypatch):
+    from fastapi.testclient import TestClient
+    import app
+    
+    async def canned(self, request):
+        yield {"event": "token", "data": {"content": "Hi"}}
+        yield {"event": "token", "data": {"content": " there"}}
+        yield {"event": "done", "data": {"message": "Hi there", "suggestions": [], "portfolio_analysis": None}}
+    
+    monkeypatch.setattr(PortfolioService, "stream_chat_with_portfolio", canned)
+    response = TestClient(app.create_fastapi_app()).post("/api/portfolio/chat/stream", json=REQUEST.model_dump())
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    frames = [frame for frame in response.text.split("\n\n") if frame]
+    parsed = [
+        (frame.split("\n")[0].removeprefix("event: "), json.loads(frame.split("\n")[1].removeprefix("data: ")))
+        for frame in frames
+    ]
+    assert parsed == [
+        ("token", {"content": "Hi"}),
+        ("token", {"content": " there"}),
+        ("done", {"message": "Hi there", "suggestions": [], "portfolio_analysis": None})
+    ]
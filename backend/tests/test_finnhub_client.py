@@ -0,0 +1,88 @@
+import asyncio
+
+import httpx
+import pytest
+
+from services.finnhub_client import FinnhubClient
+from services.rate_limiter import RequestScheduler
+
+
+class Upstream:
+    """httpx transport handler answering /quote per symbol from a script of responses."""
+    
+    def __init__(self, script):
+        self.script = script
+        self.requests = []
+    
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        symbol = request.url.params["symbol"]
+        self.requests.append(symbol)
+        answers = self.script[symbol]
+        answer = answers.pop(0) if isinstance(answers, list) else answers
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+
+def quote(price: float) -> httpx.Response:
+    return httpx.Response(200, json={"c": price, "d": 0.5, "dp": 0.3, "h": price, "l": price, "o": price, "pc": price})
+
+
+@pytest.fixture
+def upstream(finnhub, monkeypatch):
+    """Route the keyed client's async pool to a scripted upstream."""
+    def install(script) -> Upstream:
+        handler = Upstream(script)
+        finnhub.api_key = "test"
+        finnhub.max_retries = 2
+        monkeypatch.setattr(FinnhubClient, "_async_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+        monkeypatch.setattr(FinnhubClient, "_host_semaphores", {})
+        return handler
+    return install
+
+
+def test_without_a_key_every_ticker_gets_a_mock_quote_once(finnhub):
+    quotes, errors = asyncio.run(finnhub.get_quotes(["aapl", "MSFT", " AAPL ", "", "XOM"]))
+    
+    assert list(quotes) == ["AAPL", "MSFT", "XOM"]
+    assert all(quote["c"] > 0 for quote in quotes.values())
+    assert errors == {}
+
+
+def test_a_batch_maps_each_failure_to_its_ticker(upstream, finnhub):
+    handler = upstream({
+        "AAPL": quote(190.0),
+        "ZZZZ": httpx.Response(200, json={"c": 0, "d": None, "dp": None, "h": 0, "l": 0, "o": 0, "pc": 0}),
+        "DOWN": httpx.Response(503),
+        "DROP": httpx.ConnectError("connection reset"),
+        "JUNK": httpx.Response(200, content=b"<html>maintenance</html>")
+    })
+    
+    quotes, errors = asyncio.run(finnhub.get_quotes(["AAPL", "ZZZZ", "DOWN", "DROP", "JUNK"]))
+    
+    assert quotes == {"AAPL": {"c": 190.0, "d": 0.5, "dp": 0.3, "h": 190.0, "l": 190.0, "o": 190.0, "pc": 190.0}}
+    assert errors["ZZZZ"] == "Unknown symbol or no price available"
+    assert errors["DOWN"] == "No quote data returned"
+    assert errors["DROP"] == "No quote data returned"
+    # Errors raised past the transport layer are reported, not raised out of the batch
+    assert "JUNK" in errors and errors["JUNK"]
+    assert sorted(handler.requests) == ["AAPL", "DOWN", "DROP", "JUNK", "ZZZZ"]
+    # Only the usable quote is cached
+    assert finnhub.quote_cache.lookup("AAPL")[0]["c"] == 190.0
+    assert finnhub.quote_cache.lookup("ZZZZ")[0] is None
+
+
+def test_rate_limited_quotes_back_off_and_retry(upstream, finnhub):
+    # A fast bucket so the throttled rate still refills within milliseconds
+    finnhub.scheduler = RequestScheduler(rate_per_minute=60_000, burst=10, min_rate_per_minute=60_000)
+    throttled = httpx.Response(429, headers={"Retry-After": "0"})
+    handler = upstream({"AAPL": [throttled, quote(191.0)], "MSFT": [throttled, throttled, throttled]})
+    
+    quotes, errors = asyncio.run(finnhub.get_quotes(["AAPL", "MSFT"]))
+    
+    assert quotes["AAPL"]["c"] == 191.0
+    # MSFT stays throttled past max_retries and is reported instead of retried forever
+    assert errors == {"MSFT": "No quote data returned"}
+    assert handler.requests.count("AAPL") == 2
+    assert handler.requests.count("MSFT") == 3
+    assert finnhub.scheduler.stats()["throttled_responses"] == 3
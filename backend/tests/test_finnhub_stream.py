@@ -0,0 +1,112 @@
+import json
+import asyncio
+
+from services import finnhub_client, finnhub_stream
+from services.finnhub_client import FinnhubClient
+from services.finnhub_stream import FinnhubTradeStream, PriceBoard
+
+
+def test_price_board_keeps_the_last_price_and_honours_max_age(monkeypatch, clock):
+    monkeypatch.setattr(finnhub_stream, "time", clock)
+    board = PriceBoard()
+    board.update("AAPL", 190.0)
+    board.update("AAPL", 191.5)
+    board.update("MSFT", 415.0, timestamp=clock.now - 600)
+    
+    assert board.get("AAPL") == 191.5
+    assert board.get("AAPL", max_age=60) == 191.5
+    assert board.get("MSFT") == 415.0
+    assert board.get("MSFT", max_age=300) is None
+    assert board.get("NVDA") is None
+    assert board.snapshot() == {"AAPL": 191.5, "MSFT": 415.0}
+    assert len(board) == 2
+    
+    clock.advance(61)
+    assert board.get("AAPL", max_age=60) is None
+
+
+def test_trade_messages_update_the_board():
+    stream = FinnhubTradeStream("ws://unused")
+    stream._handle_message(json.dumps({
+        "type": "trade",
+        "data": [
+            {"s": "AAPL", "p": 190.25, "t": 1_700_000_000_000, "v": 10},
+            {"s": "AAPL", "p": 190.5, "t": 1_700_000_001_000, "v": 5},
+            {"s": "MSFT", "p": 0, "t": 1_700_000_001_000},
+            {"p": 10.0}
+        ]
+    }))
+    stream._handle_message(json.dumps({"type": "ping"}))
+    stream._handle_message("not json")
+    
+    assert stream.board.snapshot() == {"AAPL": 190.5}
+    assert stream.board._prices["AAPL"][1] == 1_700_000_001.0
+    assert stream.trades == 2
+    assert stream.messages == 3
+
+
+def test_subscriptions_are_capped_and_deduplicated():
+    stream = FinnhubTradeStream("ws://unused", max_symbols=2)
+    
+    async def main():
+        first = await stream.subscribe(["aapl", "MSFT", "AAPL"])
+        second = await stream.subscribe(["NVDA", "MSFT"])
+        return first, second
+    
+    assert asyncio.run(main()) == (["AAPL", "MSFT"], [])
+    assert stream.rejected_symbols == 1
+    assert stream.stats()["subscribed_symbols"] == 2
+
+
+class RecordingSocket:
+    def __init__(self):
+        self.sent = []
+    
+    async def send(self, raw):
+        self.sent.append(json.loads(raw))
+
+
+def test_set_symbols_follows_the_wanted_set_and_reports_what_the_cap_leaves_out():
+    stream = FinnhubTradeStream("ws://unused", max_symbols=3)
+    stream._ws, stream.connected = RecordingSocket(), True
+    
+    async def main():
+        first = await stream.set_symbols(["aapl", "MSFT"])
+        second = await stream.set_symbols(["NVDA", "AAPL", "XOM", "CVX"])
+        return first, second
+    
+    first, second = asyncio.run(main())
+    assert first == (["AAPL", "MSFT"], [])
+    assert second == (["NVDA", "XOM"], ["MSFT"])
+    assert stream._symbols == {"NVDA", "AAPL", "XOM"}
+    assert stream.stats()["uncovered_symbols"] == 1
+    assert {"type": "unsubscribe", "symbol": "MSFT"} in stream._ws.sent
+
+
+def test_stream_covers_the_union_of_active_portfolio_holdings(finnhub, monkeypatch, clock):
+    monkeypatch.setattr(finnhub_client, "time", clock)
+    monkeypatch.setattr(FinnhubClient, "_held_symbols", {})
+    stream = FinnhubTradeStream("ws://unused", max_symbols=3)
+    monkeypatch.setattr(FinnhubClient, "_stream", stream)
+    finnhub.stream_active_seconds = 600
+    
+    async def main():
+        await finnhub.track_portfolios({"p1": ["AAPL", "MSFT"], "p2": ["msft", "XOM"]})
+        assert stream._symbols == {"AAPL", "MSFT", "XOM"}
+        
+        # Pricing other symbols (e.g. stock-pick candidates) does not touch the subscriptions
+        await finnhub.get_prices(["NVDA", "JPM"])
+        assert stream._symbols == {"AAPL", "MSFT", "XOM"}
+        
+        # p2 sold XOM; p1 goes quiet and drops out once the active window passes
+        clock.advance(400)
+        await finnhub.track_portfolios({"p2": ["MSFT", "CVX"]})
+        assert stream._symbols == {"AAPL", "MSFT", "CVX"}
+        clock.advance(300)
+        await finnhub.track_portfolios({"p3": ["JNJ", "PFE", "MRK"]})
+    
+    asyncio.run(main())
+    # The most recently loaded portfolio wins the capped slots
+    assert finnhub.held_symbols() == ["JNJ", "PFE", "MRK", "MSFT", "CVX"]
+    assert stream._symbols == {"JNJ", "PFE", "MRK"}
+    assert stream.uncovered_symbols == 2
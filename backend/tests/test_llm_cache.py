@@ -0,0 +1,59 @@
+import pytest
+
+from services import cache, llm_cache
+from services.llm_cache import LLMResponseCache, prompt_fingerprint
+
+
+@pytest.fixture(autouse=True)
+def fixed_clock(monkeypatch, clock):
+    monkeypatch.setattr(cache, "time", clock)
+    monkeypatch.setattr(llm_cache, "time", clock)
+
+
+def test_fingerprint_depends_on_every_input_and_buckets_temperature():
+    key = prompt_fingerprint("gpt-4o-mini", "system", "user", 0.7)
+    assert key == prompt_fingerprint("gpt-4o-mini", "system", "user", 0.70001)
+    assert key != prompt_fingerprint("gpt-4o-mini", "system", "user", 0.2)
+    assert key != prompt_fingerprint("gpt-4o", "system", "user", 0.7)
+    assert key != prompt_fingerprint("gpt-4o-mini", "other", "user", 0.7)
+    assert key != prompt_fingerprint("gpt-4o-mini", "system", "other", 0.7)
+
+
+def test_hits_are_counted_and_priced():
+    responses = LLMResponseCache(maxsize=8, ttl=60)
+    assert responses.get("k") is None
+    responses.put("k", "gpt-4o-mini", "answer", prompt_tokens=1_000_000, completion_tokens=1_000_000)
+    
+    assert responses.get("k") == "answer"
+    assert responses.get("k") == "answer"
+    stats = responses.stats()
+    assert (stats["hits"], stats["misses"]) == (2, 1)
+    assert stats["tokens_saved"] == 4_000_000
+    assert stats["dollars_saved"] == pytest.approx(2 * (0.15 + 0.60))
+
+
+def test_entries_expire_after_the_ttl(clock):
+    responses = LLMResponseCache(ttl=60)
+    responses.put("k", "gpt-4o-mini", "answer")
+    clock.advance(59)
+    assert responses.get("k") == "answer"
+    clock.advance(2)
+    assert responses.get("k") is None
+
+
+def test_responses_survive_a_restart_through_sqlite(tmp_path, clock):
+    path = str(tmp_path / "llm_cache.db")
+    LLMResponseCache(ttl=60, path=path).put("k", "gpt-4o", "answer", prompt_tokens=10, completion_tokens=5)
+    
+    restarted = LLMResponseCache(ttl=60, path=path)
+    assert restarted.get("k") == "answer"
+    assert restarted.disk_hits == 1
+    assert restarted.tokens_saved == 15
+    
+    # Expired rows are not loaded from disk either
+    clock.advance(61)
+    assert LLMResponseCache(ttl=60, path=path).get("k") is None
+
+
+def test_unknown_models_are_free():
+    assert LLMResponseCache.estimate_cost("unknown", 1000, 1000) == 0.0
@@ -0,0 +1,90 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from services.monte_carlo import GoalSimulator, checkpoint_years, cholesky_factor, simulate_growth, summarize_growth
+
+
+def test_checkpoints_end_at_the_horizon():
+    assert checkpoint_years(3).tolist() == [1, 2, 3]
+    assert checkpoint_years(30).tolist() == [6, 12, 18, 24, 30]
+    assert checkpoint_years(7)[-1] == 7
+
+
+def test_cholesky_factor_tolerates_singular_covariance():
+    covariance = np.array([[0.04, 0.04], [0.04, 0.04]])
+    factor = cholesky_factor(covariance)
+    assert factor @ factor.T == pytest.approx(covariance)
+
+
+def test_without_volatility_growth_is_the_drift():
+    checkpoints = np.array([1, 5, 10])
+    growth = simulate_growth(np.array([0.5, 0.5]), np.array([0.05, 0.10]), np.zeros((2, 2)), checkpoints, 10, seed=1)
+    expected = 0.5 * np.exp(0.05 * checkpoints) + 0.5 * np.exp(0.10 * checkpoints)
+    assert growth == pytest.approx(np.tile(expected, (10, 1)), rel=1e-5)
+
+
+def test_paths_are_reproducible_and_antithetic():
+    covariance = np.array([[0.04]])
+    checkpoints = np.array([1, 2, 3])
+    growth = simulate_growth(np.array([1.0]), np.array([0.07]), covariance, checkpoints, 1000, seed=42, chunk_size=256)
+    
+    again = simulate_growth(np.array([1.0]), np.array([0.07]), covariance, checkpoints, 1000, seed=42, chunk_size=256)
+    assert np.array_equal(growth, again)
+    other = simulate_growth(np.array([1.0]), np.array([0.07]), covariance, checkpoints, 1000, seed=43, chunk_size=256)
+    assert not np.array_equal(growth, other)
+    
+    # Each shock is also used negated, so mean log growth is exactly the drift
+    assert np.log(growth[:, -1]).mean() == pytest.approx((0.07 - 0.02) * 3, abs=1e-4)
+    assert growth.shape == (1000, 3)
+
+
+def test_summary_counts_paths_reaching_the_target():
+    growth = np.array([[1.0, 0.9], [1.0, 1.1], [1.0, 1.2], [1.0, 1.3]], dtype=np.float32)
+    summary = summarize_growth(growth, np.array([1, 2]), 1000.0, target_return=5, years=2)
+    
+    assert summary["target_value"] == pytest.approx(1102.5)
+    assert summary["probability"] == 50.0
+    assert summary["probability_of_loss"] == 25.0
+    assert summary["mean_final_value"] == pytest.approx(1125.0)
+    assert summary["percentiles"]["p5"] == [1000.0, 900.0]
+    assert summary["percentiles"]["p95"] == [1000.0, 1300.0]
+
+
+class StubRiskEngine:
+    """Risk engine returning a fixed one-holding model."""
+    
+    def __init__(self, report):
+        self.report = report
+        self.calls = 0
+    
+    async def analyze_composition(self, composition, as_of=None):
+        self.calls += 1
+        return self.report
+
+
+def test_goal_simulation_is_seeded_and_cached():
+    report = {
+        "as_of": "2025-06-01",
+        "model": {
+            "value": 10_000.0, "weights": np.array([1.0]), "betas": np.array([1.0]), "covariance": np.array([[0.04]])
+        }
+    }
+    engine = StubRiskEngine(report)
+    simulator = GoalSimulator(engine, paths=2000, seed=7)
+    
+    result = asyncio.run(simulator.simulate({"SPY": 10}, target_return=8, years=5))
+    assert result["expected_annual_return"] == pytest.approx(9.5)
+    assert result["annual_volatility"] == pytest.approx(20.0)
+    assert 0 < result["probability"] < 100
+    assert result["years"] == [1, 2, 3, 4, 5]
+    
+    assert asyncio.run(simulator.simulate({"SPY": 10}, target_return=8, years=5)) is result
+    assert engine.calls == 1
+    reseeded = asyncio.run(GoalSimulator(StubRiskEngine(report), paths=2000, seed=7).simulate({"SPY": 10}, 8, 5))
+    assert reseeded["probability"] == result["probability"]
+
+
+def test_goal_simulation_needs_history():
+    assert asyncio.run(GoalSimulator(StubRiskEngine(None)).simulate({"SPY": 10}, 8, 5)) is None
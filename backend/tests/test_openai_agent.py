@@ -0,0 +1,126 @@
+import json
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from models.request import StockPickRequest
+from models.response import StockRecommendation
+from services.llm_cache import LLMResponseCache
+from services.openai_agent import OpenAIAgent
+
+
+class FakeCompletions:
+    """Stands in for client.chat.completions, answering from a callable and counting calls."""
+    
+    def __init__(self, answer):
+        self.answer = answer
+        self.calls = []
+        self._lock = threading.Lock()
+    
+    def create(self, **kwargs):
+        with self._lock:
+            self.calls.append(kwargs)
+        usage = SimpleNamespace(prompt_tokens=100, completion_tokens=20)
+        message = SimpleNamespace(content=self.answer(kwargs))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    agent = OpenAIAgent()
+    agent.response_cache = LLMResponseCache(maxsize=32, ttl=3600)
+    return agent
+
+
+def use_completions(agent, answer) -> FakeCompletions:
+    completions = FakeCompletions(answer)
+    agent.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return completions
+
+
+def request() -> StockPickRequest:
+    return StockPickRequest(
+        budget=10_000, sectors=["technology"], risk_profile="moderate",
+        goal={"target_return": 8, "duration_years": 5}
+    )
+
+
+def picks(price_shift: float = 0.0):
+    return [
+        StockRecommendation(
+            ticker=ticker, name=ticker, sector="Technology", price=price + price_shift, quantity=quantity,
+            risk_match="moderate", justification="basic"
+        )
+        for ticker, price, quantity in (("AAPL", 190.0, 17), ("MSFT", 410.0, 8), ("NVDA", 120.0, 27))
+    ]
+
+
+def test_identical_requests_reuse_reasoning_after_prices_move(agent):
+    completions = use_completions(agent, lambda kwargs: "Balanced technology exposure.")
+    
+    first = agent.generate_portfolio_reasoning(request(), picks(), 9_700.0, 300.0)
+    # Quotes moved between the two requests; the picks and the request are the same
+    second = agent.generate_portfolio_reasoning(request(), picks(price_shift=1.37), 9_741.1, 258.9)
+    
+    assert first == second == "Balanced technology exposure."
+    assert len(completions.calls) == 1
+
+
+def test_price_moves_do_not_defeat_the_justification_cache(agent):
+    completions = use_completions(agent, lambda kwargs: json.dumps({"AAPL": "a", "MSFT": "m", "NVDA": "n"}))
+    
+    agent.enhance_stock_justifications(request(), picks())
+    enhanced = agent.enhance_stock_justifications(request(), picks(price_shift=-2.5))
+    
+    assert [rec.justification for rec in enhanced] == ["a", "m", "n"]
+    assert len(completions.calls) == 1
+
+
+def test_a_different_request_still_calls_the_model(agent):
+    completions = use_completions(agent, lambda kwargs: "Reasoning.")
+    
+    agent.generate_portfolio_reasoning(request(), picks(), 9_700.0, 300.0)
+    changed = picks()
+    changed[0].quantity += 1
+    agent.generate_portfolio_reasoning(request(), changed, 9_890.0, 110.0)
+    agent.generate_portfolio_reasoning(request().model_copy(update={"note": "dividends"}), picks(), 9_700.0, 300.0)
+    
+    assert len(completions.calls) == 3
+
+
+def per_ticker_answer(bad_batch: str):
+    """Answer JSON-mode (batched) calls with bad_batch and per-ticker calls with a justification naming the ticker."""
+    def answer(kwargs):
+        if "response_format" in kwargs:
+            return bad_batch
+        prompt = kwargs["messages"][1]["content"]
+        ticker = next(ticker for ticker in ("AAPL", "MSFT", "NVDA") if f"including {ticker}" in prompt)
+        return f"{ticker} fits a moderate growth plan."
+    return answer
+
+
+@pytest.mark.parametrize("bad_batch", ["{\"AAPL\": \"Strong cash flow\", \"MSFT\":", "[\"not\", \"an\", \"object\"]", ""])
+def test_malformed_batch_falls_back_to_per_ticker_justifications(agent, bad_batch):
+    completions = use_completions(agent, per_ticker_answer(bad_batch))
+    
+    enhanced = agent.enhance_stock_justifications(request(), picks())
+    
+    assert [rec.justification for rec in enhanced] == [
+        "AAPL fits a moderate growth plan.", "MSFT fits a moderate growth plan.", "NVDA fits a moderate growth plan."
+    ]
+    assert len(completions.calls) == 4
+    # The unusable batch answer was not cached
+    assert agent.response_cache.stats()["size"] == 3
+
+
+def test_partial_batch_only_refetches_the_missing_tickers(agent):
+    completions = use_completions(agent, per_ticker_answer(json.dumps({"aapl": "Batched AAPL.", "MSFT": "  "})))
+    
+    enhanced = agent.enhance_stock_justifications(request(), picks())
+    
+    assert [rec.justification for rec in enhanced] == [
+        "Batched AAPL.", "MSFT fits a moderate growth plan.", "NVDA fits a moderate growth plan."
+    ]
+    assert len(completions.calls) == 3
@@ -0,0 +1,53 @@
+import asyncio
+import threading
+
+import pytest
+
+from services.profile_store import ProfileStore
+
+
+@pytest.fixture
+def profiled(finnhub, tmp_path, monkeypatch):
+    """The mock client with a key, a temporary profile store and a stubbed upstream that records writer threads."""
+    finnhub.api_key = "test"
+    finnhub.profile_store = ProfileStore(path=str(tmp_path / "profiles.db"), ttl=3600)
+    finnhub.writer_threads = []
+    
+    async def fake_request(endpoint, params, *args):
+        return {"ticker": params["symbol"], "marketCapitalization": 100.0} if params["symbol"] != "GONE" else {}
+    
+    put_many = finnhub.profile_store.put_many
+    
+    def recording_put_many(profiles):
+        finnhub.writer_threads.append(threading.current_thread())
+        put_many(profiles)
+    
+    monkeypatch.setattr(finnhub, "_make_request_async", fake_request)
+    monkeypatch.setattr(finnhub.profile_store, "put_many", recording_put_many)
+    return finnhub
+
+
+def test_profiles_survive_a_restart(tmp_path):
+    path = str(tmp_path / "profiles.db")
+    ProfileStore(path=path, ttl=60).put_many([("AAPL", {"name": "Apple"}), ("MSFT", {"name": "Microsoft"})])
+    
+    reopened = ProfileStore(path=path, ttl=60)
+    assert reopened.get("AAPL") == ({"name": "Apple"}, False)
+    assert reopened.stale_tickers(["AAPL", "MSFT", "NVDA"]) == ["NVDA"]
+
+
+def test_async_profile_fetches_write_off_the_event_loop(profiled):
+    profile = asyncio.run(profiled.get_company_profile_async("aapl"))
+    
+    assert profile["ticker"] == "AAPL"
+    assert profiled.profile_store.get("AAPL") == (profile, False)
+    assert profiled.writer_threads and threading.main_thread() not in profiled.writer_threads
+
+
+def test_warming_stores_every_fetched_profile_in_one_write(profiled):
+    refreshed = asyncio.run(profiled.warm_profiles(["AAPL", "MSFT", "GONE"]))
+    
+    assert refreshed == 2
+    assert len(profiled.writer_threads) == 1
+    assert threading.main_thread() not in profiled.writer_threads
+    assert profiled.profile_store.stale_tickers(["AAPL", "MSFT", "GONE"]) == ["GONE"]
@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+from services import rate_limiter
+from services.rate_limiter import Priority, RequestScheduler
+
+
+@pytest.fixture
+def scheduler(monkeypatch, clock):
+    monkeypatch.setattr(rate_limiter, "time", clock)
+    return RequestScheduler(rate_per_minute=60, burst=3)
+
+
+def test_burst_is_granted_without_waiting(scheduler):
+    assert [scheduler.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert scheduler.granted == 3
+    assert scheduler.queued == 0
+
+
+def test_callers_past_the_burst_wait_for_the_refill(scheduler, clock):
+    for _ in range(3):
+        scheduler.acquire()
+    started = clock.now
+    assert scheduler.acquire() == pytest.approx(1.0)
+    assert scheduler.acquire() == pytest.approx(1.0)
+    assert clock.now - started == pytest.approx(2.0)
+    assert scheduler.queued == 2
+    assert scheduler.max_wait == pytest.approx(1.0)
+
+
+def test_idle_time_refills_up_to_the_burst_only(scheduler, clock):
+    for _ in range(3):
+        scheduler.acquire()
+    clock.advance(60)
+    assert [scheduler.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert scheduler.acquire() == pytest.approx(1.0)
+
+
+def test_lower_priority_yields_to_waiting_callers(scheduler):
+    scheduler._enter(Priority.INTERACTIVE)
+    granted, delay = scheduler._try_acquire(Priority.BACKGROUND)
+    assert not granted and delay > 0
+    assert scheduler._try_acquire(Priority.INTERACTIVE) == (True, 0.0)
+    
+    scheduler._leave(Priority.INTERACTIVE, 0.0, True)
+    assert scheduler._try_acquire(Priority.BACKGROUND) == (True, 0.0)
+
+
+def test_throttle_pauses_and_halves_the_rate_then_recovers(scheduler, clock):
+    assert scheduler.record_throttle(retry_after=5) == 5
+    assert scheduler.rate == pytest.approx(0.5)
+    granted, delay = scheduler._try_acquire(Priority.INTERACTIVE)
+    assert not granted and delay == pytest.approx(5)
+    
+    # Without Retry-After the pause doubles per consecutive 429; the rate never drops below the floor
+    assert scheduler.record_throttle() == 2.0
+    assert scheduler.record_throttle() == 4.0
+    for _ in range(10):
+        scheduler.record_throttle()
+    assert scheduler.rate == pytest.approx(scheduler.min_rate)
+    
+    for _ in range(40):
+        scheduler.record_success()
+    assert scheduler.rate == pytest.approx(scheduler.base_rate)
+    assert scheduler.record_throttle() == 1.0
+
+
+def test_async_acquire_takes_tokens_from_the_same_bucket(scheduler):
+    async def take(n):
+        return [await scheduler.acquire_async(Priority.BACKGROUND) for _ in range(n)]
+    
+    assert asyncio.run(take(3)) == [0.0, 0.0, 0.0]
+    assert scheduler._try_acquire(Priority.INTERACTIVE)[0] is False
+    assert scheduler.stats()["granted"] == 3
@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+
+from models.portfolio import Portfolio, PortfolioPreferences
+from services.portfolio_service import PortfolioService
+from services.request_context import RequestContext, memoize, request_context
+
+
+@pytest.fixture
+def service(monkeypatch):
+    """A PortfolioService whose database hands out a fresh, numbered copy of the portfolio on every load."""
+    service = PortfolioService()
+    service.loads = []
+    preferences = PortfolioPreferences(
+        budget=10_000, risk_profile="moderate", investment_goal="growth",
+        target_return=8, time_horizon_years=5, preferred_sectors=["technology"]
+    )
+    
+    async def get_portfolio(portfolio_id):
+        service.loads.append(portfolio_id)
+        number = len(service.loads)
+        # Yield so concurrent requests interleave mid-load
+        await asyncio.sleep(0.01)
+        return Portfolio(
+            id=portfolio_id, user_id="u1", name=f"load {number}", preferences=preferences,
+            holdings=[], total_invested=0
+        )
+    
+    monkeypatch.setattr(service.appwrite, "get_portfolio", get_portfolio)
+    return service
+
+
+def test_concurrent_lookups_in_one_request_share_a_single_load(service):
+    async def handler():
+        async with request_context() as context:
+            first, second, third = await asyncio.gather(*(service.get_portfolio("p1") for _ in range(3)))
+            return context, first, second, third
+    
+    context, first, second, third = asyncio.run(handler())
+    assert first is second is third
+    assert service.loads == ["p1"]
+    assert (context.loads, context.reuses) == (1, 2)
+
+
+def test_concurrent_requests_never_see_each_others_portfolios(service):
+    async def handler(started: asyncio.Event, other_started: asyncio.Event):
+        async with request_context() as context:
+            started.set()
+            # Both scopes are open before either loads anything
+            await other_started.wait()
+            portfolio = await service.get_portfolio("p1")
+            again = await service.get_portfolio("p1")
+            assert RequestContext.current() is context
+            return context, portfolio, again
+    
+    async def main():
+        a_started, b_started = asyncio.Event(), asyncio.Event()
+        results = await asyncio.gather(handler(a_started, b_started), handler(b_started, a_started))
+        assert RequestContext.current() is None
+        return results
+    
+    (context_a, portfolio_a, again_a), (context_b, portfolio_b, again_b) = asyncio.run(main())
+    
+    assert context_a is not context_b
+    assert portfolio_a is again_a and portfolio_b is again_b
+    assert portfolio_a is not portfolio_b
+    assert {portfolio_a.name, portfolio_b.name} == {"load 1", "load 2"}
+    assert service.loads == ["p1", "p1"]
+
+
+def test_outside_a_request_every_lookup_loads(service):
+    async def main():
+        return await service.get_portfolio("p1"), await service.get_portfolio("p1")
+    
+    first, second = asyncio.run(main())
+    assert first is not second
+    assert service.loads == ["p1", "p1"]
+
+
+def test_nested_scopes_join_the_open_request():
+    calls = []
+    
+    async def loader():
+        calls.append(1)
+        return len(calls)
+    
+    async def main():
+        async with request_context() as outer:
+            async with request_context() as inner:
+                assert inner is outer
+                await memoize("key", loader)
+            return await memoize("key", loader)
+    
+    assert asyncio.run(main()) == 1
+    assert calls == [1]
@@ -0,0 +1,102 @@
+import asyncio
+from datetime import date
+
+import numpy as np
+import pytest
+
+from models.portfolio import StockHolding
+from services.risk import RiskEngine, composition_of, compute_risk
+
+
+class StubHistory:
+    """Serves fixed daily closes per ticker in place of the Finnhub client."""
+    
+    def __init__(self, closes):
+        self.closes = closes
+        self.calls = 0
+    
+    async def get_daily_closes(self, ticker, start, end):
+        self.calls += 1
+        days, values = self.closes[ticker]
+        return days, values
+
+
+def series(returns, start="2025-01-01"):
+    days = np.arange(np.datetime64(start), np.datetime64(start) + len(returns) + 1)
+    return days, 100 * np.cumprod(np.concatenate([[1.0], 1 + np.asarray(returns)]))
+
+
+def market_returns(n=120):
+    return np.random.default_rng(7).normal(0.0005, 0.01, n)
+
+
+def test_beta_volatility_and_tail_risk_match_direct_formulas():
+    rng = np.random.default_rng(3)
+    market = market_returns(250)
+    returns = np.column_stack([2 * market + rng.normal(0, 0.002, 250), 0.5 * market + rng.normal(0, 0.002, 250)])
+    weights = np.array([0.25, 0.75])
+    stats = compute_risk(["A", "B"], returns, market, weights, confidence=0.95)
+    
+    for i in range(2):
+        expected_beta = np.cov(returns[:, i], market)[0, 1] / np.var(market, ddof=1)
+        assert stats["betas"][i] == pytest.approx(expected_beta)
+    assert stats["portfolio_beta"] == pytest.approx(weights @ stats["betas"])
+    assert stats["betas"][0] == pytest.approx(2, abs=0.05)
+    
+    portfolio = returns @ weights
+    assert stats["annualized_volatility"] == pytest.approx(portfolio.std(ddof=1) * np.sqrt(252) * 100)
+    assert stats["var"] == pytest.approx(-np.quantile(portfolio, 0.05) * 100)
+    assert stats["cvar"] >= stats["var"]
+    assert np.allclose(np.diag(stats["correlation"]), 1.0)
+
+
+def test_max_drawdown_is_the_worst_peak_to_trough_loss():
+    returns = np.array([[0.10], [-0.20], [0.05], [-0.10], [0.50]])
+    stats = compute_risk(["A"], returns, returns[:, 0], np.array([1.0]))
+    growth = np.cumprod(1 + returns[:, 0])
+    assert stats["max_drawdown"] == pytest.approx((1 - growth[3] / growth[0]) * 100)
+
+
+def test_composition_sums_quantities_per_ticker():
+    holdings = [
+        StockHolding(ticker="aapl", name="Apple", sector="Technology", quantity=3, average_price=1),
+        StockHolding(ticker="AAPL", name="Apple", sector="Technology", quantity=2, average_price=1),
+        StockHolding(ticker="XOM", name="Exxon", sector="Energy", quantity=1, average_price=1)
+    ]
+    assert composition_of(holdings) == {"AAPL": 5, "XOM": 1}
+
+
+def test_reports_are_cached_per_composition_and_day():
+    market = market_returns()
+    history = StubHistory({"SPY": series(market), "AAPL": series(1.5 * market), "XOM": series(0.5 * market)})
+    engine = RiskEngine(history, min_observations=30)
+    as_of = date(2025, 6, 1)
+    
+    report = asyncio.run(engine.analyze_composition({"AAPL": 10, "XOM": 10}, as_of))
+    assert report["holdings"]["AAPL"]["beta"] == pytest.approx(1.5)
+    assert report["holdings"]["XOM"]["beta"] == pytest.approx(0.5)
+    assert report["metrics"]["observations"] == 120
+    weights = report["model"]["weights"]
+    assert weights.sum() == pytest.approx(1.0)
+    assert report["metrics"]["portfolio_beta"] == pytest.approx(weights @ np.array([1.5, 0.5]), abs=1e-4)
+    
+    calls = history.calls
+    assert asyncio.run(engine.analyze_composition({"XOM": 10, "AAPL": 10}, as_of)) is report
+    assert history.calls == calls
+    asyncio.run(engine.analyze_composition({"AAPL": 10, "XOM": 10}, date(2025, 6, 2)))
+    assert history.calls > calls
+
+
+def test_short_history_is_not_cached():
+    market = market_returns(20)
+    history = StubHistory({"SPY": series(market), "AAPL": series(market)})
+    engine = RiskEngine(history, min_observations=30)
+    as_of = date(2025, 6, 1)
+    
+    assert asyncio.run(engine.analyze_composition({"AAPL": 1}, as_of)) is None
+    assert len(engine.cache) == 0
+    
+    # Once enough history is stored the same day's request computes a report
+    market = market_returns()
+    history.closes = {"SPY": series(market), "AAPL": series(market)}
+    assert asyncio.run(engine.analyze_composition({"AAPL": 1}, as_of))["holdings"]["AAPL"]["beta"] == pytest.approx(1.0)
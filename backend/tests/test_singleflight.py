@@ -0,0 +1,95 @@
+import asyncio
+import threading
+
+import pytest
+
+from services.singleflight import SingleFlight
+
+
+def test_concurrent_sync_callers_share_one_call():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+    
+    def fetch():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {"c": 190.0}
+    
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("AAPL", fetch)))
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=lambda: results.append(flight.do("AAPL", fetch))) for _ in range(4)]
+    for thread in followers:
+        thread.start()
+    # Followers register before the leader is released
+    while flight.saved < 4:
+        pass
+    release.set()
+    for thread in [leader] + followers:
+        thread.join(5)
+    
+    assert calls == [1]
+    assert results == [{"c": 190.0}] * 5
+    assert flight.stats() == {"in_flight": 0, "upstream_calls": 1, "calls_saved": 4}
+
+
+def test_sync_error_reaches_every_waiter_and_is_not_remembered():
+    flight = SingleFlight()
+    
+    def fail():
+        raise RuntimeError("upstream down")
+    
+    with pytest.raises(RuntimeError):
+        flight.do("AAPL", fail)
+    assert flight.do("AAPL", lambda: 1) == 1
+    assert flight.executed == 2
+
+
+def test_concurrent_async_callers_share_one_call():
+    flight = SingleFlight()
+    calls = []
+    
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return 42
+    
+    async def main():
+        return await asyncio.gather(*(flight.do_async("MSFT", fetch) for _ in range(5)))
+    
+    assert asyncio.run(main()) == [42] * 5
+    assert calls == [1]
+    assert flight.stats() == {"in_flight": 0, "upstream_calls": 1, "calls_saved": 4}
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_call():
+    flight = SingleFlight()
+    
+    async def fetch():
+        await asyncio.sleep(0.01)
+        return "done"
+    
+    async def main():
+        first = asyncio.ensure_future(flight.do_async("NVDA", fetch))
+        second = asyncio.ensure_future(flight.do_async("NVDA", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second, first.cancelled()
+    
+    assert asyncio.run(main()) == ("done", True)
+
+
+def test_distinct_keys_run_separately():
+    flight = SingleFlight()
+    
+    async def main():
+        return await asyncio.gather(
+            flight.do_async("a", lambda: asyncio.sleep(0, "a")),
+            flight.do_async("b", lambda: asyncio.sleep(0, "b"))
+        )
+    
+    assert asyncio.run(main()) == ["a", "b"]
+    assert flight.executed == 2
@@ -0,0 +1,77 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from services import universe as universe_module
+from services.finnhub_client import FinnhubClient
+from services.universe import Universe, load_universe
+
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEADER = "ticker,name,sector,industry,index\n"
+
+
+def write(tmp_path, body: str, name: str = "universe_v3.csv") -> str:
+    path = tmp_path / name
+    path.write_text(HEADER + body)
+    return str(path)
+
+
+def test_rows_are_normalized_and_versioned(tmp_path):
+    path = write(tmp_path, " aapl ,Apple,Technology,Hardware,SP500\nxom,,energy,Oil & Gas,SP500\n")
+    loaded = load_universe(path)
+    
+    assert loaded.tickers == ["AAPL", "XOM"]
+    assert loaded.by_ticker["XOM"] == {
+        "ticker": "XOM", "name": "XOM", "sector": "energy", "industry": "Oil & Gas", "index": "SP500"
+    }
+    assert loaded.sector_tickers()["technology"] == ["AAPL"]
+    assert loaded.version.startswith("v3-") and len(loaded.version) == 11
+    # Any edit changes the version
+    assert load_universe(write(tmp_path, "AAPL,Apple,technology,Hardware,SP500\n")).version != loaded.version
+
+
+@pytest.mark.parametrize("body, message", [
+    ("AAPL,Apple,technology,,SP500\naapl,Apple Inc,technology,,SP500\n", ":3: duplicate ticker AAPL"),
+    ("AAPL,Apple,technology,,SP500\nXYZ,Xyz,crypto,,\n", ":3: unknown sector 'crypto' for XYZ"),
+    (" ,Blank,technology,,SP500\n", ":2: empty ticker"),
+    ("AAPL,Apple,technology,,SP500\nMSFT,Microsoft,technology\n", ":3: expected 5 fields"),
+    ("AAPL,Apple,technology,,SP500,extra\n", ":2: expected 5 fields")
+])
+def test_invalid_rows_are_rejected_with_their_line(tmp_path, body, message):
+    with pytest.raises(ValueError, match=message):
+        load_universe(write(tmp_path, body))
+
+
+def test_missing_columns_are_named(tmp_path):
+    path = tmp_path / "universe_v1.csv"
+    path.write_text("ticker,name,sector\nAAPL,Apple,technology\n")
+    with pytest.raises(ValueError, match="missing columns: industry, index"):
+        load_universe(str(path))
+
+
+def test_class_attributes_follow_the_loaded_universe(monkeypatch):
+    rows = [{"ticker": "XOM", "name": "Exxon", "sector": "energy", "industry": "", "index": ""}]
+    replacement = Universe(rows, "v9-test")
+    monkeypatch.setattr(universe_module, "_universe", replacement)
+    
+    assert FinnhubClient.UNIVERSE is replacement
+    assert FinnhubClient.SECTOR_TICKERS["energy"] == ["XOM"]
+    assert FinnhubClient.SECTOR_TICKERS is FinnhubClient.SECTOR_TICKERS
+
+
+def test_a_bad_universe_file_fails_at_startup_not_at_import(tmp_path):
+    path = write(tmp_path, "AAPL,Apple,technology,,SP500\nAAPL,Apple,technology,,SP500\n")
+    env = dict(os.environ, UNIVERSE_FILE=path)
+    
+    def run(code: str) -> subprocess.CompletedProcess:
+        return subprocess.run([sys.executable, "-c", code], cwd=BACKEND, env=env, capture_output=True, text=True)
+    
+    imported = run("import services.finnhub_client, services.picker, services.backtest")
+    assert imported.returncode == 0, imported.stderr
+    
+    started = run("import app; app.create_fastapi_app()")
+    assert started.returncode != 0
+    assert "duplicate ticker AAPL" in started.stderr
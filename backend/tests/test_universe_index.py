@@ -0,0 +1,149 @@
+import asyncio
+
+import pytest
+
+from services import cache, universe_index
+from services.picker import StockPicker
+from services.rate_limiter import RequestScheduler
+from services.universe import Universe
+from services.universe_index import UniverseIndex
+
+
+ROWS = [
+    ("AAPL", "technology"), ("MSFT", "technology"), ("NVDA", "technology"), ("ORCL", "technology"),
+    ("XOM", "energy"), ("CVX", "energy"), ("COP", "energy")
+]
+
+QUOTES = {
+    "AAPL": (190.0, 1.0), "MSFT": (415.0, -2.0), "NVDA": (875.0, 3.0), "ORCL": (120.0, 0.5),
+    "XOM": (118.0, -0.5), "CVX": (150.0, 1.5), "COP": (110.0, 0.2)
+}
+
+
+@pytest.fixture
+def universe():
+    rows = [
+        {"ticker": ticker, "name": ticker, "sector": sector, "industry": "Test", "index": "sp500"}
+        for ticker, sector in ROWS
+    ]
+    return Universe(rows, "test")
+
+
+def store(finnhub, ticker, price, change_percent):
+    finnhub._store_quote(ticker, {"c": price, "d": price * change_percent / 100, "dp": change_percent})
+
+
+@pytest.fixture
+def index(finnhub, universe):
+    for ticker, (price, change_percent) in QUOTES.items():
+        store(finnhub, ticker, price, change_percent)
+    index = UniverseIndex(finnhub, universe=universe, quote_share=0.5, leaders_per_sector=2)
+    asyncio.run(index.rebuild())
+    return index
+
+
+def tickers(records):
+    return [record["ticker"] for record in records]
+
+
+def test_rebuild_ranks_each_sector_like_the_picker(index):
+    assert tickers(index.ranked(["technology"], "high", 3)) == ["NVDA", "AAPL", "ORCL"]
+    assert tickers(index.ranked(["energy", "technology"], "high", 1)) == ["CVX", "NVDA"]
+    
+    records = {record["ticker"]: record for record in index.ranked(["technology", "energy"], "high", 10)}
+    assert len(records) == 7
+    assert records["MSFT"]["price"] == 415.0
+    assert records["MSFT"]["sector"] == "Technology"
+    
+    # The index agrees with the picker filtering and sorting the same records
+    picker = StockPicker()
+    for profile in ("low", "moderate", "high"):
+        for sector in ("technology", "energy"):
+            sector_records = [records[ticker] for ticker, row_sector in ROWS if row_sector == sector]
+            expected = picker._sort_stocks(picker._filter_by_risk(sector_records, profile), profile)
+            assert index.ranked([sector], profile, 10) == expected
+    assert index.covers(["technology", "energy"], 3)
+    assert not index.covers(["technology"], 5)
+
+
+def test_quotes_are_applied_incrementally_and_match_a_full_rebuild(index, finnhub):
+    before = index._snapshot
+    store(finnhub, "ORCL", 125.0, 9.0)
+    store(finnhub, "NVDA", 860.0, -1.0)
+    
+    assert tickers(index.ranked(["technology"], "high", 4)) == ["ORCL", "AAPL", "NVDA", "MSFT"]
+    assert index.incremental_updates == 1
+    assert index._snapshot.version == before.version + 1
+    # Readers holding the previous snapshot keep a consistent, unchanged table
+    assert before.rankings[("technology", "high")].tolist() == [2, 0, 3, 1]
+    assert before.price[3] == 120.0
+    # Energy was not touched, so its rankings are shared with the previous snapshot
+    assert index._snapshot.rankings[("energy", "high")] is before.rankings[("energy", "high")]
+    
+    def rankings():
+        return {p: tickers(index.ranked(["technology", "energy"], p, 10)) for p in ("low", "moderate", "high")}
+    
+    incremental = rankings()
+    asyncio.run(index.rebuild())
+    assert rankings() == incremental
+
+
+def test_unquoted_symbols_stay_out_of_rankings(finnhub, universe):
+    for ticker in ("AAPL", "MSFT", "XOM"):
+        store(finnhub, ticker, *QUOTES[ticker])
+    index = UniverseIndex(finnhub, universe=universe, leaders_per_sector=0)
+    asyncio.run(index.rebuild())
+    
+    assert tickers(index.ranked(["technology", "energy"], "high", 10)) == ["AAPL", "MSFT", "XOM"]
+    store(finnhub, "COP", *QUOTES["COP"])
+    assert tickers(index.ranked(["energy"], "high", 10)) == ["COP", "XOM"]
+
+
+def test_old_quotes_expire_until_the_symbol_is_quoted_again(index, finnhub, monkeypatch, clock):
+    clock.now = index._snapshot.quoted_at.max()
+    monkeypatch.setattr(universe_index, "time", clock)
+    monkeypatch.setattr(cache, "time", clock)
+    index.max_quote_age = 600
+    store(finnhub, "NVDA", 870.0, 2.0)
+    
+    clock.advance(400)
+    store(finnhub, "AAPL", 191.0, 1.0)
+    clock.advance(300)
+    # Everything but AAPL is now older than ten minutes
+    assert tickers(index.ranked(["technology", "energy"], "high", 10)) == ["AAPL"]
+    assert index.expired_quotes == 6
+    
+    # A full rebuild does not bring expired prices back
+    asyncio.run(index.rebuild())
+    assert tickers(index.ranked(["technology", "energy"], "high", 10)) == ["AAPL"]
+    
+    store(finnhub, "XOM", 119.0, 0.1)
+    assert tickers(index.ranked(["energy"], "high", 10)) == ["XOM"]
+
+
+def test_background_quotes_leave_headroom_for_interactive_calls(finnhub, universe):
+    finnhub.scheduler = RequestScheduler(rate_per_minute=60, burst=10)
+    index = UniverseIndex(finnhub, universe=universe, quote_share=0.5)
+    
+    assert index.quote_batch_size == 5
+    assert index.quote_interval == pytest.approx(10.0)
+    # Seven symbols at half of one call per second
+    assert index.refresh_period == pytest.approx(14.0)
+    assert index.max_quote_age == pytest.approx(28.0)
+    
+    # After a 429 halves the rate, batches slow down with it
+    finnhub.scheduler.record_throttle(retry_after=0)
+    assert index.quote_interval == pytest.approx(20.0)
+    
+    with pytest.raises(ValueError):
+        UniverseIndex(finnhub, universe=universe, quote_share=1.0)
+
+
+def test_refresh_walks_the_universe_sector_by_sector(finnhub, universe):
+    index = UniverseIndex(finnhub, universe=universe, quote_share=0.3)
+    assert index._quote_order == ["AAPL", "XOM", "MSFT", "CVX", "NVDA", "COP", "ORCL"]
+    
+    asyncio.run(index.refresh_quotes())
+    asyncio.run(index.refresh_quotes())
+    assert index._quote_cursor == 6
+    assert set(finnhub.quote_cache._data) == {"AAPL", "XOM", "MSFT", "CVX", "NVDA", "COP"}
@@ -0,0 +1,89 @@
+import pytest
+from pydantic import ConfigDict, ValidationError
+
+from models.portfolio import Portfolio, PortfolioPreferences, StockHolding
+from services.valuation import _assign, value_holdings, value_portfolios
+
+
+def holding(ticker, sector, quantity, average_price, **fields) -> StockHolding:
+    return StockHolding(
+        ticker=ticker, name=ticker, sector=sector, quantity=quantity, average_price=average_price, **fields
+    )
+
+
+def portfolio(holdings, total_invested) -> Portfolio:
+    preferences = PortfolioPreferences(
+        budget=total_invested, risk_profile="moderate", investment_goal="growth",
+        target_return=8, time_horizon_years=5, preferred_sectors=["technology"]
+    )
+    return Portfolio(
+        user_id="user", name="Test", preferences=preferences, holdings=holdings, total_invested=total_invested
+    )
+
+
+def test_holdings_are_repriced_and_totalled():
+    holdings = [
+        holding("AAPL", "Technology", 10, 150.0),
+        holding("MSFT", "Technology", 2, 400.0),
+        holding("XOM", "Energy", 5, 100.0)
+    ]
+    valuation = value_holdings(holdings, {"AAPL": 180.0, "MSFT": 380.0, "XOM": 110.0})
+    
+    assert valuation.holding_value.tolist() == [1800.0, 760.0, 550.0]
+    assert valuation.holding_gain.tolist() == [300.0, -40.0, 50.0]
+    assert valuation.holding_gain_percent.tolist() == pytest.approx([20.0, -5.0, 10.0])
+    assert valuation.total_value.tolist() == [3110.0]
+    assert valuation.sector_allocation(0) == pytest.approx({"Technology": 2560 / 31.1, "Energy": 550 / 31.1})
+    
+    valuation.write_holdings()
+    assert (holdings[0].current_price, holdings[0].total_value, holdings[0].gain_loss) == (180.0, 1800.0, 300.0)
+    assert holdings[1].gain_loss_percent == pytest.approx(-5.0)
+    assert {"current_price", "total_value", "gain_loss", "gain_loss_percent"} <= holdings[0].model_fields_set
+
+
+def test_unpriced_holdings_keep_their_stored_values():
+    holdings = [
+        holding("AAPL", "Technology", 10, 150.0),
+        holding("ZZZ", "Technology", 4, 50.0, total_value=240.0, gain_loss=40.0)
+    ]
+    valuation = value_holdings(holdings, {"AAPL": 160.0})
+    
+    assert valuation.priced.tolist() == [True, False]
+    assert valuation.holding_value.tolist() == [1600.0, 240.0]
+    assert valuation.holding_gain.tolist() == [100.0, 40.0]
+    valuation.write_holdings()
+    assert holdings[1].current_price is None
+
+
+def test_many_portfolios_match_one_at_a_time():
+    prices = {"AAPL": 180.0, "MSFT": 380.0, "XOM": 110.0, "NEE": 70.0}
+    portfolios = [
+        portfolio([holding("AAPL", "Technology", 10, 150.0), holding("XOM", "Energy", 5, 100.0)], 2000.0),
+        portfolio([holding("MSFT", "Technology", 3, 400.0)], 1200.0),
+        portfolio([holding("NEE", "Utilities", 20, 75.0), holding("AAPL", "Technology", 1, 200.0)], 1700.0)
+    ]
+    batch = value_portfolios(portfolios, prices)
+    batch.write_portfolios(portfolios)
+    
+    for i, single in enumerate(portfolios):
+        alone = value_holdings(single.holdings, prices)
+        assert batch.total_value[i] == pytest.approx(alone.total_value[0])
+        assert single.current_value == pytest.approx(alone.total_value[0])
+        assert single.total_gain_loss == pytest.approx(alone.total_gain[0])
+        assert single.total_gain_loss_percent == pytest.approx(alone.total_gain[0] / single.total_invested * 100)
+    
+    assert portfolios[2].current_value == 1580.0
+    assert portfolios[2].total_gain_loss == -120.0
+    assert batch.sector_allocation(2) == pytest.approx({"Utilities": 1400 / 15.8, "Technology": 180 / 15.8})
+
+
+def test_models_that_validate_assignment_are_validated_on_write_back():
+    class StrictHolding(StockHolding):
+        model_config = ConfigDict(validate_assignment=True)
+    
+    strict = StrictHolding(ticker="AAPL", name="AAPL", sector="Technology", quantity=10, average_price=150.0)
+    value_holdings([strict], {"AAPL": 180.0}).write_holdings()
+    assert (strict.current_price, strict.total_value) == (180.0, 1800.0)
+    
+    with pytest.raises(ValidationError):
+        _assign(strict, {"current_price": "not a price"})
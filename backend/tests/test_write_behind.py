@@ -0,0 +1,160 @@
+import asyncio
+
+from appwrite.exception import AppwriteException
+
+from models.portfolio import ChatMessage
+from services import write_behind
+from services.appwrite_client import AppwriteClient
+from services.write_behind import WriteBehindQueue, _Job
+
+
+def queue(**overrides) -> WriteBehindQueue:
+    options = {"batch_size": 4, "max_retries": 3, "base_delay": 0.0, "linger": 0.0}
+    options.update(overrides)
+    return WriteBehindQueue(**options)
+
+
+def test_failed_writes_are_retried_until_they_succeed():
+    writes = queue()
+    attempts = []
+    
+    async def flaky(message):
+        attempts.append(message)
+        if len(attempts) == 1:
+            raise ConnectionError("timeout")
+        return len(attempts) >= 3
+    
+    async def main():
+        assert writes.enqueue("save", flaky, "hello")
+        assert await writes.flush(timeout=5)
+        await writes.stop()
+    
+    asyncio.run(main())
+    assert attempts == ["hello"] * 3
+    stats = writes.stats()
+    assert (stats["completed"], stats["failed"], stats["retries"]) == (1, 0, 2)
+
+
+def test_writes_give_up_after_max_retries():
+    writes = queue(max_retries=2)
+    attempts = []
+    
+    async def failing():
+        attempts.append(1)
+        return None
+    
+    async def main():
+        writes.enqueue("save", failing)
+        await writes.flush(timeout=5)
+        await writes.stop()
+    
+    asyncio.run(main())
+    assert len(attempts) == 3
+    assert (writes.completed, writes.failed, writes.retries) == (0, 1, 2)
+
+
+def test_backoff_grows_exponentially_up_to_the_cap(monkeypatch):
+    writes = queue(max_retries=4, base_delay=1.0, max_delay=3.0)
+    delays = []
+    
+    async def fake_sleep(seconds):
+        delays.append(seconds)
+    
+    async def failing():
+        return False
+    
+    monkeypatch.setattr("services.write_behind.random.uniform", lambda low, high: high)
+    monkeypatch.setattr("services.write_behind.asyncio.sleep", fake_sleep)
+    asyncio.run(writes._run_job(_Job("save", failing, (), {})))
+    assert delays == [1.0, 2.0, 3.0, 3.0]
+
+
+def test_stop_flushes_queued_writes_in_batches():
+    writes = queue(batch_size=3)
+    saved = []
+    
+    async def save(n):
+        saved.append(n)
+        return True
+    
+    async def main():
+        for n in range(7):
+            writes.enqueue("save", save, n)
+        await writes.stop(timeout=5)
+    
+    asyncio.run(main())
+    assert sorted(saved) == list(range(7))
+    assert writes.batches == 3
+    assert writes.stats()["running"] is False
+
+
+def test_full_queue_drops_instead_of_blocking():
+    writes = queue(capacity=2)
+    
+    async def save():
+        return True
+    
+    async def main():
+        results = [writes.enqueue("save", save) for _ in range(3)]
+        await writes.stop(timeout=5)
+        return results
+    
+    assert asyncio.run(main()) == [True, True, False]
+    assert (writes.enqueued, writes.dropped, writes.completed) == (2, 1, 2)
+
+
+def test_lag_tracks_the_oldest_queued_write(monkeypatch, clock):
+    monkeypatch.setattr(write_behind, "time", clock)
+    writes = queue()
+    
+    async def save():
+        return True
+    
+    async def main():
+        writes.enqueue("save", save)
+        clock.advance(5)
+        writes.enqueue("save", save)
+        clock.advance(1)
+        # The worker has not run yet, so both writes are still waiting
+        assert writes.stats()["lag_seconds"] == 6
+        await writes.flush(timeout=5)
+        assert writes.stats()["lag_seconds"] == 0
+        await writes.stop()
+    
+    asyncio.run(main())
+    assert writes.stats()["max_lag_seconds"] == 6
+
+
+class LossyDatabases:
+    """Stores each document but loses the response to the first create call, like a client timeout."""
+    
+    def __init__(self):
+        self.documents = {}
+        self.calls = 0
+    
+    def create_document(self, database_id, collection_id, document_id, data):
+        self.calls += 1
+        if document_id in self.documents:
+            raise AppwriteException("Document with the requested ID already exists.", 409)
+        self.documents[document_id] = data
+        if self.calls == 1:
+            raise TimeoutError("read timed out")
+        return {"$id": document_id}
+
+
+def test_retried_chat_writes_do_not_duplicate_messages(monkeypatch):
+    monkeypatch.delenv("APPWRITE_PROJECT_ID", raising=False)
+    appwrite = AppwriteClient()
+    appwrite.client = object()
+    appwrite.databases = LossyDatabases()
+    writes = queue()
+    message = ChatMessage(id="msg-1", portfolio_id="p1", user_id="u1", role="user", content="How am I doing?")
+    
+    async def main():
+        writes.enqueue("save_chat_message", appwrite.save_chat_message, message)
+        await writes.stop(timeout=5)
+    
+    asyncio.run(main())
+    assert list(appwrite.databases.documents) == ["msg-1"]
+    assert appwrite.databases.calls == 2
+    assert (writes.completed, writes.failed, writes.retries) == (1, 0, 1)